@@ -1,9 +1,8 @@
 import os
-import psutil
+import sys
+import json
+import types
 import socket
-import numpy as np
-import time
-import requests
 from datetime import datetime
 import pytz
 from flask import Flask
@@ -13,6 +12,18 @@ from dotenv import load_dotenv
 import joblib
 from plyer import notification
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from Agent.write_buffer import WriteBuffer
+from Agent.runtime import AgentRuntime
+from common.prediction import predict_one
+from common.features import FeaturePipeline
+from common.sampler import MetricSampler
+from common.prober import LatencyProber, default_targets
+from common.http_client import HttpClient
+
 # ======================================================
 # 🔹 Load Environment Variables
 # ======================================================
@@ -37,7 +48,30 @@ IST = pytz.timezone("Asia/Kolkata")
 # ======================================================
 # 🔹 Backend URL for fetching notifications
 # ======================================================
-BACKEND_URL = "http://192.168.0.130:5000"  # ✅ Replace with backend Flask server IP
+BACKEND_URL = os.getenv("BACKEND_URL", "http://192.168.0.130:5000")  # ✅ Replace with backend Flask server IP
+
+# "db"   → write straight to MySQL (one connection per agent)
+# "http" → send batches to the backend's /api/ingest (backend pools DB connections)
+AGENT_MODE = os.getenv("AGENT_MODE", "db").lower()
+
+# "local"  → load models/model_latest.joblib on this node
+# "remote" → score through the backend's /api/infer (one model for the whole fleet)
+INFERENCE_MODE = os.getenv("AGENT_INFERENCE", "local").lower()
+
+# ======================================================
+# 🔹 Write Buffer Settings
+# ======================================================
+FLUSH_SIZE = int(os.getenv("AGENT_FLUSH_SIZE", "10"))            # rows per batch
+FLUSH_INTERVAL = int(os.getenv("AGENT_FLUSH_INTERVAL", "300"))   # seconds
+SPOOL_PATH = os.getenv("AGENT_SPOOL_PATH") or None               # e.g. agent_spool.jsonl
+
+# Runtime schedule (seconds) — each duty runs as its own fixed-rate task
+CYCLE_INTERVAL = float(os.getenv("AGENT_CYCLE_INTERVAL", "60"))    # collect + predict
+NOTIFY_MODE = os.getenv("AGENT_NOTIFY_MODE", "poll")              # poll (/claim + ack) | stream (SSE, async servers)
+NOTIFY_INTERVAL = float(os.getenv("AGENT_NOTIFY_INTERVAL", "60"))  # poll backend alerts
+NOTIFY_RECONNECT = float(os.getenv("AGENT_NOTIFY_RECONNECT", "5")) # re-open a dropped stream
+FLUSH_TICK = float(os.getenv("AGENT_FLUSH_TICK", "5"))             # check flush thresholds
+QUEUE_SIZE = int(os.getenv("AGENT_QUEUE_SIZE", "10"))              # pending metric windows
 
 
 # ======================================================
@@ -65,6 +99,7 @@ class SystemInfo(db.Model):
 
 class SystemMetrics(db.Model):
     __tablename__ = "system_metrics"
+    __table_args__ = (db.Index("idx_metrics_system_time", "system_id", "timestamp"),)
     metric_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
     timestamp = db.Column(db.DateTime, default=lambda: datetime.now(IST))
@@ -77,6 +112,7 @@ class SystemMetrics(db.Model):
 
 class PredictionLog(db.Model):
     __tablename__ = "prediction_log"
+    __table_args__ = (db.Index("idx_predictions_system_created", "system_id", "created_at"),)
     prediction_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
     system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
     downtime_risk = db.Column(db.Boolean, nullable=False)
@@ -99,16 +135,91 @@ class SystemHistory(db.Model):
     downtime_detected = db.Column(db.Boolean, default=False)
 
 
+class Notification(db.Model):
+    __tablename__ = "notifications"
+    __table_args__ = (db.Index("idx_notifications_system_status", "system_id", "status"),)
+    notification_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    admin_id = db.Column(db.Integer, db.ForeignKey("admin.admin_id"), nullable=False)
+    system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    risk_level = db.Column(db.Enum("Low", "Medium", "High"), default="Low")
+    status = db.Column(db.Enum("Unread", "Read"), default="Unread")
+    sent_time = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
+
+
+# ======================================================
+# 🔹 Buffered Writes → Multi-row INSERTs
+# ======================================================
+BUFFERED_MODELS = {
+    "metrics": SystemMetrics,
+    "predictions": PredictionLog,
+    "notifications": Notification,
+}
+
+
+def flush_to_db(batch):
+    """Write one buffered batch as a single transaction, one multi-row INSERT per table."""
+    with app.app_context():
+        try:
+            for kind, rows in batch.items():
+                db.session.execute(BUFFERED_MODELS[kind].__table__.insert().values(rows))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    print(f"📤 Flushed {sum(len(r) for r in batch.values())} buffered rows")
+
+
+# One keep-alive pool for every backend call; retries use jittered backoff and
+# a circuit breaker so a struggling backend is not hit by the fleet in lockstep
+api = HttpClient(BACKEND_URL, timeout=10)
+
+
+def post_to_backend(batch):
+    """Send one buffered batch to the backend as gzip-compressed JSON."""
+    # The write buffer already retries failed batches with backoff
+    res = api.post("/api/ingest", batch, compress=True, retries=0)
+    res.raise_for_status()
+    print(f"📤 Sent {sum(len(r) for r in batch.values())} buffered rows to backend")
+
+
+write_buffer = WriteBuffer(
+    sink=post_to_backend if AGENT_MODE == "http" else flush_to_db,
+    max_batch=FLUSH_SIZE,
+    flush_interval=FLUSH_INTERVAL,
+    spool_path=SPOOL_PATH,
+)
+
+
+# Per-system ring buffers → diff / rolling mean / rolling std features
+feature_pipeline = FeaturePipeline()
+
+
 # ======================================================
 # 🔹 Collect Real-Time Metrics
 # ======================================================
+SAMPLE_INTERVAL = float(os.getenv("AGENT_SAMPLE_INTERVAL", "5"))  # seconds
+
+# Snapshots CPU / memory / disk + network throughput on its own thread
+sampler = MetricSampler(interval=SAMPLE_INTERVAL)
+
+# Real round-trip times: concurrent TCP/HTTP probes (PROBE_TARGETS, default: the backend)
+PROBE_INTERVAL = float(os.getenv("PROBE_INTERVAL", "15"))  # seconds
+PROBE_TIMEOUT = float(os.getenv("PROBE_TIMEOUT", "2"))  # seconds per probe
+prober = LatencyProber(default_targets(BACKEND_URL), timeout=PROBE_TIMEOUT, interval=PROBE_INTERVAL)
+
+
 def collect_metrics():
+    """Summarize everything the sampler saw since the previous cycle (never blocks)."""
+    window = sampler.take_window()
+    probes = prober.take_window()
     return {
-        "CPU_Usage": psutil.cpu_percent(interval=1),
-        "Memory_Usage": psutil.virtual_memory().percent,
-        "Disk_IO": psutil.disk_usage("/").percent,
-        "Network_Latency": np.random.uniform(10, 100),
-        "Error_Rate": np.random.uniform(0, 5),
+        "CPU_Usage": round(window["CPU_Usage"]["mean"], 2),
+        "Memory_Usage": round(window["Memory_Usage"]["mean"], 2),
+        "Disk_IO": round(window["Disk_IO"]["mean"], 3),  # MB/s read + write
+        "Network_Latency": probes["Network_Latency"],  # mean probe RTT in ms
+        "Error_Rate": probes["Error_Rate"],  # % of failed probes
+        "window": window,
         "timestamp": datetime.now(IST)
     }
 
@@ -196,117 +307,231 @@ def login_admin():
         return admin, system
 
 
+# ======================================================
+# 🔹 Admin Registration & Login via Backend API (HTTP mode)
+# ======================================================
+def _api_session(res, hostname):
+    """Build lightweight admin/system objects from a backend login/register response."""
+    system = next((s for s in res.get("systems", []) if s["system_name"] == hostname), None)
+    if system is None and "system_id" in res:
+        system = {"system_id": res["system_id"], "system_name": res["system_name"]}
+    if system is None:
+        return None, None
+    return (types.SimpleNamespace(admin_id=res["admin_id"], name=res.get("name")),
+            types.SimpleNamespace(**system))
+
+
+def register_admin_http():
+    print("\n🆕 Register a new Admin and System")
+    payload = {
+        "name": input("Enter your Name: ").strip(),
+        "email": input("Enter your Email: ").strip(),
+        "phone": input("Enter your Phone Number: ").strip(),
+        "password": input("Enter Password: ").strip(),
+        "system_name": socket.gethostname(),
+    }
+    try:
+        res = api.post("/api/register", payload, retries=0)
+    except Exception as e:
+        print(f"❌ Backend unreachable: {e}")
+        return None, None
+    if res.status_code != 200:
+        print(f"⚠ {res.json().get('error', 'Registration failed')}")
+        return None, None
+    print(f"✅ Registered successfully! Linked system: {payload['system_name']}")
+    return _api_session(res.json(), payload["system_name"])
+
+
+def login_admin_http():
+    print("\n🔑 Admin Login")
+    hostname = socket.gethostname()
+    payload = {
+        "email": input("Enter your Email: ").strip(),
+        "password": input("Enter Password: ").strip(),
+        "system_name": hostname,
+    }
+    try:
+        res = api.post("/api/login", payload)
+    except Exception as e:
+        print(f"❌ Backend unreachable: {e}")
+        return None, None
+    if res.status_code != 200:
+        print("❌ Invalid credentials.")
+        return None, None
+    print(f"✅ Logged in as {res.json().get('name')}")
+    return _api_session(res.json(), hostname)
+
+
 # ======================================================
 # 🔹 Make Prediction + Log Notifications
 # ======================================================
+def remote_predict(features):
+    """Score one feature row with the backend's shared, micro-batched model."""
+    res = api.post("/api/infer", {"features": [features]}, timeout=5, retries=1)
+    res.raise_for_status()
+    p = res.json()["predictions"][0]
+    return int(p["downtime_risk"]), float(p["probability"])
+
+
 def make_prediction(metrics, admin, system, model, scaler):
-    with app.app_context():
-        try:
-            if model and scaler:
-                features = [
-                    metrics["CPU_Usage"], metrics["Memory_Usage"], metrics["Disk_IO"],
-                    metrics["Network_Latency"], metrics["Error_Rate"]
-                ] + [0.0] * 15
-                scaled = scaler.transform([features])
-                pred = int(model.predict(scaled)[0])
-                prob = float(model.predict_proba(scaled)[0][1] * 100)
-            else:
-                pred, prob = 0, 50.0
-        except Exception as e:
-            print(f"⚠ ML Prediction failed: {e}")
+    # Full feature vector (features.pkl order) from this node's rolling windows
+    features = feature_pipeline.update(system.system_id, metrics)
+    try:
+        if INFERENCE_MODE == "remote":
+            pred, prob = remote_predict(features)
+        elif model and scaler:
+            pred, prob = predict_one(model, scaler, features)
+            if prob is None:
+                prob = 100.0 if pred else 0.0
+        else:
             pred, prob = 0, 50.0
+    except Exception as e:
+        print(f"⚠ ML Prediction failed: {e}")
+        pred, prob = 0, 50.0
+
+    # ✅ Determine risk purely by probability
+    if prob >= 85:
+        risk_level = "High"
+    elif prob >= 75:
+        risk_level = "Medium"
+    else:
+        risk_level = "Low"
+
+    ts = metrics.get("timestamp") or datetime.now(IST)
+
+    # ✅ Always log metrics and predictions (buffered, flushed in batches)
+    write_buffer.add("metrics", {
+        "system_id": system.system_id,
+        "timestamp": ts,
+        "CPU_Usage": metrics["CPU_Usage"],
+        "Memory_Usage": metrics["Memory_Usage"],
+        "Disk_IO": metrics["Disk_IO"],
+        "Network_Latency": metrics["Network_Latency"],
+        "Error_Rate": metrics["Error_Rate"],
+    })
+
+    write_buffer.add("predictions", {
+        "system_id": system.system_id,
+        "downtime_risk": bool(pred),
+        "probability": prob,
+        "estimated_time_to_downtime": 15 if pred == 1 else None,
+        "created_at": ts,
+    })
+
+    # ✅ Alerts (cooldowns, digests) are raised by the backend's alert pipeline
+    # from the stored prediction — via ingest or its prediction_log tail, in
+    # both agent modes — so risky predictions are flushed right away
+    if prob >= 75:
+        write_buffer.flush(force=True)
+        print(f"📨 Risk={prob:.2f}% sent — the backend raises the alert")
+    else:
+        print(f"✅ No alert (Risk={prob:.2f}%) — Below threshold")
 
-        # ✅ Determine risk purely by probability
-        if prob >= 85:
-            risk_level = "High"
-        elif prob >= 75:
-            risk_level = "Medium"
-        else:
-            risk_level = "Low"
-
-        # ✅ Always log metrics and predictions
-        db.session.add(SystemMetrics(
-            system_id=system.system_id,
-            CPU_Usage=metrics["CPU_Usage"],
-            Memory_Usage=metrics["Memory_Usage"],
-            Disk_IO=metrics["Disk_IO"],
-            Network_Latency=metrics["Network_Latency"],
-            Error_Rate=metrics["Error_Rate"]
-        ))
-
-        db.session.add(PredictionLog(
-            system_id=system.system_id,
-            downtime_risk=pred,
-            probability=prob,
-            estimated_time_to_downtime=15 if pred == 1 else None
-        ))
-
-        # ✅ Only create notification if probability crosses 75%
-        if prob >= 75:
-            msg = (
-                f"⚠ {risk_level} Downtime Risk Detected for {system.system_name} "
-                f"({prob:.2f}%). CPU={metrics['CPU_Usage']}%, MEM={metrics['Memory_Usage']}%"
-            )
-            db.session.execute(
-                db.text("""
-                    INSERT INTO notifications (admin_id, system_id, message, risk_level, status)
-                    VALUES (:admin_id, :system_id, :message, :risk_level, 'Unread')
-                """),
-                {"admin_id": admin.admin_id, "system_id": system.system_id,
-                 "message": msg, "risk_level": risk_level}
-            )
-            print(f"🚨 Notification logged → {msg}")
-        else:
-            print(f"✅ No alert (Risk={prob:.2f}%) — Below threshold")
+    print(f"🕒 {ts.strftime('%Y-%m-%d %H:%M:%S')} | "
+          f"CPU={metrics['CPU_Usage']}% | MEM={metrics['Memory_Usage']}% | "
+          f"Risk={prob:.2f}% | Level={risk_level} | Buffered={len(write_buffer)}")
 
-        try:
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"❌ Commit failed: {e}")
 
-        print(f"🕒 {metrics['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} | "
-              f"CPU={metrics['CPU_Usage']}% | MEM={metrics['Memory_Usage']}% | "
-              f"Risk={prob:.2f}% | Level={risk_level}")
 # ======================================================
 # 🔹 Check Backend for New Notifications
 # ======================================================
+def show_notification(n):
+    notification.notify(
+        title=f"🚨 {n['risk_level']} Risk Alert",
+        message=n["message"],
+        timeout=8
+    )
+    print(f"💻 System Alert Displayed: {n['message']}")
+
+
 def check_new_notifications(system_id):
+    """
+    Claim pending alerts in bounded batches and ack each batch after it is
+    shown; if the agent dies in between, the backend redelivers the batch.
+    """
     try:
-        res = requests.get(f"{BACKEND_URL}/api/notifications/{system_id}", timeout=5)
-        if res.status_code == 200:
-            data = res.json().get("notifications", [])
-            for n in data:
-                notification.notify(
-                    title=f"🚨 {n['risk_level']} Risk Alert",
-                    message=n["message"],
-                    timeout=8
-                )
-                print(f"💻 System Alert Displayed: {n['message']}")
+        while True:
+            res = api.post(f"/api/notifications/{system_id}/claim", timeout=5)
+            if res.status_code != 200:
+                return
+            claim = res.json()
+            for n in claim["notifications"]:
+                show_notification(n)
+            if claim["notifications"]:
+                api.post(f"/api/notifications/{system_id}/ack",
+                         json_body={"claim_token": claim["claim_token"]}, timeout=5)
+            if not claim.get("more"):
+                return
     except Exception as e:
         print(f"⚠ Notification fetch failed: {e}")
 
 
+def listen_notifications(system_id):
+    """
+    Hold one Server-Sent Events connection and show alerts as they are pushed.
+    Returns when the backend closes the stream; the runtime re-opens it.
+    """
+    try:
+        with api.get(f"/api/notifications/{system_id}/stream",
+                     stream=True, timeout=(5, 60), retries=0) as res:
+            if res.status_code == 503:
+                # Server runs sync workers and has streaming off: poll instead
+                check_new_notifications(system_id)
+                return
+            res.raise_for_status()
+            event = None
+            for line in res.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:") and event == "notification":
+                    show_notification(json.loads(line[5:]))
+                elif not line:
+                    event = None
+    except Exception as e:
+        print(f"⚠ Notification stream dropped: {e}")
+
+
 # ======================================================
 # 🔹 Main Loop
 # ======================================================
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
+    if AGENT_MODE == "http":
+        print(f"🌐 HTTP mode — sending batches to {BACKEND_URL}/api/ingest")
+        choice = input("\nDo you already have an account? (y/n): ").strip().lower()
+        admin, system = login_admin_http() if choice == "y" else register_admin_http()
+    else:
+        with app.app_context():
+            db.create_all()
 
-    choice = input("\nDo you already have an account? (y/n): ").strip().lower()
-    admin, system = login_admin() if choice == "y" else register_admin()
+        choice = input("\nDo you already have an account? (y/n): ").strip().lower()
+        admin, system = login_admin() if choice == "y" else register_admin()
 
     if not admin or not system:
         print("❌ Exiting: could not authenticate or register.")
         exit()
 
-    model, scaler = auto_load_model()
-    print(f"\n🚀 Starting metric collection for system: {system.system_name}\n")
+    model, scaler = auto_load_model() if INFERENCE_MODE == "local" else (None, None)
+    sampler.start()
+    prober.start()
+    print(f"\n🚀 Starting metric collection for system: {system.system_name} "
+          f"(sampling every {SAMPLE_INTERVAL:g}s, predicting every {CYCLE_INTERVAL:g}s)\n")
+
+    # Sampling only reads the sampler's window, so it runs on the loop itself and
+    # hands off through a bounded queue; everything that blocks runs in a thread.
+    runtime = AgentRuntime()
+    metrics_queue = runtime.queue("metrics", maxsize=QUEUE_SIZE)
+    runtime.every("collect", CYCLE_INTERVAL, lambda: metrics_queue.put(collect_metrics()), in_thread=False)
+    runtime.consume("inference", metrics_queue, lambda m: make_prediction(m, admin, system, model, scaler))
+    runtime.every("flush", FLUSH_TICK, write_buffer.maybe_flush)
+    if NOTIFY_MODE == "stream":
+        runtime.every("notifications", NOTIFY_RECONNECT, lambda: listen_notifications(system.system_id))
+    else:
+        runtime.every("notifications", NOTIFY_INTERVAL, lambda: check_new_notifications(system.system_id))
 
-    while True:
-        metrics = collect_metrics()
-        make_prediction(metrics, admin, system, model, scaler)
-        check_new_notifications(system.system_id)
-        print("⏳ Waiting 60 seconds...\n")
-        time.sleep(60)
\ No newline at end of file
+    try:
+        runtime.run_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping agent — flushing buffered rows...")
+        if not write_buffer.flush(force=True):
+            print(f"⚠ {len(write_buffer)} rows could not be sent"
+                  + (f"; kept in {SPOOL_PATH}" if SPOOL_PATH else ""))
\ No newline at end of file
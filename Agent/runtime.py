@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+
+# ======================================================
+# 🔹 Bounded Hand-off Queue
+# ======================================================
+class BoundedQueue:
+    """
+    asyncio queue that never blocks the producer: when full, the oldest item
+    is dropped (and counted) so a slow consumer only ever sees stale data
+    disappear, never a stalled sampler.
+    """
+
+    def __init__(self, maxsize=10):
+        self._q = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def __len__(self):
+        return self._q.qsize()
+
+    def put(self, item):
+        if self._q.full():
+            self._q.get_nowait()
+            self.dropped += 1
+        self._q.put_nowait(item)
+
+    async def get(self):
+        return await self._q.get()
+
+
+# ======================================================
+# 🔹 Agent Runtime (fixed-rate tasks on one event loop)
+# ======================================================
+class AgentRuntime:
+    """
+    Runs each agent duty as its own task. Periodic tasks are scheduled on a
+    fixed grid (start + k * interval) so work time never accumulates as drift;
+    a run that overruns skips the missed ticks instead of bunching up.
+    Blocking callables run in worker threads, so a slow DB or backend only
+    delays the task that talks to it.
+    """
+
+    def __init__(self):
+        self._specs = []
+        self.queues = {}
+        self.stats = {}
+        self._stop = None
+
+    def queue(self, name, maxsize=10):
+        q = BoundedQueue(maxsize)
+        self.queues[name] = q
+        return q
+
+    def every(self, name, interval, fn, in_thread=True):
+        """Call fn() every `interval` seconds."""
+        self._specs.append((name, self._periodic(name, interval, fn, in_thread)))
+        return self
+
+    def consume(self, name, queue, fn, in_thread=True):
+        """Call fn(item) for each item put on `queue`."""
+        self._specs.append((name, self._consumer(name, queue, fn, in_thread)))
+        return self
+
+    # --------------------------------------------------
+    # Task bodies
+    # --------------------------------------------------
+    async def _call(self, name, fn, args, in_thread):
+        stats = self.stats[name]
+        t0 = time.perf_counter()
+        try:
+            if in_thread:
+                await asyncio.to_thread(fn, *args)
+            else:
+                fn(*args)
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"⚠ Task '{name}' failed: {e}")
+        stats["runs"] += 1
+        stats["last_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    async def _periodic(self, name, interval, fn, in_thread):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            await self._call(name, fn, (), in_thread)
+            next_at += interval
+            now = loop.time()
+            if now > next_at:
+                missed = int((now - next_at) // interval) + 1
+                self.stats[name]["skipped"] += missed
+                next_at += missed * interval
+            await asyncio.sleep(next_at - now)
+
+    async def _consumer(self, name, queue, fn, in_thread):
+        while True:
+            item = await queue.get()
+            await self._call(name, fn, (item,), in_thread)
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+    async def run(self, duration=None):
+        """Run every task until stop() is called or `duration` seconds pass."""
+        self._stop = asyncio.Event()
+        tasks = []
+        for name, coro in self._specs:
+            self.stats[name] = {"runs": 0, "errors": 0, "skipped": 0, "last_ms": None}
+            tasks.append(asyncio.create_task(coro, name=name))
+        try:
+            await asyncio.wait_for(self._stop.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    def run_forever(self):
+        asyncio.run(self.run())
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Client errors that may succeed later (timeout, too early, rate limited)
+RETRYABLE_STATUS = {408, 425, 429}
+
+
+def is_permanent_error(exc):
+    """True for a 4xx response that every retry of the same batch would get again."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is not None and 400 <= status < 500 and status not in RETRYABLE_STATUS
+
+
+# ======================================================
+# 🔹 Agent-side Write Buffer
+# ======================================================
+class WriteBuffer:
+    """
+    Holds metric / prediction / notification rows in memory (and optionally in
+    a local JSONL spool file) and hands them to `sink` in batches of at most
+    `max_batch` rows, draining the whole backlog batch by batch. A failed
+    batch stays queued and is retried with exponential backoff; a batch the
+    sink rejects permanently (`permanent_error(exc)`, e.g. HTTP 400) is moved
+    to the `<spool>.rejected` file (or dropped without a spool) so it cannot
+    block the rows behind it.
+    """
+
+    def __init__(self, sink, max_batch=10, flush_interval=300, spool_path=None,
+                 retry_base=5, retry_max=300, permanent_error=is_permanent_error):
+        self.sink = sink
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.permanent_error = permanent_error
+        self.rejected = 0
+
+        self._pending = []  # [(kind, row), ...] in arrival order
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._failures = 0
+        self._next_attempt = 0.0
+
+        if self.spool_path:
+            self._pending = self._load_spool()
+            if self._pending:
+                print(f"📂 Restored {len(self._pending)} unsent rows from {self.spool_path}")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    # --------------------------------------------------
+    # Buffering
+    # --------------------------------------------------
+    def add(self, kind, row):
+        """Queue one row for the table identified by `kind`."""
+        with self._lock:
+            self._pending.append((kind, row))
+            if self.spool_path:
+                self._append_spool([(kind, row)])
+
+    def should_flush(self):
+        with self._lock:
+            if not self._pending:
+                return False
+            if time.monotonic() < self._next_attempt:
+                return False
+            return (len(self._pending) >= self.max_batch or
+                    time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def maybe_flush(self):
+        """Flush only if the size or age threshold has been reached."""
+        if self.should_flush():
+            return self.flush()
+        return False
+
+    def flush(self, force=False):
+        """
+        Send everything pending to the sink, `max_batch` rows per call grouped
+        by kind. Returns True once the backlog is empty, False if rows were
+        kept for a later retry.
+        """
+        with self._flush_lock:
+            done = 0
+            try:
+                while True:
+                    with self._lock:
+                        if not self._pending:
+                            self._last_flush = time.monotonic()
+                            return True
+                        if not force and time.monotonic() < self._next_attempt:
+                            return False
+                        taken = self._pending[:self.max_batch]
+
+                    batch = {}
+                    for kind, row in taken:
+                        batch.setdefault(kind, []).append(row)
+
+                    try:
+                        self.sink(batch)
+                    except Exception as e:
+                        if not self.permanent_error(e):
+                            with self._lock:
+                                self._failures += 1
+                                delay = min(self.retry_base * (2 ** (self._failures - 1)), self.retry_max)
+                                self._next_attempt = time.monotonic() + delay
+                            print(f"⚠ Flush of {len(taken)} rows failed ({e}); retrying in {delay}s")
+                            return False
+                        self._reject(taken, e)
+
+                    with self._lock:
+                        # Rows added while the sink was running stay queued
+                        self._pending = self._pending[len(taken):]
+                        self._failures = 0
+                        self._next_attempt = 0.0
+                    done += len(taken)
+            finally:
+                # One spool rewrite per drain; a crash mid-drain re-sends (at-least-once)
+                if done and self.spool_path:
+                    with self._lock:
+                        self._rewrite_spool(self._pending)
+
+    def _reject(self, entries, error):
+        self.rejected += len(entries)
+        print(f"🗑 Batch of {len(entries)} rows rejected ({error}); "
+              + (f"moved to {self.spool_path}.rejected" if self.spool_path else "dropped"))
+        if self.spool_path:
+            with open(f"{self.spool_path}.rejected", "a", encoding="utf-8") as f:
+                for kind, row in entries:
+                    f.write(json.dumps({"kind": kind, "row": row, "error": str(error)},
+                                       default=self._encode) + "\n")
+
+    # --------------------------------------------------
+    # Local spool (JSON lines)
+    # --------------------------------------------------
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime):
+            return {"$dt": value.isoformat()}
+        raise TypeError(f"Cannot spool value of type {type(value).__name__}")
+
+    @staticmethod
+    def _decode(obj):
+        if len(obj) == 1 and "$dt" in obj:
+            return datetime.fromisoformat(obj["$dt"])
+        return obj
+
+    def _append_spool(self, entries):
+        with open(self.spool_path, "a", encoding="utf-8") as f:
+            for kind, row in entries:
+                f.write(json.dumps({"kind": kind, "row": row}, default=self._encode) + "\n")
+
+    def _rewrite_spool(self, entries):
+        tmp_path = f"{self.spool_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for kind, row in entries:
+                f.write(json.dumps({"kind": kind, "row": row}, default=self._encode) + "\n")
+        os.replace(tmp_path, self.spool_path)
+
+    def _load_spool(self):
+        if not os.path.exists(self.spool_path):
+            return []
+        entries = []
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    item = json.loads(line, object_hook=self._decode)
+                except ValueError:
+                    # A torn last line from a crash mid-write — skip it
+                    continue
+                entries.append((item["kind"], item["row"]))
+        return entries
@@ -43,6 +43,8 @@ CREATE TABLE system_metrics (
     Network_Latency FLOAT,
     Error_Rate FLOAT,
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_metrics_system_time (system_id, timestamp),
+    INDEX idx_metrics_time (timestamp),
     FOREIGN KEY (system_id) REFERENCES system_info(system_id) ON DELETE CASCADE
 );
 
@@ -56,6 +58,7 @@ CREATE TABLE prediction_log (
     probability FLOAT,
     estimated_time_to_downtime INT,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_predictions_system_created (system_id, created_at),
     FOREIGN KEY (system_id) REFERENCES system_info(system_id) ON DELETE CASCADE
 );
 
@@ -86,8 +89,48 @@ CREATE TABLE notifications (
     risk_level ENUM('Low', 'Medium', 'High') DEFAULT 'Low',
     status ENUM('Unread', 'Read') DEFAULT 'Unread',
     sent_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    claim_token VARCHAR(32),              -- set by the claim that is delivering it
+    claimed_until DATETIME,               -- UTC; redelivered after this unless acked
+    delivery_count INT NOT NULL DEFAULT 0,
+    INDEX idx_notifications_system_status (system_id, status),
+    INDEX idx_notifications_claim_token (claim_token),
     FOREIGN KEY (admin_id) REFERENCES admin(admin_id) ON DELETE CASCADE,
     FOREIGN KEY (system_id) REFERENCES system_info(system_id) ON DELETE CASCADE
 );
 
+-- ==========================================================
+-- 8️⃣ Metric Rollups — Downsampled history (1m / 5m / 1h / 1d)
+-- ==========================================================
+CREATE TABLE metric_rollups (
+    rollup_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    system_id INT NOT NULL,
+    resolution INT NOT NULL,              -- bucket width in seconds
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    CPU_Usage_min FLOAT, CPU_Usage_max FLOAT, CPU_Usage_avg FLOAT, CPU_Usage_p95 FLOAT,
+    Memory_Usage_min FLOAT, Memory_Usage_max FLOAT, Memory_Usage_avg FLOAT, Memory_Usage_p95 FLOAT,
+    Disk_IO_min FLOAT, Disk_IO_max FLOAT, Disk_IO_avg FLOAT, Disk_IO_p95 FLOAT,
+    Network_Latency_min FLOAT, Network_Latency_max FLOAT, Network_Latency_avg FLOAT, Network_Latency_p95 FLOAT,
+    Error_Rate_min FLOAT, Error_Rate_max FLOAT, Error_Rate_avg FLOAT, Error_Rate_p95 FLOAT,
+    UNIQUE KEY uq_rollup_bucket (system_id, resolution, bucket_start),
+    INDEX idx_rollups_resolution_bucket (resolution, bucket_start),
+    FOREIGN KEY (system_id) REFERENCES system_info(system_id) ON DELETE CASCADE
+);
+
+-- ==========================================================
+-- 9️⃣ Job Leases — Leader election for background jobs
+-- ==========================================================
+CREATE TABLE job_leases (
+    job_name VARCHAR(64) PRIMARY KEY,
+    owner VARCHAR(128) NOT NULL,          -- host:pid:nonce of the leader
+    expires_at DATETIME NOT NULL,         -- UTC; renewed every ttl/3
+    state TEXT                            -- JSON progress for the next leader
+);
 
+-- ==========================================================
+-- 🔟 Rollup Watermarks — Last raw metric_id folded into metric_rollups
+-- ==========================================================
+CREATE TABLE rollup_watermarks (
+    source VARCHAR(64) PRIMARY KEY,       -- e.g. 'system_metrics'
+    last_id BIGINT NOT NULL DEFAULT 0
+);
@@ -1,11 +1,19 @@
 import os
+import gzip
+import json
+import sys
 import time
 import threading
-import joblib
-from datetime import datetime
-from flask import Flask, jsonify, request
+from datetime import datetime, timedelta
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
 from database.db_config import db, init_db
 from database.models import (
     Admin,
@@ -13,8 +21,22 @@ from database.models import (
     SystemMetrics,
     PredictionLog,
     Notification,
+    MetricRollup,
 )
 from utils.notifier import send_alert
+from utils.ingest import IngestError, decode_batch, write_batch
+from utils.alert_pipeline import PREDICTION_TAIL_INTERVAL, AlertPipeline, tail_predictions
+from utils.notify_hub import NotificationHub, feed_hub_from_db
+from utils.notify_claims import CLAIM_LIMIT, CLAIM_VISIBILITY, ack_claimed, claim_pushed, claim_unread
+from utils.live_state import LiveStateStore, fleet_overview, serialize_status, start_live_state_tail
+from utils.response_cache import cache_from_env
+from utils.history import CursorError, History
+from utils.export import EXPORT_TABLES, FORMATS, load_watermarks, run_export
+from utils.leader import LeaderLease
+from utils.retention import RETENTION_ENABLED, hot_window_start, start_retention_thread
+from utils.model_registry import LATEST_POINTER, ModelRegistry
+from utils.inference import InferenceOverloaded, InferenceUnavailable, MicroBatcher
+from utils.rollups import ROLLUP_INTERVAL, TIERS, pick_resolution, serialize_rollup, start_rollup_thread
 
 # =======================================================
 # 🚀 Flask Setup
@@ -23,15 +45,99 @@ app = Flask(__name__)
 CORS(app)
 init_db(app)
 
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+
+@app.after_request
+def gzip_response(response):
+    """Compress larger JSON responses for clients that send Accept-Encoding: gzip."""
+    if (response.is_streamed or response.direct_passthrough
+            or response.mimetype != "application/json"
+            or "Content-Encoding" in response.headers
+            or "gzip" not in request.headers.get("Accept-Encoding", "").lower()):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=5))
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+# =======================================================
+# 🚨 Alert Pipeline (fed by /api/ingest + prediction_log tail)
+# =======================================================
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", "2"))
+NOTIFY_FEED_INTERVAL = float(os.getenv("NOTIFY_FEED_INTERVAL", "0.5"))  # multi-worker: DB -> local hub
+
+# Agents hold one SSE connection each; new notifications are pushed through the hub
+NOTIFY_STREAM_MAX = float(os.getenv("NOTIFY_STREAM_MAX", "300"))  # seconds before the agent reconnects
+NOTIFY_KEEPALIVE = float(os.getenv("NOTIFY_KEEPALIVE", "15"))     # idle comment interval
+
+# An open stream pins one request handler for NOTIFY_STREAM_MAX. That is only
+# affordable with greenlet workers (gunicorn -k gevent / eventlet) or the
+# thread-per-request dev server; sync WSGI workers would run out of threads
+# for ingest and the dashboard, so there the endpoint answers 503 and agents
+# poll /claim instead. NOTIFY_STREAMING=auto|on|off
+app.config["NOTIFY_STREAMING"] = {"on": True, "off": False}.get(os.getenv("NOTIFY_STREAMING", "auto"))
+
+
+def async_worker():
+    """True under gevent/eventlet monkey-patching (an idle stream costs a greenlet, not a thread)."""
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched("socket"):
+            return True
+    except ImportError:
+        pass
+    try:
+        import eventlet.patcher
+        return eventlet.patcher.is_monkey_patched("socket")
+    except ImportError:
+        return False
+
+
+def streaming_enabled():
+    mode = app.config["NOTIFY_STREAMING"]
+    return async_worker() if mode is None else mode
+
+notify_hub = NotificationHub()
+
+# Read-endpoint cache: RESPONSE_CACHE=memory|sqlite|off (sqlite is shared by workers)
+CACHE_TTL_SYSTEMS = float(os.getenv("CACHE_TTL_SYSTEMS", "60"))
+CACHE_TTL_METRICS = float(os.getenv("CACHE_TTL_METRICS", "10"))
+CACHE_TTL_PREDICTIONS = float(os.getenv("CACHE_TTL_PREDICTIONS", "10"))
+response_cache = cache_from_env()
+
+
+def invalidate_written(kind, system_ids):
+    """New metrics / predictions for a system drop only that system's cached reads."""
+    response_cache.invalidate(*(f"{kind}:{sid}" for sid in system_ids))
+
+
+# Latest metrics + prediction per system, served from memory
+LIVE_STATE_TAIL_INTERVAL = float(os.getenv("LIVE_STATE_TAIL_INTERVAL", "5"))  # 0 = off
+live_state = LiveStateStore(on_update=invalidate_written)
+alert_pipeline = AlertPipeline(app, send_alert=send_alert, workers=ALERT_WORKERS, hub=notify_hub)
+
 # =======================================================
 # 🧠 Load ML Model & Scaler
 # =======================================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "models", "model_latest.joblib")
 SCALER_PATH = os.path.join(BASE_DIR, "models", "scaler_latest.joblib")
+LATEST_PATH = os.path.join(BASE_DIR, "models", LATEST_POINTER)  # promoted version (train_model.py)
+
+model_registry = ModelRegistry(MODEL_PATH, SCALER_PATH, latest_path=LATEST_PATH)
+model_registry.reload_if_changed()
 
-model = joblib.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
-scaler = joblib.load(SCALER_PATH) if os.path.exists(SCALER_PATH) else None
+# Shared micro-batching inference for all agents (POST /api/infer)
+inference_batcher = MicroBatcher(
+    model_registry,
+    max_batch=int(os.getenv("INFER_MAX_BATCH", "256")),
+    max_wait_ms=float(os.getenv("INFER_MAX_WAIT_MS", "20")),
+    queue_size=int(os.getenv("INFER_QUEUE_SIZE", "10000")),
+).start()
 
 # =======================================================
 # 🩺 Health Check
@@ -40,6 +146,62 @@ scaler = joblib.load(SCALER_PATH) if os.path.exists(SCALER_PATH) else None
 def home():
     return jsonify({"message": "✅ Backend running and monitoring prediction logs"})
 
+# =======================================================
+# 🧠 Active Model Version
+# =======================================================
+@app.route("/api/model", methods=["GET"])
+def model_info():
+    return jsonify(model_registry.info()), 200
+
+
+# =======================================================
+# ⚡ Batch Inference Service
+# =======================================================
+@app.route("/api/infer", methods=["POST"])
+def infer():
+    """
+    Body: {"features": [[f1, ..., fN], ...]} (or a single flat row).
+    Rows from concurrent callers are scored together in micro-batches.
+    """
+    data = request.get_json(silent=True) or {}
+    features = data.get("features")
+    if not features:
+        return jsonify({"error": "features is required"}), 400
+
+    try:
+        results, version = inference_batcher.predict(features)
+    except InferenceOverloaded as e:
+        res = jsonify({"error": str(e)})
+        res.headers["Retry-After"] = str(e.retry_after)
+        return res, 503
+    except InferenceUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 504
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "model_version": version,
+        "predictions": [
+            {"downtime_risk": label, "probability": prob} for label, prob in results
+        ],
+    }), 200
+
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit rate of the read-endpoint response cache (this worker's lookups)."""
+    return jsonify(response_cache.info()), 200
+
+
+@app.route("/api/infer/stats", methods=["GET"])
+def infer_stats():
+    return jsonify(inference_batcher.stats), 200
+
+
 # =======================================================
 # 🔹 Register New Admin + System
 # =======================================================
@@ -73,6 +235,7 @@ def register_admin():
         )
         db.session.add(system)
         db.session.commit()
+        response_cache.invalidate(f"admin:{admin.admin_id}")
 
         return jsonify({
             "message": "✅ Registration successful",
@@ -99,6 +262,21 @@ def login_admin():
         if not admin or not check_password_hash(admin.password_hash, password):
             return jsonify({"error": "Invalid credentials"}), 401
 
+        # Agents in HTTP mode send their hostname so the node gets linked on first login
+        system_name = data.get("system_name")
+        if system_name and not SystemInfo.query.filter_by(
+            admin_id=admin.admin_id, system_name=system_name
+        ).first():
+            db.session.add(SystemInfo(
+                system_name=system_name,
+                ip_address=request.remote_addr,
+                location="Remote Node",
+                registered_at=datetime.utcnow(),
+                admin_id=admin.admin_id,
+            ))
+            db.session.commit()
+            response_cache.invalidate(f"admin:{admin.admin_id}")
+
         systems = SystemInfo.query.filter_by(admin_id=admin.admin_id).all()
         sys_data = [{"system_id": s.system_id, "system_name": s.system_name} for s in systems]
 
@@ -111,6 +289,7 @@ def login_admin():
         }), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
@@ -118,6 +297,7 @@ def login_admin():
 # 🔹 Fetch All Systems (for Admin)
 # =======================================================
 @app.route("/api/systems/<int:admin_id>", methods=["GET"])
+@response_cache.cached("systems", CACHE_TTL_SYSTEMS, tag=lambda admin_id: f"admin:{admin_id}")
 def get_systems(admin_id):
     try:
         systems = SystemInfo.query.filter_by(admin_id=admin_id).all()
@@ -135,27 +315,158 @@ def get_systems(admin_id):
         return jsonify({"error": str(e)}), 500
 
 
+# =======================================================
+# 🛰 Fleet Overview (all systems of an admin, one query)
+# =======================================================
+@app.route("/api/fleet/<int:admin_id>", methods=["GET"])
+def get_fleet(admin_id):
+    """Latest metrics, latest prediction, risk level and unread alerts per system."""
+    try:
+        systems = fleet_overview(db.session, admin_id)
+        return jsonify({
+            "admin_id": admin_id,
+            "count": len(systems),
+            "at_risk": sum(1 for s in systems if s["risk_level"] in ("Medium", "High")),
+            "systems": systems,
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # =======================================================
 # 🔹 Fetch Metrics for a System
 # =======================================================
 @app.route("/api/metrics/<int:system_id>", methods=["GET"])
+@response_cache.cached("metrics", CACHE_TTL_METRICS, tag=lambda system_id: f"metrics:{system_id}")
 def get_metrics(system_id):
+    """
+    Latest 30 raw rows by default. With ?start=&end= (ISO 8601) and an optional
+    ?resolution=raw|1m|5m|1h|1d|auto, returns that range from the cheapest tier.
+    ?cursor= / ?limit= / ?order= page through the full history and
+    ?format=ndjson streams it (see history_response).
+    """
+    if any(k in request.args for k in HISTORY_ARGS):
+        return history_response(metric_history, system_id, serialize_metric)
+    if any(k in request.args for k in ("start", "end", "resolution")):
+        return get_metric_range(system_id)
+
     try:
-        metrics = SystemMetrics.query.filter_by(system_id=system_id).order_by(
-            SystemMetrics.recorded_at.desc()
-        ).limit(30).all()
+        query = SystemMetrics.query.filter_by(system_id=system_id)
+        since = hot_window_start()
+        if since:
+            query = query.filter(SystemMetrics.recorded_at >= since)
+        metrics = query.order_by(SystemMetrics.recorded_at.desc()).limit(30).all()
 
-        return jsonify([
-            {
-                "timestamp": m.recorded_at.strftime("%Y-%m-%d %H:%M:%S"),
-                "cpu_usage": m.CPU_Usage,
-                "memory_usage": m.Memory_Usage,
-                "disk_io": m.Disk_IO,
-                "network_latency": m.Network_Latency,
-                "error_rate": m.Error_Rate,
-            }
-            for m in metrics
-        ])
+        return jsonify([serialize_metric(m) for m in metrics])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+RAW_RANGE_LIMIT = 10000
+HISTORY_ARGS = ("cursor", "limit", "order", "format")
+
+metric_history = History(SystemMetrics, SystemMetrics.recorded_at, SystemMetrics.metric_id)
+prediction_history = History(PredictionLog, PredictionLog.created_at, PredictionLog.prediction_id)
+
+
+def history_response(history, system_id, serialize):
+    """
+    Keyset pages: {"items": [...], "next_cursor": "..."} — pass next_cursor back
+    as ?cursor= until it is null. ?order=asc|desc (default desc), ?limit= (100),
+    optional ?start=/?end= bounds. ?format=ndjson streams every row instead
+    (oldest first unless ?order=desc) with constant memory.
+    """
+    try:
+        start = request.args.get("start")
+        start = datetime.fromisoformat(start) if start else None
+        end = request.args.get("end")
+        end = datetime.fromisoformat(end) if end else None
+        cursor = request.args.get("cursor")
+
+        if request.args.get("format") == "ndjson":
+            descending = request.args.get("order") == "desc"
+            lines = history.stream(system_id, serialize, cursor, descending, start, end)
+            first = next(lines, "")  # surfaces a bad cursor as a 400, not a broken stream
+            return Response(
+                stream_with_context(_chain(first, lines)),
+                mimetype="application/x-ndjson",
+                headers={"X-Accel-Buffering": "no"},
+            )
+
+        descending = request.args.get("order", "desc") != "asc"
+        limit = request.args.get("limit", 100, type=int)
+        rows, next_cursor = history.page(system_id, cursor, limit, descending, start, end)
+        return jsonify({"items": [serialize(r) for r in rows], "next_cursor": next_cursor})
+    except (CursorError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _chain(first, rest):
+    if first:
+        yield first
+    yield from rest
+
+
+def serialize_metric(m):
+    return {
+        "metric_id": m.metric_id,
+        "timestamp": m.recorded_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "cpu_usage": m.CPU_Usage,
+        "memory_usage": m.Memory_Usage,
+        "disk_io": m.Disk_IO,
+        "network_latency": m.Network_Latency,
+        "error_rate": m.Error_Rate,
+    }
+
+
+def get_metric_range(system_id):
+    try:
+        end = request.args.get("end")
+        start = request.args.get("start")
+        start = datetime.fromisoformat(start) if start else None
+        if end:
+            end = datetime.fromisoformat(end)
+        else:
+            # Writers store naive wall-clock times (IST on the agents), not UTC:
+            # anchor the default window on the newest stored row instead
+            latest = db.session.query(db.func.max(SystemMetrics.recorded_at)).filter(
+                SystemMetrics.system_id == system_id).scalar()
+            end = latest + timedelta(seconds=1) if latest else datetime.now()
+            if start and start >= end:
+                end = start + timedelta(hours=1)  # nothing stored after start yet
+        start = start or end - timedelta(hours=1)
+        if start >= end:
+            raise ValueError("start must be before end")
+        resolution = pick_resolution(start, end, request.args.get("resolution"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        if resolution == "raw":
+            rows = SystemMetrics.query.filter(
+                SystemMetrics.system_id == system_id,
+                SystemMetrics.recorded_at >= start,
+                SystemMetrics.recorded_at < end,
+            ).order_by(SystemMetrics.recorded_at.asc()).limit(RAW_RANGE_LIMIT).all()
+            points = [serialize_metric(m) for m in rows]
+        else:
+            rows = MetricRollup.query.filter(
+                MetricRollup.system_id == system_id,
+                MetricRollup.resolution == TIERS[resolution],
+                MetricRollup.bucket_start >= start,
+                MetricRollup.bucket_start < end,
+            ).order_by(MetricRollup.bucket_start.asc()).all()
+            points = [serialize_rollup(r) for r in rows]
+
+        return jsonify({
+            "system_id": system_id,
+            "resolution": resolution,
+            "start": start.strftime("%Y-%m-%d %H:%M:%S"),
+            "end": end.strftime("%Y-%m-%d %H:%M:%S"),
+            "points": points,
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -164,67 +475,103 @@ def get_metrics(system_id):
 # 🔹 Fetch Prediction Logs
 # =======================================================
 @app.route("/api/predictions/<int:system_id>", methods=["GET"])
+@response_cache.cached("predictions", CACHE_TTL_PREDICTIONS, tag=lambda system_id: f"predictions:{system_id}")
 def get_predictions(system_id):
+    """Latest 30 predictions; ?cursor= / ?limit= / ?order= / ?format=ndjson for full history."""
+    if any(k in request.args for k in HISTORY_ARGS):
+        return history_response(prediction_history, system_id, serialize_prediction)
+
     try:
-        preds = PredictionLog.query.filter_by(system_id=system_id).order_by(
-            PredictionLog.created_at.desc()
-        ).limit(30).all()
+        query = PredictionLog.query.filter_by(system_id=system_id)
+        since = hot_window_start()
+        if since:
+            query = query.filter(PredictionLog.created_at >= since)
+        preds = query.order_by(PredictionLog.created_at.desc()).limit(30).all()
 
-        return jsonify([
-            {
-                "prediction_id": p.prediction_id,
-                "probability": p.probability,
-                "downtime_risk": p.downtime_risk,
-                "estimated_time_to_downtime": p.estimated_time_to_downtime,
-                "predicted_at": p.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            for p in preds
-        ])
+        return jsonify([serialize_prediction(p) for p in preds])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+def serialize_prediction(p):
+    return {
+        "prediction_id": p.prediction_id,
+        "probability": p.probability,
+        "downtime_risk": p.downtime_risk,
+        "estimated_time_to_downtime": p.estimated_time_to_downtime,
+        "predicted_at": p.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+# =======================================================
+# 📥 Bulk Ingest (Agents → Backend)
+# =======================================================
+@app.route("/api/ingest", methods=["POST"])
+def ingest_batch():
+    """
+    Accepts a (gzip-compressed) JSON batch from an agent:
+    {"metrics": [...], "predictions": [...], "notifications": [...]}
+    and stores it with one multi-row INSERT per table.
+    """
+    try:
+        batch = decode_batch(request.get_data(), request.headers.get("Content-Encoding"))
+    except IngestError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        counts = write_batch(batch)
+        live_state.update_metrics(batch.get("metrics", []))
+        live_state.update_predictions(batch.get("predictions", []))
+        if alert_pipeline.running:
+            alert_pipeline.publish(batch.get("predictions", []))
+        for n in batch.get("notifications", []):
+            notify_hub.publish(n["system_id"], {"notification_id": n["notification_id"],
+                                                "message": n["message"], "risk_level": n.get("risk_level")})
+        return jsonify({"message": "✅ Batch stored", "stored": counts}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # =======================================================
 # 🔹 Public Endpoint for Streamlit (Real-Time Metrics)
 # =======================================================
 @app.route("/api/predict", methods=["GET"])
 def public_predict():
-    """Return the most recent system metrics from DB instead of random simulation."""
+    """Live status of whichever system reported last (from the last-value store)."""
     try:
-        from database.models import SystemMetrics  # ensure correct import
+        live_state.ensure_warm()
+        system_id = live_state.latest_system_id()
+        if system_id is None:
+            return jsonify({"error": "No metrics recorded yet"}), 404
+        return predict_for_system(system_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        latest_metric = (
-            db.session.query(SystemMetrics)
-            .order_by(SystemMetrics.metric_id.desc())
-            .first()
-        )
 
-        if not latest_metric:
-            return jsonify({"error": "No metrics recorded yet"}), 404
+@app.route("/api/predict/<int:system_id>", methods=["GET"])
+def predict_for_system(system_id):
+    """Latest metrics and logged prediction of one system, straight from memory."""
+    try:
+        live_state.ensure_warm()
+        entry = live_state.get(system_id)
+        if entry is None:
+            return jsonify({"error": "No data for this system yet"}), 404
+        return jsonify(serialize_status(system_id, live_state.system_name(system_id), entry)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Safely handle timestamp field (might be named differently)
-        ts = None
-        if hasattr(latest_metric, "timestamp"):
-            ts = latest_metric.timestamp
-        elif hasattr(latest_metric, "created_at"):
-            ts = latest_metric.created_at
-        elif hasattr(latest_metric, "recorded_at"):
-            ts = latest_metric.recorded_at
-
-        data = {
-            "system_name": f"System {latest_metric.system_id}",
-            "CPU_Usage": latest_metric.CPU_Usage,
-            "Memory_Usage": latest_metric.Memory_Usage,
-            "Disk_IO": latest_metric.Disk_IO,
-            "Network_Latency": latest_metric.Network_Latency,
-            "Error_Rate": latest_metric.Error_Rate,
-            "Prediction": (
-                "⚠ Downtime Risk" if latest_metric.Error_Rate > 3 else "✅ Normal Operation"
-            ),
-            "Risk_Probability": f"{min(latest_metric.Error_Rate * 20, 99.9):.2f}%",
-            "Timestamp": ts.strftime("%Y-%m-%d %H:%M:%S") if ts else "N/A",
-        }
-
-        return jsonify(data), 200
 
+@app.route("/api/predict/fleet", methods=["GET"])
+def predict_fleet():
+    """Live status of every known system (?admin_id= to narrow it to one admin)."""
+    try:
+        live_state.ensure_warm()
+        admin_id = request.args.get("admin_id", type=int)
+        entries = live_state.snapshot(admin_id)
+        return jsonify({
+            "systems": [
+                serialize_status(sid, live_state.system_name(sid), entry)
+                for sid, entry in sorted(entries.items())
+            ]
+        }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -232,95 +579,240 @@ def public_predict():
 # =======================================================
 # 🔹 Agent Fetch Unread Notifications
 # =======================================================
+def claim_args(source):
+    limit = max(1, min(source.get("limit", CLAIM_LIMIT, type=int), CLAIM_LIMIT))
+    visibility = max(1.0, source.get("visibility", CLAIM_VISIBILITY, type=float))
+    return limit, visibility
+
+
 @app.route("/api/notifications/<int:system_id>", methods=["GET"])
 def fetch_notifications(system_id):
-    """Agent polls this endpoint to get unread notifications."""
+    """
+    Agent polls this endpoint to get unread notifications. Returns at most
+    `limit` (oldest first) and marks them read in the same UPDATE; `more`
+    tells the caller to poll again right away.
+    """
     try:
-        unread = Notification.query.filter_by(system_id=system_id, status="Unread").all()
+        limit, _ = claim_args(request.args)
+        _, rows = claim_unread(system_id, limit, ack=True)
+        return jsonify({"notifications": rows, "more": len(rows) == limit}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
 
-        notif_data = [
-            {
-                "notification_id": n.notification_id,
-                "message": n.message,
-                "risk_level": n.risk_level,
-                "sent_time": n.sent_time.strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            for n in unread
-        ]
 
-        # Mark them as read
-        for n in unread:
-            n.status = "Read"
-        db.session.commit()
+@app.route("/api/notifications/<int:system_id>/claim", methods=["POST"])
+def claim_notifications(system_id):
+    """
+    At-least-once delivery: claim up to `limit` unread notifications for
+    `visibility` seconds. Ack them with the returned claim_token; anything
+    not acked by then is handed out again (delivery_count counts attempts).
+    """
+    try:
+        limit, visibility = claim_args(request.args)
+        token, rows = claim_unread(system_id, limit, visibility)
+        return jsonify({
+            "claim_token": token,
+            "visibility": visibility,
+            "notifications": rows,
+            "more": len(rows) == limit,
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
 
-        return jsonify({"notifications": notif_data}), 200
+@app.route("/api/notifications/<int:system_id>/ack", methods=["POST"])
+def ack_notifications(system_id):
+    """Body: {"claim_token": ..., "notification_ids": [...] (optional, default all)}."""
+    data = request.get_json(silent=True) or {}
+    if not data.get("claim_token"):
+        return jsonify({"error": "claim_token is required"}), 400
+    try:
+        acked = ack_claimed(system_id, data["claim_token"], data.get("notification_ids"))
+        return jsonify({"acked": acked}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
-# =======================================================
-# 🔹 Watch Prediction Log for New Entries
-# =======================================================
-def watch_predictions():
-    """Watches for new prediction_log rows and adds notifications automatically."""
-    print("👀 Watching prediction_log for new entries...")
-    last_seen_id = 0
+@app.route("/api/notifications/admin/<int:admin_id>", methods=["GET"])
+def admin_notifications(admin_id):
+    """
+    Read-only notification feed for dashboards (does not mark anything read).
+    ?after_id=N returns only newer rows, oldest first, so viewers fetch
+    incrementally; without it the latest `limit` rows are returned.
+    """
+    try:
+        after_id = request.args.get("after_id", 0, type=int)
+        limit = min(request.args.get("limit", 50, type=int), 500)
+        query = Notification.query.filter(Notification.admin_id == admin_id)
+        if after_id:
+            rows = query.filter(Notification.notification_id > after_id).order_by(
+                Notification.notification_id.asc()).limit(limit).all()
+        else:
+            rows = query.order_by(Notification.notification_id.desc()).limit(limit).all()[::-1]
 
-    while True:
-        try:
-            with app.app_context():
-                new_logs = PredictionLog.query.filter(
-                    PredictionLog.prediction_id > last_seen_id
-                ).order_by(PredictionLog.prediction_id.asc()).all()
-
-                for log in new_logs:
-                    system = SystemInfo.query.get(log.system_id)
-                    if not system:
-                        continue
-
-                    prob = log.probability or 0.0
-
-                    if prob >= 75:
-                        risk_level = "High" if prob >= 85 else "Medium"
-                        msg = (
-                            f"⚠ {risk_level} Downtime Risk Detected for {system.system_name} "
-                            f"({prob:.2f}%)"
-                        )
-
-                        exists = Notification.query.filter_by(
-                            system_id=system.system_id, message=msg
-                        ).first()
-
-                        if not exists:
-                            notif = Notification(
-                                admin_id=system.admin_id,
-                                system_id=system.system_id,
-                                message=msg,
-                                risk_level=risk_level,
-                                status="Unread",
-                            )
-                            db.session.add(notif)
-                            db.session.commit()
-
-                            print(f"🚨 New Notification for {system.system_name} ({risk_level} Risk)")
-
-                            try:
-                                send_alert(system.system_id, msg)
-                            except Exception:
-                                pass
-
-                    last_seen_id = log.prediction_id
+        return jsonify({
+            "notifications": [
+                {
+                    "notification_id": n.notification_id,
+                    "system_id": n.system_id,
+                    "message": n.message,
+                    "risk_level": n.risk_level,
+                    "status": n.status,
+                    "sent_time": n.sent_time.strftime("%Y-%m-%d %H:%M:%S") if n.sent_time else None,
+                }
+                for n in rows
+            ],
+            "last_id": rows[-1].notification_id if rows else after_id,
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+
+@app.route("/api/notifications/<int:system_id>/stream", methods=["GET"])
+def stream_notifications(system_id):
+    """
+    Server-Sent Events for one agent: replays unread notifications, then
+    pushes new ones from the hub as they are created. Idle connections cost
+    no queries; the stream closes after NOTIFY_STREAM_MAX and the agent
+    reconnects (picking up anything it missed from the Unread backlog).
+    Answers 503 on sync workers (see NOTIFY_STREAMING); agents then poll.
+    """
+    if not streaming_enabled():
+        res = jsonify({"error": "Streaming is disabled on this server; poll /claim instead"})
+        res.headers["Retry-After"] = str(max(1, int(NOTIFY_STREAM_MAX)))
+        return res, 503
+
+    def sse(n):
+        return f"event: notification\ndata: {json.dumps(n)}\n\n"
+
+    def events():
+        # Subscribe before reading the backlog so nothing falls in between;
+        # claim_pushed() drops anything the backlog already delivered.
+        sub = notify_hub.subscribe(system_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                _, backlog = claim_unread(system_id, ack=True)
+                for n in backlog:
+                    yield sse(n)
+                if len(backlog) < CLAIM_LIMIT:
+                    break
+            deadline = time.monotonic() + NOTIFY_STREAM_MAX
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                items = sub.get(timeout=min(NOTIFY_KEEPALIVE, remaining))
+                if not items:
+                    yield ": keepalive\n\n"
+                    continue
+                for n in items:
+                    if claim_pushed(system_id, n["notification_id"]):
+                        yield sse({**n, "sent_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
         except Exception as e:
-            print(f"⚠ Watcher Error: {e}")
+            db.session.rollback()
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            notify_hub.unsubscribe(sub)
 
-        time.sleep(8)
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# =======================================================
+# 📦 Columnar Export for Training
+# =======================================================
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(BASE_DIR, "exports"))
+
+
+def _run_export_job(lease, tables, incremental, fmt):
+    # Exports share EXPORT_DIR and its watermarks across every web worker and
+    # host, so they run under a DB lease; the result is kept in its state
+    lease.start()
+    state = {"last_run": None, "error": None}
+    try:
+        with app.app_context(), db.engine.connect() as conn:
+            state["last_run"] = run_export(conn, EXPORT_DIR, tables, incremental, fmt)
+    except Exception as e:
+        state = {**lease.load_state(), "error": str(e)}
+    finally:
+        lease.save_state(state)
+        lease.release()
+
+
+@app.route("/api/export", methods=["POST"])
+def start_export():
+    """
+    Start a background export: {"tables": [...], "incremental": true, "format": "parquet|arrow|npy"}.
+    Poll GET /api/export for the result.
+    """
+    data = request.get_json(silent=True) or {}
+    tables = data.get("tables") or list(EXPORT_TABLES)
+    fmt = data.get("format")
+    if any(t not in EXPORT_TABLES for t in tables) or (fmt and fmt not in FORMATS):
+        return jsonify({"error": "Unknown table or format"}), 400
+
+    lease = LeaderLease(app, "export")
+    if not lease.try_acquire():
+        return jsonify({"error": "Export already running"}), 409
+    threading.Thread(
+        target=_run_export_job, args=(lease, tables, data.get("incremental", True), fmt), daemon=True
+    ).start()
+    return jsonify({"message": "📦 Export started", "out_dir": EXPORT_DIR}), 202
+
+
+@app.route("/api/export", methods=["GET"])
+def export_status():
+    lease = LeaderLease(app, "export")
+    state = {"last_run": None, "error": None, **lease.load_state()}
+    return jsonify({"running": lease.holder() is not None, **state,
+                    "watermarks": load_watermarks(EXPORT_DIR)}), 200
 
 
 # =======================================================
 # 🚀 Run Flask Server
 # =======================================================
+def start_web_services(inline_jobs=False):
+    """
+    Start the per-process background threads. Every web worker keeps its own
+    model watcher and live-state tail. The alert pipeline, prediction tail,
+    retention and rollups must run exactly once, so they only start here
+    with inline_jobs=True (single-process dev server); under a multi-worker
+    WSGI server they belong to worker.py, which runs them under DB leases.
+    """
+    model_registry.start_watching()
+
+    with app.app_context():
+        print(f"⚡ Live state warmed for {live_state.warm()} systems")
+    if LIVE_STATE_TAIL_INTERVAL > 0:
+        start_live_state_tail(app, live_state, LIVE_STATE_TAIL_INTERVAL)
+
+    if not inline_jobs:
+        # Alerts are written by the worker process; relay them to our SSE streams
+        if NOTIFY_FEED_INTERVAL > 0:
+            feed_hub_from_db(app, notify_hub, NOTIFY_FEED_INTERVAL)
+        return
+
+    alert_pipeline.start()
+    if PREDICTION_TAIL_INTERVAL > 0:
+        watcher_thread = threading.Thread(
+            target=tail_predictions,
+            args=(app, alert_pipeline, PREDICTION_TAIL_INTERVAL),
+            daemon=True,
+        )
+        watcher_thread.start()
+    if RETENTION_ENABLED:
+        start_retention_thread(app)
+    if ROLLUP_INTERVAL > 0:
+        start_rollup_thread(app)
+
+
 if __name__ == "__main__":
     print("🧠 Registered Routes:")
     for rule in app.url_map.iter_rules():
@@ -328,7 +820,10 @@ if __name__ == "__main__":
 
     print("\n✅ Flask backend running at: http://0.0.0.0:5000\n")
 
-    watcher_thread = threading.Thread(target=watch_predictions, daemon=True)
-    watcher_thread.start()
-
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Development server: one process, so background jobs run inline; it
+    # starts a thread per request, so streams don't starve other requests
+    start_web_services(inline_jobs=True)
+    if app.config["NOTIFY_STREAMING"] is None:
+        app.config["NOTIFY_STREAMING"] = True
+    app.run(host="0.0.0.0", port=5000, debug=os.getenv("FLASK_DEBUG", "1") == "1",
+            threaded=True, use_reloader=False)
@@ -0,0 +1,118 @@
+"""
+Notification delivery with a large backlog: the old load-all + per-row
+UPDATE poll versus bounded claims (one UPDATE per batch), and duplicate
+deliveries when several pollers drain the same system concurrently.
+
+    cd backend
+    python -m benchmarks.bench_claims                          # temp SQLite file
+    python -m benchmarks.bench_claims --pending 50000 --url mysql+mysqlconnector://...
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from flask import Flask
+
+from database.db_config import db
+from database.models import Admin, SystemInfo, Notification
+from utils.notify_claims import ack_claimed, claim_unread
+
+
+def seed(pending):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(Admin.__table__.insert(), [{"admin_id": 1, "name": "bench", "email": "b@x", "password_hash": "x"}])
+    db.session.execute(SystemInfo.__table__.insert(), [{"system_id": 1, "system_name": "node-1", "admin_id": 1}])
+    db.session.execute(Notification.__table__.insert(), [
+        {"admin_id": 1, "system_id": 1, "message": f"alert {i}", "risk_level": "High", "status": "Unread"}
+        for i in range(pending)
+    ])
+    db.session.commit()
+
+
+def legacy_take(system_id):
+    """The previous fetch_notifications: every unread row, one UPDATE per row."""
+    unread = Notification.query.filter_by(system_id=system_id, status="Unread").all()
+    ids = [n.notification_id for n in unread]
+    for n in unread:
+        n.status = "Read"
+    db.session.commit()
+    return ids
+
+
+def claim_take(system_id, limit):
+    token, rows = claim_unread(system_id, limit)
+    ack_claimed(system_id, token)
+    return [r["notification_id"] for r in rows]
+
+
+def drain(app, take, pollers):
+    """Run `pollers` threads calling take() until it returns nothing; returns (ms, calls, ids)."""
+    delivered, calls, lock = [], [0], threading.Lock()
+
+    def run():
+        with app.app_context():
+            while True:
+                try:
+                    ids = take()
+                except Exception:
+                    db.session.rollback()  # SQLite "database is locked" under contention
+                    continue
+                if not ids:
+                    return
+                with lock:
+                    delivered.extend(ids)
+                    calls[0] += 1
+
+    threads = [threading.Thread(target=run) for _ in range(pollers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return (time.perf_counter() - t0) * 1000, calls[0], delivered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pending", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pollers", type=int, default=4)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmp = None
+    if not args.url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.url = f"sqlite:///{tmp.name}"
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = args.url
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 30}} if args.url.startswith("sqlite") else {}
+    db.init_app(app)
+
+    cases = [
+        ("load all + N UPDATEs", lambda: legacy_take(1)),
+        (f"claim {args.limit} + ack", lambda: claim_take(1, args.limit)),
+    ]
+    print(f"📬 {args.pending:,} pending notifications for one system\n")
+    print(f"{'approach':<24}{'pollers':>8}{'drain':>12}{'calls':>8}{'per call':>12}{'duplicates':>12}")
+    with app.app_context():
+        for name, take in cases:
+            for pollers in (1, args.pollers):
+                seed(args.pending)
+                ms, calls, ids = drain(app, take, pollers)
+                dupes = sum(c - 1 for c in Counter(ids).values())
+                missing = args.pending - len(set(ids))
+                print(f"{name:<24}{pollers:>8}{ms:>10.1f}ms{calls:>8}{ms / calls:>10.1f}ms{dupes:>12,}"
+                      + (f"  ({missing} missing)" if missing else ""))
+        db.engine.dispose()
+
+    if tmp:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
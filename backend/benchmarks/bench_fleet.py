@@ -0,0 +1,109 @@
+"""
+/api/fleet cost at fleet scale: the single latest-per-group query versus the
+2N+1 pattern (list systems, then latest metrics + predictions per system).
+
+    cd backend
+    python -m benchmarks.bench_fleet                           # temp SQLite file
+    python -m benchmarks.bench_fleet --systems 10000 --url mysql+mysqlconnector://...
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from database.models import Admin, SystemInfo, SystemMetrics, PredictionLog, Notification
+from utils.live_state import fleet_overview
+
+TABLES = [t.__table__ for t in (Admin, SystemInfo, SystemMetrics, PredictionLog, Notification)]
+
+
+def seed(engine, systems, rows_per_system):
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Admin.__table__.insert(), [{"admin_id": 1, "name": "bench", "email": "b@x", "password_hash": "x"}])
+        conn.execute(SystemInfo.__table__.insert(), [
+            {"system_id": s, "system_name": f"node-{s}", "admin_id": 1} for s in range(1, systems + 1)
+        ])
+        for k in range(rows_per_system):
+            ts = start + timedelta(minutes=k)
+            conn.execute(SystemMetrics.__table__.insert(), [
+                {"system_id": s, "timestamp": ts, "CPU_Usage": random.random() * 100,
+                 "Memory_Usage": random.random() * 100, "Disk_IO": random.random() * 50,
+                 "Network_Latency": random.random() * 100, "Error_Rate": random.random() * 5}
+                for s in range(1, systems + 1)
+            ])
+            conn.execute(PredictionLog.__table__.insert(), [
+                {"system_id": s, "downtime_risk": False, "probability": random.random() * 100, "created_at": ts}
+                for s in range(1, systems + 1)
+            ])
+        conn.execute(Notification.__table__.insert(), [
+            {"admin_id": 1, "system_id": random.randint(1, systems), "message": "bench", "status": "Unread"}
+            for _ in range(systems // 2)
+        ])
+
+
+def per_system_pattern(conn, systems):
+    sids = [r[0] for r in conn.execute(text("SELECT system_id FROM system_info WHERE admin_id = 1"))]
+    for sid in sids[:systems]:
+        conn.execute(text("SELECT * FROM system_metrics WHERE system_id = :s ORDER BY timestamp DESC LIMIT 30"),
+                     {"s": sid}).fetchall()
+        conn.execute(text("SELECT * FROM prediction_log WHERE system_id = :s ORDER BY created_at DESC LIMIT 30"),
+                     {"s": sid}).fetchall()
+
+
+def timed(fn, samples):
+    timings = []
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--systems", type=int, default=10000)
+    parser.add_argument("--rows-per-system", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmp = None
+    if not args.url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.url = f"sqlite:///{tmp.name}"
+    engine = create_engine(args.url)
+    for t in reversed(TABLES):
+        t.drop(engine, checkfirst=True)
+    for t in TABLES:
+        t.create(engine)
+
+    print(f"🌱 Seeding {args.systems:,} systems × {args.rows_per_system} samples...")
+    seed(engine, args.systems, args.rows_per_system)
+
+    with engine.connect() as conn:
+        fleet_ms = timed(lambda: fleet_overview(conn, 1), args.samples)
+        per_system_ms = timed(lambda: per_system_pattern(conn, args.systems), 1)
+
+    print(f"\n{'approach':<28}{'queries':>10}{'p50':>12}")
+    print(f"{'fleet (one query)':<28}{1:>10}{fleet_ms:>10.1f}ms")
+    print(f"{'per system (2N+1)':<28}{2 * args.systems + 1:>10,}{per_system_ms:>10.1f}ms")
+
+    engine.dispose()
+    if tmp:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
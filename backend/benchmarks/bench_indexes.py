@@ -0,0 +1,113 @@
+"""
+Latency of the hot "latest 30 rows for one system" queries before and after
+the composite time-series indexes, on a seeded large table.
+
+    cd backend
+    python -m benchmarks.bench_indexes                         # temp SQLite file
+    python -m benchmarks.bench_indexes --rows 20000000 --url mysql+mysqlconnector://...
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from database.models import SystemMetrics, PredictionLog
+
+HOT_QUERIES = {
+    "metrics": (
+        SystemMetrics.__table__,
+        "SELECT * FROM system_metrics WHERE system_id = :sid ORDER BY timestamp DESC LIMIT 30",
+    ),
+    "predictions": (
+        PredictionLog.__table__,
+        "SELECT * FROM prediction_log WHERE system_id = :sid ORDER BY created_at DESC LIMIT 30",
+    ),
+}
+
+
+def seed(engine, rows, systems, chunk=50000):
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk):
+            n = min(chunk, rows - offset)
+            ts = [start + timedelta(seconds=60 * (offset + i) // systems) for i in range(n)]
+            conn.execute(SystemMetrics.__table__.insert(), [
+                {"system_id": (offset + i) % systems + 1, "timestamp": ts[i],
+                 "CPU_Usage": random.random() * 100, "Memory_Usage": random.random() * 100,
+                 "Disk_IO": random.randint(0, 500), "Network_Latency": random.random() * 100,
+                 "Error_Rate": random.random() * 5}
+                for i in range(n)
+            ])
+            conn.execute(PredictionLog.__table__.insert(), [
+                {"system_id": (offset + i) % systems + 1, "downtime_risk": False,
+                 "probability": random.random() * 100, "created_at": ts[i]}
+                for i in range(n)
+            ])
+
+
+def time_query(engine, sql, systems, samples):
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(samples):
+            sid = random.randint(1, systems)
+            t0 = time.perf_counter()
+            conn.execute(text(sql), {"sid": sid}).fetchall()
+            timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--systems", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmp = None
+    if not args.url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        args.url = f"sqlite:///{tmp.name}"
+    engine = create_engine(args.url)
+
+    tables = [t for t, _ in HOT_QUERIES.values()]
+    for t in tables:
+        t.drop(engine, checkfirst=True)
+        t.create(engine)
+        for index in t.indexes:
+            index.drop(engine)
+
+    print(f"🌱 Seeding {args.rows:,} rows per table across {args.systems:,} systems...")
+    t0 = time.perf_counter()
+    seed(engine, args.rows, args.systems)
+    print(f"   done in {time.perf_counter() - t0:.1f}s\n")
+
+    results = {}
+    for name, (_, sql) in HOT_QUERIES.items():
+        results[name] = [time_query(engine, sql, args.systems, args.samples)]
+
+    for t in tables:
+        for index in t.indexes:
+            t0 = time.perf_counter()
+            index.create(engine)
+            print(f"🛠 Built {index.name} in {time.perf_counter() - t0:.1f}s")
+
+    for name, (_, sql) in HOT_QUERIES.items():
+        results[name].append(time_query(engine, sql, args.systems, args.samples))
+
+    print(f"\n{'query':<12}{'before p50':>12}{'before max':>12}{'after p50':>12}{'after max':>12}{'speedup':>10}")
+    for name, ((b50, bmax), (a50, amax)) in results.items():
+        print(f"{name:<12}{b50:>10.2f}ms{bmax:>10.2f}ms{a50:>10.2f}ms{amax:>10.2f}ms{b50 / a50:>9.0f}x")
+
+    engine.dispose()
+    if tmp:
+        os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
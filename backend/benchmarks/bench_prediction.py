@@ -0,0 +1,67 @@
+"""
+Per-call cost of `predict` + `predict_proba` (two model passes) versus the
+shared `common.prediction.predict_batch` (one predict_proba pass).
+
+    cd backend
+    python -m benchmarks.bench_prediction
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from common.prediction import predict_batch
+
+MODELS = {
+    "RandomForest(100)": lambda: RandomForestClassifier(n_estimators=100, random_state=0),
+    "GradientBoosting(100)": lambda: GradientBoostingClassifier(n_estimators=100, random_state=0),
+    "LogisticRegression": lambda: LogisticRegression(max_iter=500),
+}
+
+
+def two_pass(model, scaler, X):
+    scaled = scaler.transform(X)
+    return model.predict(scaled), model.predict_proba(scaled)[:, 1] * 100
+
+
+def per_call_ms(fn, repeat):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, args.features))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+
+    print(f"{'model':<24}{'rows':>6}{'predict+proba':>16}{'predict_batch':>16}{'saved':>8}")
+    for name, make in MODELS.items():
+        model = make().fit(scaler.transform(X), y)
+        for rows in (1, 256):
+            batch = X[:rows]
+            before = per_call_ms(lambda: two_pass(model, scaler, batch), args.repeat)
+            after = per_call_ms(lambda: predict_batch(model, scaler, batch), args.repeat)
+            print(f"{name:<24}{rows:>6}{before:>14.3f}ms{after:>14.3f}ms{(1 - after / before) * 100:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
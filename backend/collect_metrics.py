@@ -1,12 +1,21 @@
-import psutil
 import socket
-import joblib
-import numpy as np
 import os
+import sys
 from datetime import datetime
 import pytz
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from utils.model_registry import LATEST_POINTER, ModelRegistry
+from common.prediction import predict_one
+from common.features import FeaturePipeline
+from common.sampler import MetricSampler
+from common.prober import LatencyProber, default_targets
 # NOTE: Removed 'from models import db, SystemHistory' as models are defined below
 # The original code had redundant import of db and SystemHistory, which are defined later.
 
@@ -89,16 +98,28 @@ class SystemHistory(db.Model):
 # ======================================================
 # 🔹 Collect Real-Time Metrics
 # ======================================================
+SAMPLE_INTERVAL = float(os.getenv("SAMPLE_INTERVAL", "5"))  # seconds
+
+# Background snapshots; Disk_IO is a real MB/s rate from counter deltas
+sampler = MetricSampler(interval=SAMPLE_INTERVAL)
+
+# Concurrent TCP/HTTP latency probes (PROBE_TARGETS, default: the database server)
+PROBE_INTERVAL = float(os.getenv("PROBE_INTERVAL", "15"))  # seconds
+PROBE_TIMEOUT = float(os.getenv("PROBE_TIMEOUT", "2"))  # seconds per probe
+prober = LatencyProber(default_targets("localhost:3306"), timeout=PROBE_TIMEOUT, interval=PROBE_INTERVAL)
+
+
 def collect_metrics():
-    """Collects real-time system usage metrics using psutil."""
-    # NOTE: Disk_IO is tracked as MB read/sec since last call, adjusted for 1s interval.
-    # In a real system, you might want to track cumulative, or use a difference between two calls.
+    """Aggregates the sampler's snapshots since the previous call (non-blocking)."""
+    window = sampler.take_window()
+    probes = prober.take_window()
     return {
-        "CPU_Usage": psutil.cpu_percent(interval=1),
-        "Memory_Usage": psutil.virtual_memory().percent,
-        "Disk_IO": psutil.disk_io_counters().read_bytes / (1024 * 1024),  # MB read (approx)
-        "Network_Latency": np.random.uniform(1, 10),  # Simulated latency in ms
-        "Error_Rate": np.random.uniform(0, 0.05),  # Simulated error rate
+        "CPU_Usage": round(window["CPU_Usage"]["mean"], 2),
+        "Memory_Usage": round(window["Memory_Usage"]["mean"], 2),
+        "Disk_IO": round(window["Disk_IO"]["mean"], 3),  # MB/s read + write
+        "Network_Latency": probes["Network_Latency"],  # mean probe RTT in ms
+        "Error_Rate": probes["Error_Rate"],  # % of failed probes
+        "window": window,
         "timestamp": datetime.now(IST)
     }
 
@@ -106,48 +127,40 @@ def collect_metrics():
 # ======================================================
 # 🔹 Run Prediction + Save Results
 # ======================================================
-MODEL_PATH = "model.pkl"
-SCALER_PATH = "scaler.pkl"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model_latest.joblib")
+SCALER_PATH = os.path.join(BASE_DIR, "models", "scaler_latest.joblib")
+LATEST_PATH = os.path.join(BASE_DIR, "models", LATEST_POINTER)
+
+# Loaded once, swapped in place when a new version is promoted
+model_registry = ModelRegistry(MODEL_PATH, SCALER_PATH, latest_path=LATEST_PATH)
+
+# Rolling-window features in the order of features.pkl (diff / roll_mean / roll_std)
+feature_pipeline = FeaturePipeline()
 
 def make_prediction(metrics):
     """
-    Loads model and scaler, makes a prediction on current metrics, 
-    and saves metrics, prediction, and history to the database.
+    Predicts on current metrics with the in-memory model and saves metrics,
+    prediction, and history to the database.
     """
     with app.app_context():
-        # Check model/scaler availability
-        if not (os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH)):
+        # Update the rolling windows every cycle, even while no model is loaded
+        features = feature_pipeline.update(socket.gethostname(), metrics)
+
+        # One snapshot per cycle: a hot swap never mixes model and scaler versions
+        active = model_registry.current
+        if active is None:
+            model_registry.reload_if_changed()
+            active = model_registry.current
+        if active is None:
             print("⚠️ Model or Scaler not found. Please ensure both files exist.")
             print("  Skipping prediction and logging, but database setup is complete.")
             return
-
-        try:
-            model = joblib.load(MODEL_PATH)
-            scaler = joblib.load(SCALER_PATH)
-        except Exception as e:
-            print(f"❌ Error loading model or scaler: {e}")
-            return
+        model, scaler = active.model, active.scaler
 
 
-        # Prepare features for model (Assuming model expects 20 features for consistency)
-        features = [
-            metrics["CPU_Usage"],
-            metrics["Memory_Usage"],
-            metrics["Disk_IO"],
-            metrics["Network_Latency"],
-            metrics["Error_Rate"]
-        ]
-        # Pad features to meet the expected 20 feature input of a mock model
-        while len(features) < 20:
-            features.append(0.0)
-
-        scaled = scaler.transform([features])
-        prediction_value = model.predict(scaled)[0]
-        probability_value = (
-            model.predict_proba(scaled)[0][1] * 100
-            if hasattr(model, "predict_proba")
-            else None
-        )
+        # One probability evaluation gives both the label and the probability
+        prediction_value, probability_value = predict_one(model, scaler, features)
 
         print("\n🕒 Prediction Time (IST):", metrics["timestamp"].strftime("%Y-%m-%d %H:%M:%S %Z%z"))
         print("=" * 36)
@@ -250,7 +263,11 @@ if __name__ == "__main__":
         print("📚 Database tables checked/created.")
 
     print("🚀 Starting Continuous Real-Time System Metric Collection...")
-    print("NOTE: You must have 'model.pkl' and 'scaler.pkl' in the same directory for predictions to run.")
+    print(f"NOTE: Predictions need {MODEL_PATH} and {SCALER_PATH}; they are reloaded automatically when replaced.")
+    model_registry.reload_if_changed()
+    model_registry.start_watching()
+    sampler.start()
+    prober.start()
 
     while True:
         metrics = collect_metrics()
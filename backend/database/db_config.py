@@ -15,6 +15,16 @@ def init_db(app):
 
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # One small shared pool for the whole fleet (agents post to /api/ingest
+    # instead of each holding their own MySQL connection)
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(getenv('DB_POOL_SIZE', '10')),
+            'max_overflow': int(getenv('DB_MAX_OVERFLOW', '5')),
+            'pool_recycle': 280,
+            'pool_pre_ping': True,
+        }
+
     db.init_app(app)
 
     with app.app_context():
@@ -0,0 +1,118 @@
+"""
+Idempotent schema migrations for existing databases.
+
+db.create_all() only creates missing tables; it never touches tables that
+already exist. Each step here inspects the live schema and applies only what
+is missing, so it is safe to run on every deploy:
+
+    cd backend && python -m database.migrate
+"""
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from .db_config import db, init_db
+from .models import SystemMetrics, PredictionLog, Notification, MetricRollup, JobLease, RollupWatermark
+
+
+def add_missing_indexes(conn, models):
+    applied = []
+    inspector = inspect(conn)
+    for model in models:
+        table = model.__table__
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            # Indexes on columns a later migration adds wait for that migration
+            if index.name not in existing and {c.name for c in index.columns} <= columns:
+                index.create(conn)
+                applied.append(index.name)
+    return applied
+
+
+# =======================================================
+# 001 — Composite time-series indexes
+# =======================================================
+def add_time_series_indexes(conn):
+    return add_missing_indexes(conn, (SystemMetrics, PredictionLog, Notification))
+
+
+# =======================================================
+# 003 — Metric rollup table + time-range index
+# =======================================================
+def add_metric_rollups(conn):
+    applied = []
+    if not inspect(conn).has_table(MetricRollup.__tablename__):
+        MetricRollup.__table__.create(conn)
+        applied.append(MetricRollup.__tablename__)
+    return applied + add_missing_indexes(conn, (SystemMetrics, MetricRollup))
+
+
+# =======================================================
+# 004 — Leader leases for background jobs (worker.py)
+# =======================================================
+def add_job_leases(conn):
+    if inspect(conn).has_table(JobLease.__tablename__):
+        return []
+    JobLease.__table__.create(conn)
+    return [JobLease.__tablename__]
+
+
+# =======================================================
+# 005 — Claim/ack columns on notifications
+# =======================================================
+def add_notification_claims(conn):
+    applied = []
+    table = Notification.__table__
+    inspector = inspect(conn)
+    if not inspector.has_table(table.name):
+        return applied
+    existing = {c["name"] for c in inspector.get_columns(table.name)}
+    for name in ("claim_token", "claimed_until", "delivery_count"):
+        if name in existing:
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(conn.dialect)}"
+        if column.server_default is not None:
+            ddl += f" NOT NULL DEFAULT {column.server_default.arg}"
+        conn.execute(text(ddl))
+        applied.append(f"{table.name}.{name}")
+    return applied + add_missing_indexes(conn, (Notification,))
+
+
+# =======================================================
+# 006 — Rollup watermarks (dirty buckets tracked by metric_id)
+# =======================================================
+def add_rollup_watermarks(conn):
+    if inspect(conn).has_table(RollupWatermark.__tablename__):
+        return []
+    RollupWatermark.__table__.create(conn)
+    return [RollupWatermark.__tablename__]
+
+
+# 002 (partitioning) is MySQL-only and opt-in: see migrations/002_partition_time_series.sql
+MIGRATIONS = [
+    ("001_time_series_indexes", add_time_series_indexes),
+    ("003_metric_rollups", add_metric_rollups),
+    ("004_job_leases", add_job_leases),
+    ("005_notification_claims", add_notification_claims),
+    ("006_rollup_watermarks", add_rollup_watermarks),
+]
+
+
+def run_migrations(app):
+    with app.app_context():
+        for name, step in MIGRATIONS:
+            with db.engine.begin() as conn:
+                applied = step(conn)
+            if applied:
+                print(f"✅ {name}: {', '.join(applied)}")
+            else:
+                print(f"➖ {name}: already applied")
+
+
+if __name__ == "__main__":
+    migrate_app = Flask(__name__)
+    init_db(migrate_app)
+    run_migrations(migrate_app)
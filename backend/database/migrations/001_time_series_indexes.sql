@@ -0,0 +1,22 @@
+-- ==========================================================
+-- 001 — Composite time-series indexes (existing databases)
+-- ==========================================================
+-- Serves the hot "latest N rows for one system" queries of
+-- /api/metrics, /api/predictions and /api/notifications from the
+-- index instead of a filesort. InnoDB builds them online.
+--
+-- Equivalent, idempotent alternative:  cd backend && python -m database.migrate
+-- ==========================================================
+USE CPUMETRIC;
+
+ALTER TABLE system_metrics
+    ADD INDEX idx_metrics_system_time (system_id, timestamp),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE prediction_log
+    ADD INDEX idx_predictions_system_created (system_id, created_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE notifications
+    ADD INDEX idx_notifications_system_status (system_id, status),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,50 @@
+-- ==========================================================
+-- 002 — Time-range partitioning for system_metrics / prediction_log
+-- ==========================================================
+-- Optional; enables the partition-based retention job
+-- (RETENTION_ENABLED=1, see utils/retention.py).
+--
+-- MySQL requirements for partitioned tables:
+--   * the partition column must be part of every unique key (incl. the PK)
+--   * partitioned InnoDB tables cannot have foreign keys
+--
+-- Everything before today goes into p_history (expired by the job once it is
+-- older than the retention window). The job then splits daily/monthly
+-- partitions out of the empty pmax ahead of time.
+--
+-- Rebuilds both tables: run in a maintenance window (or via pt-online-schema-change).
+-- FK names below are MySQL's defaults; check SHOW CREATE TABLE first.
+-- ==========================================================
+USE CPUMETRIC;
+
+-- ---------- system_metrics ----------
+ALTER TABLE system_metrics
+    DROP FOREIGN KEY system_metrics_ibfk_1,
+    MODIFY timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (metric_id, timestamp);
+
+SET @sql = CONCAT(
+    'ALTER TABLE system_metrics PARTITION BY RANGE (TO_DAYS(timestamp)) (',
+    'PARTITION p_history VALUES LESS THAN (', TO_DAYS(CURDATE()), '), ',
+    'PARTITION pmax VALUES LESS THAN MAXVALUE)'
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- ---------- prediction_log ----------
+ALTER TABLE prediction_log
+    DROP FOREIGN KEY prediction_log_ibfk_1,
+    MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (prediction_id, created_at);
+
+SET @sql = CONCAT(
+    'ALTER TABLE prediction_log PARTITION BY RANGE (TO_DAYS(created_at)) (',
+    'PARTITION p_history VALUES LESS THAN (', TO_DAYS(CURDATE()), '), ',
+    'PARTITION pmax VALUES LESS THAN MAXVALUE)'
+);
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,29 @@
+-- ==========================================================
+-- 003 — Metric rollup tiers (existing databases)
+-- ==========================================================
+-- Adds the downsampled history table used by /api/metrics?start=&end=
+-- and a plain time index so the rollup job can scan new raw rows by range.
+--
+-- Equivalent, idempotent alternative:  cd backend && python -m database.migrate
+-- ==========================================================
+USE CPUMETRIC;
+
+ALTER TABLE system_metrics
+    ADD INDEX idx_metrics_time (timestamp),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+CREATE TABLE IF NOT EXISTS metric_rollups (
+    rollup_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    system_id INT NOT NULL,
+    resolution INT NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    samples INT NOT NULL,
+    CPU_Usage_min FLOAT, CPU_Usage_max FLOAT, CPU_Usage_avg FLOAT, CPU_Usage_p95 FLOAT,
+    Memory_Usage_min FLOAT, Memory_Usage_max FLOAT, Memory_Usage_avg FLOAT, Memory_Usage_p95 FLOAT,
+    Disk_IO_min FLOAT, Disk_IO_max FLOAT, Disk_IO_avg FLOAT, Disk_IO_p95 FLOAT,
+    Network_Latency_min FLOAT, Network_Latency_max FLOAT, Network_Latency_avg FLOAT, Network_Latency_p95 FLOAT,
+    Error_Rate_min FLOAT, Error_Rate_max FLOAT, Error_Rate_avg FLOAT, Error_Rate_p95 FLOAT,
+    UNIQUE KEY uq_rollup_bucket (system_id, resolution, bucket_start),
+    INDEX idx_rollups_resolution_bucket (resolution, bucket_start),
+    FOREIGN KEY (system_id) REFERENCES system_info(system_id) ON DELETE CASCADE
+);
@@ -0,0 +1,16 @@
+-- ==========================================================
+-- 004 — Leader leases for background jobs (existing databases)
+-- ==========================================================
+-- One row per background job (alerts, retention, rollups). The worker
+-- process that holds an unexpired lease is the only one running that job.
+--
+-- Equivalent, idempotent alternative:  cd backend && python -m database.migrate
+-- ==========================================================
+USE CPUMETRIC;
+
+CREATE TABLE IF NOT EXISTS job_leases (
+    job_name VARCHAR(64) PRIMARY KEY,
+    owner VARCHAR(128) NOT NULL,          -- host:pid:nonce of the leader
+    expires_at DATETIME NOT NULL,         -- UTC; renewed every ttl/3
+    state TEXT                            -- JSON progress for the next leader
+);
@@ -0,0 +1,16 @@
+-- ==========================================================
+-- 005 — Claim/ack delivery columns on notifications (existing databases)
+-- ==========================================================
+-- A poller claims up to N Unread rows with one UPDATE (claim_token +
+-- claimed_until); the rows become Read when acknowledged, or deliverable
+-- again once claimed_until passes.
+--
+-- Equivalent, idempotent alternative:  cd backend && python -m database.migrate
+-- ==========================================================
+USE CPUMETRIC;
+
+ALTER TABLE notifications
+    ADD COLUMN claim_token VARCHAR(32) NULL,
+    ADD COLUMN claimed_until DATETIME NULL,
+    ADD COLUMN delivery_count INT NOT NULL DEFAULT 0,
+    ADD INDEX idx_notifications_claim_token (claim_token);
@@ -0,0 +1,14 @@
+-- ==========================================================
+-- 006 — Rollup watermarks (existing databases)
+-- ==========================================================
+-- The rollup job re-aggregates exactly the buckets touched by raw rows
+-- newer than last_id, so agents that flush late are still rolled up.
+--
+-- Equivalent, idempotent alternative:  cd backend && python -m database.migrate
+-- ==========================================================
+USE CPUMETRIC;
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    source VARCHAR(64) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0
+);
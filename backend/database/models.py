@@ -1,6 +1,9 @@
 from datetime import datetime
 from .db_config import db
 
+# BIGINT keys auto-increment on MySQL; SQLite only does that for INTEGER PRIMARY KEY
+BigIntPK = db.BigInteger().with_variant(db.Integer, "sqlite")
+
 
 # 👤 Admin Table
 class Admin(db.Model):
@@ -38,13 +41,17 @@ class SystemInfo(db.Model):
 # 📊 Real-Time Metrics
 class SystemMetrics(db.Model):
     __tablename__ = "system_metrics"
+    __table_args__ = (
+        db.Index("idx_metrics_system_time", "system_id", "timestamp"),
+        db.Index("idx_metrics_time", "timestamp"),  # time-range scans for rollups
+    )
 
-    metric_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    metric_id = db.Column(BigIntPK, primary_key=True, autoincrement=True)
     system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
 
     CPU_Usage = db.Column(db.Float, nullable=False)
     Memory_Usage = db.Column(db.Float, nullable=False)
-    Disk_IO = db.Column(db.BigInteger, nullable=False)
+    Disk_IO = db.Column(db.Float, nullable=False)  # MB/s (matches FLOAT in Serverhealthdb.sql)
     Network_Latency = db.Column(db.Float, nullable=False)
     Error_Rate = db.Column(db.Float, nullable=False)
 
@@ -56,8 +63,11 @@ class SystemMetrics(db.Model):
 # 🤖 Prediction Log
 class PredictionLog(db.Model):
     __tablename__ = "prediction_log"
+    __table_args__ = (
+        db.Index("idx_predictions_system_created", "system_id", "created_at"),
+    )
 
-    prediction_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    prediction_id = db.Column(BigIntPK, primary_key=True, autoincrement=True)
     system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
     predicted_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
 
@@ -88,8 +98,12 @@ class SystemHistory(db.Model):
 # 🔔 Notifications Table
 class Notification(db.Model):
     __tablename__ = "notifications"
+    __table_args__ = (
+        db.Index("idx_notifications_system_status", "system_id", "status"),
+        db.Index("idx_notifications_claim_token", "claim_token"),
+    )
 
-    notification_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    notification_id = db.Column(BigIntPK, primary_key=True, autoincrement=True)
     admin_id = db.Column(db.Integer, db.ForeignKey("admin.admin_id"), nullable=False)
     system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
     message = db.Column(db.Text, nullable=False)
@@ -97,9 +111,68 @@ class Notification(db.Model):
     sent_time = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     status = db.Column(db.Enum('Unread', 'Read'), default='Unread')
 
+    # Claim/ack delivery (utils/notify_claims.py): a claimed row stays Unread
+    # but is hidden from other pollers until claimed_until, then redelivered
+    claim_token = db.Column(db.String(32))
+    claimed_until = db.Column(db.DateTime)
+    delivery_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     # Optional relationships
     admin = db.relationship("Admin", back_populates="notifications", lazy=True)
     system = db.relationship("SystemInfo", lazy=True)
 
     def __repr__(self):
         return f"<Notification {self.notification_id} - {self.message[:30]}>"
+
+# 📈 Downsampled Metric Rollups (1m / 5m / 1h / 1d)
+class MetricRollup(db.Model):
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        db.UniqueConstraint("system_id", "resolution", "bucket_start", name="uq_rollup_bucket"),
+        db.Index("idx_rollups_resolution_bucket", "resolution", "bucket_start"),
+    )
+
+    rollup_id = db.Column(BigIntPK, primary_key=True, autoincrement=True)
+    system_id = db.Column(db.Integer, db.ForeignKey("system_info.system_id"), nullable=False)
+    resolution = db.Column(db.Integer, nullable=False)  # bucket width in seconds
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    samples = db.Column(db.Integer, nullable=False)
+
+    CPU_Usage_min = db.Column(db.Float)
+    CPU_Usage_max = db.Column(db.Float)
+    CPU_Usage_avg = db.Column(db.Float)
+    CPU_Usage_p95 = db.Column(db.Float)
+    Memory_Usage_min = db.Column(db.Float)
+    Memory_Usage_max = db.Column(db.Float)
+    Memory_Usage_avg = db.Column(db.Float)
+    Memory_Usage_p95 = db.Column(db.Float)
+    Disk_IO_min = db.Column(db.Float)
+    Disk_IO_max = db.Column(db.Float)
+    Disk_IO_avg = db.Column(db.Float)
+    Disk_IO_p95 = db.Column(db.Float)
+    Network_Latency_min = db.Column(db.Float)
+    Network_Latency_max = db.Column(db.Float)
+    Network_Latency_avg = db.Column(db.Float)
+    Network_Latency_p95 = db.Column(db.Float)
+    Error_Rate_min = db.Column(db.Float)
+    Error_Rate_max = db.Column(db.Float)
+    Error_Rate_avg = db.Column(db.Float)
+    Error_Rate_p95 = db.Column(db.Float)
+
+
+# 📌 Rollup Progress (last raw metric_id folded into the rollup tiers)
+class RollupWatermark(db.Model):
+    __tablename__ = "rollup_watermarks"
+
+    source = db.Column(db.String(64), primary_key=True)
+    last_id = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+# 🔒 Background-job Leader Leases (one owner per job across instances)
+class JobLease(db.Model):
+    __tablename__ = "job_leases"
+
+    job_name = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(128), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    state = db.Column(db.Text)  # JSON progress the next leader resumes from
@@ -0,0 +1,336 @@
+"""
+Builds the model + scaler that the backend and agents load.
+
+Reads system_history in id-ordered chunks, turns every row into the serving
+feature vector with the same streaming FeaturePipeline the agents use (so
+train and serve features cannot drift apart), and labels a row 1 when the
+same system reports downtime_detected within the next --horizon minutes.
+The scaler is fitted chunk by chunk on the training rows only (the
+time-split holdout stays unseen); the forest trains on all cores (--n-jobs). Artifacts are versioned, and a version is promoted by
+atomically replacing the models/LATEST pointer (one os.replace), so the
+backend's ModelRegistry always loads a matching model, scaler and feature
+list. The flat *_latest copies remain for agents that load files directly:
+
+    models/<version>/{model.joblib, scaler.joblib, features.pkl, report.json}
+    models/LATEST                 → "<version>"
+    models/model_latest.joblib, models/scaler_latest.joblib, features.pkl
+
+    cd backend
+    python train_model.py                       # DATABASE_URL or db_config default
+    python train_model.py --horizon 15 --n-jobs -1 --estimators 300
+    python train_model.py --memmap /var/tmp/train   # feature matrix on disk, not in RAM
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from database.db_config import db
+from database.models import SystemHistory
+from common.features import FEATURE_WINDOW, FeaturePipeline, load_feature_names
+from common.prediction import predict_batch
+from utils.model_registry import LATEST_POINTER
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+FEATURES_FILE = os.path.join(BASE_DIR, "features.pkl")
+TRAIN_CHUNK = int(os.getenv("TRAIN_CHUNK", "50000"))
+
+HISTORY_COLUMNS = {
+    "CPU_Usage": "cpu_usage", "Memory_Usage": "memory_usage", "Disk_IO": "disk_io",
+    "Network_Latency": "network_latency", "Error_Rate": "error_rate",
+}
+
+
+# =======================================================
+# 📥 Chunked dataset build
+# =======================================================
+def history_size(conn):
+    """(row count, highest id) of system_history, to size the arrays up front."""
+    t = SystemHistory.__table__
+    count, max_id = conn.execute(db.select(db.func.count(), db.func.max(t.c.id))).one()
+    return count, max_id or 0
+
+
+def iter_history(conn, chunk=TRAIN_CHUNK, max_id=None):
+    """Yields lists of system_history rows (up to max_id), keyset-paged on the primary key."""
+    t = SystemHistory.__table__
+    cols = [t.c.id, t.c.system_name, t.c.timestamp, t.c.downtime_detected,
+            *[t.c[c] for c in HISTORY_COLUMNS.values()]]
+    last_id = 0
+    while True:
+        query = db.select(*cols).where(t.c.id > last_id)
+        if max_id is not None:
+            query = query.where(t.c.id <= max_id)
+        rows = conn.execute(query.order_by(t.c.id).limit(chunk)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _grow(arr, rows):
+    """A copy of `arr` with room for at least `rows` rows (capacity doubles)."""
+    grown = np.empty((max(rows, 2 * len(arr)),) + arr.shape[1:], dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+
+def build_dataset(chunks, feature_names, horizon_minutes=15, window=FEATURE_WINDOW,
+                  capacity=0, x_buffer=None):
+    """
+    Returns (X float32, y int8, t datetime64). Rows are written in place into
+    arrays of `capacity` rows (or into `x_buffer`, e.g. a np.memmap), so the
+    peak is one X plus 9 bytes per row for labels and times; without a known
+    size the arrays grow by doubling. Only the look-ahead window of each
+    system is kept for labelling.
+    """
+    pipeline = FeaturePipeline(feature_names, window=window)
+    horizon = timedelta(minutes=horizon_minutes)
+    pending = {}  # system_name -> deque[(timestamp, row index)] still inside the horizon
+    X = x_buffer if x_buffer is not None else np.empty((capacity, len(feature_names)), dtype=np.float32)
+    y = np.zeros(len(X), dtype=np.int8)
+    times = np.empty(len(X), dtype="datetime64[s]")
+    n = 0
+
+    for rows in chunks:
+        if n + len(rows) > len(X):
+            X, y, times = (_grow(a, n + len(rows)) for a in (X, y, times))
+        for _, name, ts, down, *values in rows:
+            X[n] = pipeline.update(name, dict(zip(HISTORY_COLUMNS, values)))
+            y[n] = 0
+            times[n] = ts
+
+            window_rows = pending.setdefault(name, deque())
+            window_rows.append((ts, n))
+            while window_rows and window_rows[0][0] < ts - horizon:
+                window_rows.popleft()
+            if down:
+                for _, k in window_rows:
+                    y[k] = 1
+            n += 1
+
+    return X[:n], y[:n], times[:n]
+
+
+# =======================================================
+# 📏 Measurements
+# =======================================================
+def peak_memory_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:  # Windows
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+
+
+def inference_latency(model, scaler, X, single_samples=200, batch_samples=20):
+    """Median ms through the serving path (predict_batch) for 1 row and for 1,000 rows."""
+    def median_ms(rows, samples):
+        timings = []
+        for _ in range(samples):
+            t0 = time.perf_counter()
+            predict_batch(model, scaler, rows)
+            timings.append((time.perf_counter() - t0) * 1000)
+        return round(float(np.median(timings)), 3)
+
+    batch = X[np.arange(1000) % len(X)]
+    return {
+        "per_row_ms": median_ms(X[:1], single_samples),
+        "per_1000_rows_ms": median_ms(batch, batch_samples),
+    }
+
+
+def fit_scaler(X, rows, chunk=TRAIN_CHUNK):
+    """StandardScaler partial-fitted on X[rows], `chunk` rows at a time."""
+    scaler = StandardScaler()
+    for start in range(0, len(rows), chunk):
+        scaler.partial_fit(X[rows[start:start + chunk]])
+    return scaler
+
+
+def scale_rows(X, rows, scaler, chunk=TRAIN_CHUNK):
+    """scaler.transform(X[rows]) as one float32 array, built `chunk` rows at a time."""
+    out = np.empty((len(rows), X.shape[1]), dtype=np.float32)
+    for start in range(0, len(rows), chunk):
+        out[start:start + chunk] = scaler.transform(X[rows[start:start + chunk]])
+    return out
+
+
+def evaluate(model, scaler, X, y):
+    if len(X) == 0:
+        return {}
+    labels, probs = predict_batch(model, scaler, X)
+    report = {
+        "rows": int(len(y)),
+        "accuracy": round(float(accuracy_score(y, labels)), 4),
+        "precision": round(float(precision_score(y, labels, zero_division=0)), 4),
+        "recall": round(float(recall_score(y, labels, zero_division=0)), 4),
+    }
+    if len(set(y.tolist())) == 2:
+        report["roc_auc"] = round(float(roc_auc_score(y, probs / 100)), 4)
+    return report
+
+
+# =======================================================
+# 💾 Versioned artifacts
+# =======================================================
+def _atomic_copy(src, dst):
+    tmp = f"{dst}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def save_artifacts(model, scaler, feature_names, report, models_dir=MODELS_DIR,
+                   features_file=FEATURES_FILE, promote=True):
+    version = report["version"]
+    out = os.path.join(models_dir, version)
+    os.makedirs(out, exist_ok=True)
+    joblib.dump(model, os.path.join(out, "model.joblib"))
+    joblib.dump(scaler, os.path.join(out, "scaler.joblib"))
+    with open(os.path.join(out, "features.pkl"), "wb") as f:
+        pickle.dump(list(feature_names), f)
+    with open(os.path.join(out, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if promote:
+        _atomic_copy(os.path.join(out, "features.pkl"), features_file)
+        _atomic_copy(os.path.join(out, "scaler.joblib"), os.path.join(models_dir, "scaler_latest.joblib"))
+        _atomic_copy(os.path.join(out, "model.joblib"), os.path.join(models_dir, "model_latest.joblib"))
+        # The single switch the registry follows: the whole version at once
+        pointer = os.path.join(models_dir, LATEST_POINTER)
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+    return out
+
+
+# =======================================================
+# 🏋 Training
+# =======================================================
+def train(conn, horizon=15, n_jobs=-1, estimators=200, seed=42, test_fraction=0.2,
+          chunk=TRAIN_CHUNK, feature_names=None, memmap_dir=None):
+    """
+    Returns (model, scaler, feature_names, report). Memory is bounded by
+    rows × features × 4 bytes for X (on disk instead with `memmap_dir`), plus
+    a float32 scaled copy of the training rows for the forest.
+    """
+    feature_names = feature_names or load_feature_names(FEATURES_FILE)
+    started = time.perf_counter()
+
+    # Sized once from COUNT(*); rows added during the scan (id > max_id) are left out
+    count, max_id = history_size(conn)
+    x_buffer, memmap_file = None, None
+    if memmap_dir:
+        os.makedirs(memmap_dir, exist_ok=True)
+        memmap_file = os.path.join(memmap_dir, "train_X.npy")
+        x_buffer = np.lib.format.open_memmap(
+            memmap_file, mode="w+", dtype=np.float32, shape=(count, len(feature_names))
+        )
+    X, y, times = build_dataset(iter_history(conn, chunk, max_id), feature_names, horizon,
+                                capacity=count, x_buffer=x_buffer)
+    if len(X) == 0:
+        raise SystemExit("❌ system_history is empty — nothing to train on.")
+    if y.min() == y.max():
+        raise SystemExit("❌ Training data has a single class; need rows with and without downtime.")
+    load_seconds = time.perf_counter() - started
+
+    # Hold out the most recent rows (time split, no leakage from the future)
+    cutoff = np.sort(times)[int(len(times) * (1 - test_fraction))]
+    train_mask = times < cutoff
+    if train_mask.all() or not train_mask.any():
+        train_mask = np.arange(len(X)) < int(len(X) * (1 - test_fraction))
+
+    # Scaling statistics come from the training rows only, so the holdout stays unseen
+    train_rows = np.flatnonzero(train_mask)
+    scaler = fit_scaler(X, train_rows, chunk)
+    X_train = scale_rows(X, train_rows, scaler, chunk)
+    model = RandomForestClassifier(
+        n_estimators=estimators, n_jobs=n_jobs, class_weight="balanced",
+        min_samples_leaf=2, random_state=seed,
+    )
+    t0 = time.perf_counter()
+    model.fit(X_train, y[train_rows])
+    fit_seconds = time.perf_counter() - t0
+    del X_train
+    # Serving scores one row or a small micro-batch at a time, where thread
+    # fan-out costs more than it saves
+    model.set_params(n_jobs=1)
+
+    report = {
+        "version": datetime.utcnow().strftime("%Y%m%dT%H%M%SZ"),
+        "trained_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "rows": int(len(y)),
+        "positives": int(y.sum()),
+        "horizon_minutes": horizon,
+        "features": list(feature_names),
+        "params": {"n_estimators": estimators, "n_jobs": n_jobs, "random_state": seed, "chunk": chunk},
+        "timing_seconds": {
+            "load_and_featurize": round(load_seconds, 2),
+            "fit": round(fit_seconds, 2),
+            "total": round(time.perf_counter() - started, 2),
+        },
+        "holdout": evaluate(model, scaler, X[~train_mask], y[~train_mask]),
+        "inference_latency": inference_latency(model, scaler, X),
+        "peak_memory_mb": peak_memory_mb(),
+    }
+    if memmap_file:
+        del X, x_buffer
+        try:
+            os.remove(memmap_file)
+        except OSError:  # still mapped (Windows); overwritten by the next run
+            pass
+    return model, scaler, feature_names, report
+
+
+def print_report(report, out_dir):
+    t, lat = report["timing_seconds"], report["inference_latency"]
+    print(f"\n✅ Model {report['version']} → {out_dir}")
+    print(f"   rows={report['rows']:,} positives={report['positives']:,} horizon={report['horizon_minutes']}min")
+    print(f"   time: load+features {t['load_and_featurize']}s | fit {t['fit']}s | total {t['total']}s")
+    print(f"   peak memory: {report['peak_memory_mb']} MB")
+    print(f"   inference: {lat['per_row_ms']} ms/row | {lat['per_1000_rows_ms']} ms per 1,000 rows")
+    print(f"   holdout: {report['holdout']}")
+
+
+if __name__ == "__main__":
+    from flask import Flask
+    from database.db_config import init_db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horizon", type=int, default=15, help="minutes ahead a downtime counts as positive")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--estimators", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk", type=int, default=TRAIN_CHUNK)
+    parser.add_argument("--memmap", metavar="DIR", default=os.getenv("TRAIN_MEMMAP_DIR"),
+                        help="keep the feature matrix in DIR/train_X.npy instead of RAM")
+    parser.add_argument("--no-promote", action="store_true", help="only write models/<version>/")
+    args = parser.parse_args()
+
+    train_app = Flask(__name__)
+    init_db(train_app)
+    with train_app.app_context(), db.engine.connect() as conn:
+        model, scaler, names, report = train(
+            conn, args.horizon, args.n_jobs, args.estimators, args.seed, chunk=args.chunk,
+            memmap_dir=args.memmap,
+        )
+    print_report(report, save_artifacts(model, scaler, names, report, promote=not args.no_promote))
@@ -0,0 +1,335 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from database.db_config import db
+from database.models import SystemInfo, PredictionLog, Notification
+from utils.notify_claims import insert_notifications
+from common.alert_suppression import AlertSuppressor, digest_suffix
+
+# =======================================================
+# 🚨 Event-driven Alert Pipeline
+# =======================================================
+ALERT_THRESHOLD = 75
+HIGH_THRESHOLD = 85
+# How often prediction_log is tailed (0 = off); shared by the single-process
+# server and worker.py. Under a WSGI server ingest doesn't reach the worker's
+# pipeline, so this tail is the alert path there and has to be sub-second.
+PREDICTION_TAIL_INTERVAL = float(os.getenv("PREDICTION_TAIL_INTERVAL", "0.5"))
+
+
+def risk_level_for(prob):
+    return "High" if prob >= HIGH_THRESHOLD else "Medium"
+
+
+def alert_message(system_name, prob, risk_level=None):
+    return f"⚠ {risk_level or risk_level_for(prob)} Downtime Risk Detected for {system_name} ({prob:.2f}%)"
+
+
+def prediction_key(system_id, created_at):
+    """Identity of a prediction row as stored (naive, whole seconds); None if unknown."""
+    if created_at is None:
+        return None
+    try:
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        return system_id, created_at.replace(tzinfo=None, microsecond=0)
+    except (TypeError, ValueError, AttributeError):
+        # Unparseable time: the event still counts, it just can't be de-duplicated
+        return None
+
+
+class AlertPipeline:
+    """
+    Predictions are published onto an in-process queue; a small worker pool
+    drains it in batches, resolves systems through a TTL cache (one IN query
+    per batch for misses) and inserts all new notifications of a batch with
+    a single INSERT. New notifications are also pushed to `hub` so streaming
+    agents get them immediately.
+
+    The same prediction can arrive twice (via ingest and via the
+    prediction_log tail); it is recognized by (system_id, created_at) and
+    dropped if seen within the last `dedup_window` seconds.
+
+    `suppressor` (common.alert_suppression) applies per-(system, level)
+    cooldowns and hysteresis; bursts it held back are written as one digest
+    notification when the cooldown ends, checked whenever the queue idles.
+
+    `active` (optional callable) gates every batch and digest flush, e.g.
+    `lambda: lease.is_leader`, so a demoted leader writes nothing more.
+    """
+
+    def __init__(self, app, send_alert=None, workers=2, batch_size=500,
+                 batch_wait=0.05, queue_size=100000, dedup_size=50000, dedup_window=600,
+                 system_ttl=300, hub=None, suppressor=None, digest_tick=5.0, active=None):
+        self.app = app
+        self.send_alert = send_alert
+        self.hub = hub
+        self.suppressor = suppressor or AlertSuppressor(medium=ALERT_THRESHOLD, high=HIGH_THRESHOLD)
+        self.digest_tick = digest_tick
+        self.active = active or (lambda: True)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.dedup_size = dedup_size
+        self.dedup_window = dedup_window
+        self.system_ttl = system_ttl
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._systems = {}          # system_id -> (system_name, admin_id, expires_at)
+        self._seen = OrderedDict()  # (system_id, created_at) -> seen_at, oldest first
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stop = threading.Event()
+        self.stats = {"published": 0, "dropped": 0, "alerts": 0, "duplicates": 0,
+                      "last_latency_ms": None}
+
+    # ---------------------------------------------------
+    # Producer side
+    # ---------------------------------------------------
+    def publish(self, predictions):
+        """Queue prediction dicts ({system_id, probability, created_at}); never blocks the caller."""
+        # Low readings are queued too: they are what lets a system's level fall
+        for p in predictions:
+            try:
+                self._queue.put_nowait((
+                    p["system_id"], float(p.get("probability") or 0.0),
+                    prediction_key(p["system_id"], p.get("created_at")), time.monotonic(),
+                ))
+                self.stats["published"] += 1
+            except queue.Full:
+                self.stats["dropped"] += 1
+
+    @property
+    def running(self):
+        return bool(self._threads)
+
+    # ---------------------------------------------------
+    # Worker side
+    # ---------------------------------------------------
+    def start(self):
+        with self.app.app_context():
+            self._warm_suppressor()
+        # Each start gets its own stop event, so threads of a previous run can't be revived
+        self._stop = stop = threading.Event()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(stop,), name=f"alert-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        print(f"🚨 Alert pipeline started with {self.workers} workers")
+
+    def stop(self, timeout=None):
+        """Stop the workers and discard queued predictions (e.g. when leadership is lost)."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(self.digest_tick + 1 if timeout is None else timeout)
+        self._threads = []
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        print("🛑 Alert pipeline stopped")
+
+    def _run(self, stop):
+        while not stop.is_set():
+            try:
+                items = [self._queue.get(timeout=self.digest_tick)]
+            except queue.Empty:
+                if stop.is_set() or not self.active():
+                    continue
+                try:
+                    with self.app.app_context():
+                        self.flush_digests()
+                except Exception as e:
+                    print(f"⚠ Alert digest error: {e}")
+                continue
+            deadline = time.monotonic() + self.batch_wait
+            while len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if stop.is_set() or not self.active():
+                continue
+            try:
+                with self.app.app_context():
+                    self.process(items)
+            except Exception as e:
+                print(f"⚠ Alert pipeline error: {e}")
+
+    def process(self, items):
+        """Turn a batch of (system_id, probability, key, queued_at) into notifications."""
+        systems = self._resolve_systems({item[0] for item in items})
+
+        alerts = []
+        now = time.monotonic()
+        with self._lock:
+            self._expire_seen(now)
+            for sid, prob, key, _ in items:
+                if sid not in systems:
+                    continue
+                # The same prediction can arrive via ingest and the prediction_log tail
+                if key is not None:
+                    if key in self._seen:
+                        self.stats["duplicates"] += 1
+                        continue
+                    self._remember(key, now)
+                alerts.extend(self.suppressor.observe(sid, prob))
+
+        rows = self._store(alerts, systems)
+        self.stats["last_latency_ms"] = round((time.monotonic() - min(item[3] for item in items)) * 1000, 1)
+        return rows
+
+    def flush_digests(self):
+        """Write digests for bursts whose cooldown has ended."""
+        alerts = self.suppressor.flush_due()
+        if not alerts:
+            return []
+        return self._store(alerts, self._resolve_systems({a["system_id"] for a in alerts}))
+
+    def _store(self, alerts, systems):
+        rows = []
+        for a in alerts:
+            info = systems.get(a["system_id"])
+            if not info:
+                continue
+            rows.append({
+                "admin_id": info[1],
+                "system_id": a["system_id"],
+                "message": alert_message(info[0], a["probability"], a["risk_level"]) + digest_suffix(a),
+                "risk_level": a["risk_level"],
+                "status": "Unread",
+            })
+
+        if rows:
+            try:
+                for row, nid in zip(rows, insert_notifications(rows)):
+                    row["notification_id"] = nid
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            self.stats["alerts"] += len(rows)
+
+        for r in rows:
+            print(f"🚨 New Notification for {systems[r['system_id']][0]} ({r['risk_level']} Risk)")
+            if self.hub:
+                self.hub.publish(r["system_id"], {"notification_id": r["notification_id"],
+                                                  "message": r["message"], "risk_level": r["risk_level"]})
+            if self.send_alert:
+                try:
+                    self.send_alert(r["system_id"], r["message"])
+                except Exception:
+                    pass
+        return rows
+
+    # ---------------------------------------------------
+    # Caches
+    # ---------------------------------------------------
+    def _resolve_systems(self, system_ids):
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for sid in system_ids:
+                hit = self._systems.get(sid)
+                if hit and hit[2] > now:
+                    found[sid] = hit
+                else:
+                    missing.append(sid)
+
+        if missing:
+            rows = db.session.query(
+                SystemInfo.system_id, SystemInfo.system_name, SystemInfo.admin_id
+            ).filter(SystemInfo.system_id.in_(missing)).all()
+            with self._lock:
+                for sid, name, admin_id in rows:
+                    entry = (name, admin_id, now + self.system_ttl)
+                    self._systems[sid] = entry
+                    found[sid] = entry
+        return found
+
+    def _remember(self, key, now):
+        self._seen[key] = now
+        if len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+
+    def _expire_seen(self, now):
+        while self._seen and now - next(iter(self._seen.values())) >= self.dedup_window:
+            self._seen.popitem(last=False)
+
+    def _warm_suppressor(self):
+        """
+        Resume cooldowns from the latest stored notification per (system, level),
+        so a restart or a new leader doesn't re-alert every hot system at once.
+        """
+        now = datetime.now()
+        since = now - timedelta(seconds=max(self.suppressor.cooldowns.values()))
+        recent = db.session.query(
+            Notification.system_id, Notification.risk_level, db.func.max(Notification.sent_time)
+        ).filter(Notification.sent_time >= since).group_by(
+            Notification.system_id, Notification.risk_level
+        ).all()
+        for sid, level, sent in recent:
+            if sent and level in self.suppressor.cooldowns:
+                self.suppressor.mark_sent(sid, level, max((now - sent).total_seconds(), 0.0))
+
+
+# =======================================================
+# 👀 Tail prediction_log for rows written directly to the DB
+# =======================================================
+class PredictionTail:
+    """
+    Agents in direct-DB mode bypass /api/ingest; this feeds their new
+    prediction rows into the pipeline with one column-only query per poll.
+    Rows that also arrived via ingest are dropped by the pipeline's dedup.
+    `last_seen_id` can be saved and restored so a new leader resumes where
+    the previous one stopped.
+    """
+
+    def __init__(self, app, pipeline, batch_limit=5000, last_seen_id=None):
+        self.app = app
+        self.pipeline = pipeline
+        self.batch_limit = batch_limit
+        if last_seen_id is None:
+            with app.app_context():
+                last_seen_id = db.session.query(db.func.max(PredictionLog.prediction_id)).scalar() or 0
+        self.last_seen_id = last_seen_id
+
+    def poll(self):
+        """Publish every prediction newer than last_seen_id; returns how many."""
+        total = 0
+        with self.app.app_context():
+            while True:
+                rows = db.session.query(
+                    PredictionLog.prediction_id, PredictionLog.system_id,
+                    PredictionLog.probability, PredictionLog.created_at,
+                ).filter(
+                    PredictionLog.prediction_id > self.last_seen_id
+                ).order_by(PredictionLog.prediction_id.asc()).limit(self.batch_limit).all()
+                if not rows:
+                    break
+                self.pipeline.publish([{"system_id": sid, "probability": prob, "created_at": created}
+                                       for _, sid, prob, created in rows])
+                self.last_seen_id = rows[-1][0]
+                total += len(rows)
+                if len(rows) < self.batch_limit:
+                    break
+        return total
+
+
+def tail_predictions(app, pipeline, interval=PREDICTION_TAIL_INTERVAL, batch_limit=5000):
+    """Poll a PredictionTail forever (single-process mode)."""
+    tail = PredictionTail(app, pipeline, batch_limit)
+    while True:
+        time.sleep(interval)
+        try:
+            tail.poll()
+        except Exception as e:
+            print(f"⚠ Watcher Error: {e}")
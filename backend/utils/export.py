@@ -0,0 +1,234 @@
+"""
+Columnar export of the time-series tables for offline training.
+
+Rows are read straight from the tables (no ORM objects) in id-ordered
+chunks, buffered per (partition, day) across chunks and written as parts of
+up to EXPORT_PART_ROWS rows, named after the first and last id they hold:
+
+    <out>/<table>/system_id=7/date=2024-01-01/part-000000000001-000000100000.parquet
+
+Formats: "parquet" (compressed, needs pyarrow), "arrow" (uncompressed Arrow
+IPC / Feather, memory-mappable, needs pyarrow) and "npy" (always available:
+a directory with one <column>.npy per column, loadable with
+np.load(..., mmap_mode="r")). Every run records the highest exported id per
+table in <out>/_watermarks.json, and --incremental continues from there; a
+full (non-incremental) run rebuilds <out>/<table>/ in a staging directory
+and swaps it in, so old and new parts never cover the same ids.
+
+    cd backend
+    python -m utils.export --out exports --incremental
+    python -m utils.export --tables system_metrics --format npy --chunk 50000
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+
+from database.db_config import db
+from database.models import SystemMetrics, PredictionLog, SystemHistory
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; .npy needs only NumPy
+    pa = None
+
+# =======================================================
+# 📦 Export specs
+# =======================================================
+# table name -> (table, id column, time column, partition column)
+EXPORT_TABLES = {
+    "system_metrics": (SystemMetrics.__table__, "metric_id", "timestamp", "system_id"),
+    "prediction_log": (PredictionLog.__table__, "prediction_id", "created_at", "system_id"),
+    "system_history": (SystemHistory.__table__, "id", "timestamp", "system_name"),
+}
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "100000"))
+EXPORT_PART_ROWS = int(os.getenv("EXPORT_PART_ROWS", "500000"))      # rows per part file
+EXPORT_BUFFER_ROWS = int(os.getenv("EXPORT_BUFFER_ROWS", "1000000"))  # buffered rows, all partitions
+WATERMARK_FILE = "_watermarks.json"
+FORMATS = ("parquet", "arrow", "npy")
+
+
+def default_format():
+    return "parquet" if pa is not None else "npy"
+
+
+def load_watermarks(out_dir):
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermarks(out_dir, marks):
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(marks, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _to_array(values):
+    present = [v for v in values if v is not None]
+    if present and isinstance(present[0], datetime):
+        return np.array(
+            [np.datetime64("NaT") if v is None else np.datetime64(v.replace(tzinfo=None), "us") for v in values],
+            dtype="datetime64[us]",
+        )
+    if present and isinstance(present[0], str):
+        return np.array(["" if v is None else v for v in values], dtype=str)
+    if len(present) < len(values):
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    return np.array(values)
+
+
+def _safe(value):
+    return str(value).replace("/", "_").replace(os.sep, "_")
+
+
+def write_part(path, columns, fmt):
+    """Write one part of a partition; `columns` maps name -> list of values."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arrays = {name: _to_array(values) for name, values in columns.items()}
+    if fmt == "npy":
+        os.makedirs(path, exist_ok=True)
+        for name, arr in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), arr)
+        return path
+    if pa is None:
+        raise RuntimeError(f"Format '{fmt}' needs pyarrow; use --format npy")
+    table = pa.table({name: pa.array(arr) for name, arr in arrays.items()})
+    if fmt == "parquet":
+        pq.write_table(table, f"{path}.parquet", compression="zstd")
+        return f"{path}.parquet"
+    feather.write_feather(table, f"{path}.arrow", compression="uncompressed")
+    return f"{path}.arrow"
+
+
+def _write_group(out_dir, name, key, rows, fmt):
+    """Write the buffered rows of one (partition, day) as a single part."""
+    table, id_col, _, part_col = EXPORT_TABLES[name]
+    cols = [c.name for c in table.columns]
+    id_idx = cols.index(id_col)
+    part, day = key
+    path = os.path.join(
+        out_dir, name, f"{part_col}={_safe(part)}", f"date={day}",
+        f"part-{rows[0][id_idx]:012d}-{rows[-1][id_idx]:012d}",
+    )
+    return write_part(path, {c: [r[i] for r in rows] for i, c in enumerate(cols)}, fmt)
+
+
+def export_table(conn, name, out_dir, after_id=0, fmt="npy", chunk=EXPORT_CHUNK,
+                 part_rows=EXPORT_PART_ROWS, buffer_rows=EXPORT_BUFFER_ROWS):
+    """
+    Stream one table in id order from `after_id`; returns (rows, last_id, files).
+    Rows are buffered per (partition, day) across chunks; a partition is
+    written once it holds `part_rows` rows, all of them once `buffer_rows`
+    plain tuples are buffered in total, and whatever is left at the end.
+    """
+    table, id_col, time_col, part_col = EXPORT_TABLES[name]
+    cols = [c.name for c in table.columns]
+    id_c = table.c[id_col]
+    t_idx, p_idx, id_idx = cols.index(time_col), cols.index(part_col), cols.index(id_col)
+    rows_total, files, last_id = 0, [], after_id
+    buffers = {}  # (partition, day) -> rows, in id order
+
+    while True:
+        rows = conn.execute(
+            db.select(table).where(id_c > last_id).order_by(id_c).limit(chunk)
+        ).fetchall()
+        # End the read transaction per chunk; keyset paging doesn't need a snapshot
+        conn.commit()
+        if not rows:
+            break
+
+        for r in rows:
+            key = (r[p_idx], r[t_idx].strftime("%Y-%m-%d") if r[t_idx] else "unknown")
+            group = buffers.setdefault(key, [])
+            group.append(r)
+            if len(group) >= part_rows:
+                files.append(_write_group(out_dir, name, key, buffers.pop(key), fmt))
+        if sum(len(g) for g in buffers.values()) >= buffer_rows:
+            for key in list(buffers):
+                files.append(_write_group(out_dir, name, key, buffers.pop(key), fmt))
+
+        last_id = rows[-1][id_idx]
+        rows_total += len(rows)
+        if len(rows) < chunk:
+            break
+
+    for key in list(buffers):
+        files.append(_write_group(out_dir, name, key, buffers.pop(key), fmt))
+    return rows_total, last_id, files
+
+
+def run_export(conn, out_dir, tables=None, incremental=True, fmt=None, chunk=EXPORT_CHUNK):
+    """Export the given tables (all by default); returns a per-table summary."""
+    fmt = fmt or default_format()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (choose from {', '.join(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    marks = load_watermarks(out_dir) if incremental else {}
+    summary = {}
+    for name in tables or list(EXPORT_TABLES):
+        if name not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table '{name}'")
+        t0 = time.perf_counter()
+        if incremental:
+            rows, last_id, files = export_table(conn, name, out_dir, marks.get(name, 0), fmt, chunk)
+        else:
+            rows, last_id, files = _full_export(conn, name, out_dir, fmt, chunk)
+        marks[name] = last_id
+        save_watermarks(out_dir, marks)  # after each table, so a crash resumes cleanly
+        summary[name] = {
+            "rows": rows, "files": len(files), "watermark": last_id,
+            "seconds": round(time.perf_counter() - t0, 2),
+        }
+        print(f"📦 {name}: {rows:,} rows → {len(files)} files (watermark {last_id})")
+    return {"format": fmt, "out_dir": out_dir, "tables": summary}
+
+
+def _full_export(conn, name, out_dir, fmt, chunk):
+    """Export a table from id 0 into a staging dir, then replace <out>/<table>/ with it."""
+    staging = os.path.join(out_dir, "_staging")
+    shutil.rmtree(os.path.join(staging, name), ignore_errors=True)
+    result = export_table(conn, name, staging, 0, fmt, chunk)
+
+    target, old = os.path.join(out_dir, name), os.path.join(staging, f"{name}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(target):
+        os.replace(target, old)
+    os.replace(os.path.join(staging, name), target)
+    shutil.rmtree(old, ignore_errors=True)
+    return result
+
+
+def load_npy_partition(path, mmap=True):
+    """Columns of one .npy part as memory-mapped arrays."""
+    return {
+        f[:-4]: np.load(os.path.join(path, f), mmap_mode="r" if mmap else None, allow_pickle=False)
+        for f in sorted(os.listdir(path)) if f.endswith(".npy")
+    }
+
+
+if __name__ == "__main__":
+    from flask import Flask
+    from database.db_config import init_db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.getenv("EXPORT_DIR", "exports"))
+    parser.add_argument("--tables", nargs="*", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", choices=FORMATS, default=None)
+    parser.add_argument("--chunk", type=int, default=EXPORT_CHUNK)
+    parser.add_argument("--incremental", action="store_true", help="continue from the saved watermarks")
+    args = parser.parse_args()
+
+    export_app = Flask(__name__)
+    init_db(export_app)
+    with export_app.app_context(), db.engine.connect() as conn:
+        run_export(conn, args.out, args.tables, args.incremental, args.format, args.chunk)
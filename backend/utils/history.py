@@ -0,0 +1,90 @@
+import base64
+import json
+from datetime import datetime
+from os import getenv
+
+from database.db_config import db
+
+# =======================================================
+# 📜 Keyset-paginated / streamed history
+# =======================================================
+PAGE_LIMIT_MAX = int(getenv("HISTORY_PAGE_MAX", "5000"))
+STREAM_CHUNK = int(getenv("HISTORY_STREAM_CHUNK", "2000"))
+
+
+class CursorError(ValueError):
+    """Raised for a cursor that cannot be decoded (→ HTTP 400)."""
+
+
+def encode_cursor(ts, row_id):
+    raw = f"{ts.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorError("Invalid cursor")
+
+
+class History:
+    """
+    Walks one system's rows in (time, id) order. Each page is a bounded
+    "WHERE (time, id) beyond the cursor ORDER BY time, id LIMIT n" query on the
+    (system_id, time) index, so page 10,000 costs the same as page 1 and
+    concurrent inserts never shift rows between pages.
+    """
+
+    def __init__(self, model, time_col, id_col):
+        self.model = model
+        self.time_col = time_col
+        self.id_col = id_col
+
+    def _query(self, system_id, after, descending, start, end):
+        t, i = self.time_col, self.id_col
+        q = self.model.query.filter(self.model.system_id == system_id)
+        if start:
+            q = q.filter(t >= start)
+        if end:
+            q = q.filter(t < end)
+        if after:
+            ts, row_id = after
+            if descending:
+                q = q.filter(db.or_(t < ts, db.and_(t == ts, i < row_id)))
+            else:
+                q = q.filter(db.or_(t > ts, db.and_(t == ts, i > row_id)))
+        return q.order_by(*((t.desc(), i.desc()) if descending else (t.asc(), i.asc())))
+
+    def cursor_for(self, row):
+        return encode_cursor(getattr(row, self.time_col.key), getattr(row, self.id_col.key))
+
+    def page(self, system_id, cursor=None, limit=100, descending=True, start=None, end=None):
+        """Returns (rows, next_cursor); next_cursor is None on the last page."""
+        limit = max(1, min(limit, PAGE_LIMIT_MAX))
+        after = decode_cursor(cursor) if cursor else None
+        rows = self._query(system_id, after, descending, start, end).limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, self.cursor_for(rows[-1])
+        return rows, None
+
+    def stream(self, system_id, serialize, cursor=None, descending=False, start=None, end=None):
+        """
+        NDJSON lines for every matching row. Rows are read in keyset chunks of
+        STREAM_CHUNK, so memory stays flat and no single statement (or open
+        transaction) lives for the whole export.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        while True:
+            rows = self._query(system_id, after, descending, start, end).limit(STREAM_CHUNK).all()
+            for r in rows:
+                yield json.dumps(serialize(r)) + "\n"
+            if len(rows) < STREAM_CHUNK:
+                return
+            last = rows[-1]
+            after = (getattr(last, self.time_col.key), getattr(last, self.id_col.key))
+            db.session.expunge_all()
+            db.session.commit()  # end the read transaction between chunks
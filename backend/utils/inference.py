@@ -0,0 +1,152 @@
+import queue
+import threading
+import time
+
+import numpy as np
+
+from common.prediction import predict_batch
+
+# =======================================================
+# ⚡ Micro-batched Inference
+# =======================================================
+
+
+class InferenceUnavailable(RuntimeError):
+    """No model is loaded yet (→ HTTP 503)."""
+
+
+class InferenceOverloaded(InferenceUnavailable):
+    """The request queue is full (→ HTTP 503 with Retry-After)."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Pending:
+    __slots__ = ("rows", "event", "result", "version", "error")
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.event = threading.Event()
+        self.result = None
+        self.version = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Requests from many agents are queued and answered together: a worker
+    collects up to `max_batch` rows or waits at most `max_wait_ms`, then runs
+    one vectorized scaler.transform + predict_proba for the whole batch using
+    the registry's current model (labels come from the shared decision threshold).
+    """
+
+    def __init__(self, registry, max_batch=256, max_wait_ms=20, queue_size=10000):
+        self.registry = registry
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "batches": 0,
+            "rows": 0,
+            "rejected": 0,
+            "last_batch_rows": 0,
+            "last_batch_ms": None,
+            "avg_batch_ms": None,
+            "rows_per_sec": None,
+        }
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+            self._thread.start()
+        return self
+
+    def predict(self, rows, timeout=5.0):
+        """Blocking: returns ([(label, probability_pct), ...], model_version)."""
+        active = self.registry.current
+        if active is None:
+            raise InferenceUnavailable("No model loaded")
+
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        expected = getattr(active.scaler, "n_features_in_", rows.shape[1])
+        if rows.ndim != 2 or rows.shape[1] != expected:
+            raise ValueError(f"Expected rows of {expected} features, got shape {rows.shape}")
+
+        pending = _Pending(rows)
+        try:
+            # Backpressure: a full queue is rejected at once, not after `timeout`
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise InferenceOverloaded(f"Inference queue full ({self._queue.maxsize} requests)")
+        if not pending.event.wait(timeout):
+            raise TimeoutError("Inference timed out")
+        if pending.error:
+            raise pending.error
+        return pending.result, pending.version
+
+    # ---------------------------------------------------
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            n = len(batch[0].rows)
+            deadline = time.monotonic() + self.max_wait
+            while n < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n += len(item.rows)
+            self._process(batch)
+
+    def _process(self, batch):
+        t0 = time.perf_counter()
+        try:
+            active = self.registry.current
+            if active is None:
+                raise InferenceUnavailable("No model loaded")
+            X = np.vstack([p.rows for p in batch])
+            labels, positive = predict_batch(active.model, active.scaler, X)
+            if positive is None:
+                positive = labels * 100.0
+
+            offset = 0
+            for p in batch:
+                k = len(p.rows)
+                p.result = [(int(labels[i]), float(positive[i])) for i in range(offset, offset + k)]
+                p.version = active.version
+                offset += k
+        except Exception as e:
+            for p in batch:
+                p.error = e
+        finally:
+            for p in batch:
+                p.event.set()
+
+        elapsed = time.perf_counter() - t0
+        self._record(sum(len(p.rows) for p in batch), elapsed)
+
+    def _record(self, rows, elapsed):
+        with self._lock:
+            s = self.stats
+            s["batches"] += 1
+            s["rows"] += rows
+            s["last_batch_rows"] = rows
+            s["last_batch_ms"] = round(elapsed * 1000, 3)
+            s["avg_batch_ms"] = s["last_batch_ms"] if s["avg_batch_ms"] is None \
+                else round(0.9 * s["avg_batch_ms"] + 0.1 * s["last_batch_ms"], 3)
+            rate = rows / elapsed if elapsed > 0 else None
+            if rate is not None:
+                s["rows_per_sec"] = round(rate if s["rows_per_sec"] is None
+                                          else 0.9 * s["rows_per_sec"] + 0.1 * rate, 1)
@@ -0,0 +1,125 @@
+import gzip
+import io
+import json
+from datetime import datetime
+from os import getenv
+
+from database.db_config import db
+from database.models import SystemMetrics, PredictionLog, Notification
+from utils.notify_claims import insert_notifications
+
+# =======================================================
+# 📥 Bulk Ingestion of Agent Batches
+# =======================================================
+MAX_ROWS = int(getenv("INGEST_MAX_ROWS", "5000"))
+MAX_BODY_BYTES = int(getenv("INGEST_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# kind -> (table, allowed columns, required columns, datetime columns)
+INGEST_TABLES = {
+    "metrics": (
+        SystemMetrics.__table__,
+        ("system_id", "timestamp", "CPU_Usage", "Memory_Usage", "Disk_IO",
+         "Network_Latency", "Error_Rate"),
+        ("system_id", "CPU_Usage", "Memory_Usage", "Disk_IO",
+         "Network_Latency", "Error_Rate"),
+        ("timestamp",),
+    ),
+    "predictions": (
+        PredictionLog.__table__,
+        ("system_id", "downtime_risk", "probability",
+         "estimated_time_to_downtime", "created_at"),
+        ("system_id", "downtime_risk"),
+        ("created_at",),
+    ),
+    "notifications": (
+        Notification.__table__,
+        ("admin_id", "system_id", "message", "risk_level", "status", "sent_time"),
+        ("admin_id", "system_id", "message"),
+        ("sent_time",),
+    ),
+}
+
+
+class IngestError(ValueError):
+    """Raised for malformed or oversized ingest payloads (→ HTTP 400)."""
+
+
+def _parse_time(value):
+    if value is None:
+        return datetime.utcnow().replace(microsecond=0)
+    try:
+        # Columns store whole seconds; truncate so the value matches what is read back
+        return datetime.fromisoformat(value).replace(microsecond=0)
+    except (TypeError, ValueError):
+        raise IngestError(f"Invalid timestamp: {value!r}")
+
+
+def decode_batch(raw, content_encoding=None):
+    """Decode a (optionally gzip-compressed) JSON batch into clean rows per table."""
+    if content_encoding and content_encoding.lower() == "gzip":
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(raw)) as gz:
+                raw = gz.read(MAX_BODY_BYTES + 1)
+        except OSError:
+            raise IngestError("Body is not valid gzip")
+    if len(raw) > MAX_BODY_BYTES:
+        raise IngestError("Batch too large")
+
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        raise IngestError("Body is not valid JSON")
+    if not isinstance(payload, dict):
+        raise IngestError("Batch must be a JSON object")
+
+    unknown = set(payload) - set(INGEST_TABLES)
+    if unknown:
+        raise IngestError(f"Unknown record kinds: {', '.join(sorted(unknown))}")
+
+    batch, total = {}, 0
+    for kind, rows in payload.items():
+        _, allowed, required, time_cols = INGEST_TABLES[kind]
+        if not isinstance(rows, list):
+            raise IngestError(f"'{kind}' must be a list")
+        total += len(rows)
+        if total > MAX_ROWS:
+            raise IngestError(f"Batch exceeds {MAX_ROWS} rows")
+
+        clean = []
+        for row in rows:
+            if not isinstance(row, dict):
+                raise IngestError(f"'{kind}' rows must be objects")
+            missing = [c for c in required if row.get(c) is None]
+            if missing:
+                raise IngestError(f"'{kind}' row missing {', '.join(missing)}")
+            item = {c: row.get(c) for c in allowed}
+            for c in time_cols:
+                item[c] = _parse_time(item[c])
+            if kind == "notifications":
+                item["risk_level"] = item["risk_level"] or "Low"
+                item["status"] = item["status"] or "Unread"
+            clean.append(item)
+        if clean:
+            batch[kind] = clean
+    return batch
+
+
+def write_batch(batch):
+    """
+    Write all rows in one transaction, one multi-row INSERT per table.
+    Notification rows get their new notification_id set, for pushing.
+    """
+    counts = {}
+    try:
+        for kind, rows in batch.items():
+            if kind == "notifications":
+                for row, nid in zip(rows, insert_notifications(rows)):
+                    row["notification_id"] = nid
+            else:
+                db.session.execute(INGEST_TABLES[kind][0].insert().values(rows))
+            counts[kind] = len(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return counts
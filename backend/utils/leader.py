@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from database.db_config import db
+from database.models import JobLease
+
+# =======================================================
+# 👑 DB-lease Leader Election for Background Jobs
+# =======================================================
+LEASE_TTL = float(os.getenv("JOB_LEASE_TTL", "30"))  # seconds
+
+
+def default_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def db_utc_now(seconds=0.0):
+    """The database server's current UTC time plus `seconds`, as a SQL expression."""
+    dialect = db.engine.dialect.name
+    if dialect == "mysql":
+        return db.literal_column(f"UTC_TIMESTAMP(6) + INTERVAL {int(seconds * 1e6)} MICROSECOND")
+    if dialect == "sqlite":
+        return db.literal_column(f"strftime('%Y-%m-%d %H:%M:%f', 'now', '{float(seconds):+f} seconds')")
+    if dialect == "postgresql":
+        return db.literal_column(f"timezone('utc', now()) + interval '{float(seconds)} seconds'")
+    # Unknown backend: fall back to this host's clock
+    return db.literal(datetime.utcnow() + timedelta(seconds=seconds))
+
+
+class LeaderLease:
+    """
+    One row per job in job_leases. Acquiring or renewing is a single
+    conditional UPDATE ("mine, or expired"), so at most one owner can hold an
+    unexpired lease; the very first claim is an INSERT guarded by the primary
+    key. Expiry is written and compared in the database's own clock, so host
+    clock skew between instances can't shorten or stretch a lease. A holder
+    only trusts its lease until ttl after its last successful renewal (local
+    monotonic clock), so it stands down before anyone else can take over
+    even if the database becomes unreachable.
+    """
+
+    def __init__(self, app, job, ttl=LEASE_TTL, owner=None):
+        self.app = app
+        self.job = job
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+        self._valid_until = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return time.monotonic() < self._valid_until
+
+    def try_acquire(self):
+        """Acquire or renew the lease; returns True while this instance owns it."""
+        started = time.monotonic()
+        t = JobLease.__table__
+        try:
+            with self.app.app_context():
+                claimed = db.session.execute(
+                    t.update().where(
+                        t.c.job_name == self.job,
+                        db.or_(t.c.owner == self.owner, t.c.expires_at < db_utc_now()),
+                    ).values(owner=self.owner, expires_at=db_utc_now(self.ttl))
+                ).rowcount
+                if not claimed:
+                    exists = db.session.execute(
+                        db.select(t.c.job_name).where(t.c.job_name == self.job)
+                    ).first()
+                    if exists is None:
+                        db.session.execute(t.insert().values(
+                            job_name=self.job, owner=self.owner,
+                            expires_at=db_utc_now(self.ttl),
+                        ))
+                        claimed = 1
+                db.session.commit()
+        except IntegrityError:
+            # Another instance inserted the first lease row at the same moment
+            with self.app.app_context():
+                db.session.rollback()
+            claimed = 0
+        except Exception as e:
+            with self.app.app_context():
+                db.session.rollback()
+            print(f"⚠ Lease '{self.job}' renewal failed: {e}")
+            return self.is_leader
+
+        was_leader = self.is_leader
+        self._valid_until = started + self.ttl if claimed else 0.0
+        if claimed and not was_leader:
+            print(f"👑 {self.owner} now runs '{self.job}'")
+        elif was_leader and not claimed:
+            print(f"🔻 {self.owner} lost '{self.job}'")
+        return bool(claimed)
+
+    def holder(self):
+        """Owner of the job's unexpired lease (any instance), or None."""
+        t = JobLease.__table__
+        with self.app.app_context():
+            return db.session.execute(db.select(t.c.owner).where(
+                t.c.job_name == self.job, t.c.expires_at >= db_utc_now()
+            )).scalar()
+
+    def release(self):
+        """Give the lease up immediately (clean shutdown)."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(self.ttl)  # a renewal in flight must not re-claim it
+        t = JobLease.__table__
+        with self.app.app_context():
+            db.session.execute(t.update().where(
+                t.c.job_name == self.job, t.c.owner == self.owner
+            ).values(expires_at=db_utc_now(-1)))
+            db.session.commit()
+        self._valid_until = 0.0
+
+    # ---------------------------------------------------
+    # Progress handed from one leader to the next
+    # ---------------------------------------------------
+    def load_state(self):
+        with self.app.app_context():
+            raw = db.session.execute(
+                db.select(JobLease.__table__.c.state).where(JobLease.__table__.c.job_name == self.job)
+            ).scalar()
+        return json.loads(raw) if raw else {}
+
+    def save_state(self, state):
+        t = JobLease.__table__
+        with self.app.app_context():
+            db.session.execute(t.update().where(
+                t.c.job_name == self.job, t.c.owner == self.owner
+            ).values(state=json.dumps(state)))
+            db.session.commit()
+
+    # ---------------------------------------------------
+    # Heartbeat
+    # ---------------------------------------------------
+    def start(self):
+        """Keep trying to acquire / renew every ttl/3 on a daemon thread."""
+        def beat():
+            while not self._stop.is_set():
+                self.try_acquire()
+                self._stop.wait(self.ttl / 3)
+
+        self._thread = threading.Thread(target=beat, name=f"lease-{self.job}", daemon=True)
+        self._thread.start()
+        return self
+
+
+class LeaderJob:
+    """
+    Runs `step(lease)` every `interval` seconds, but only while this instance
+    holds the job's lease. `on_elected(lease)` runs each time leadership is
+    (re)gained, before the first step — e.g. to resume from saved state —
+    and `on_demoted(lease)` once it is lost, to stop work started on election.
+    """
+
+    def __init__(self, app, name, step, interval, ttl=LEASE_TTL, on_elected=None, on_demoted=None):
+        self.name = name
+        self.step = step
+        self.interval = interval
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lease = LeaderLease(app, name, ttl)
+        self._stop = threading.Event()
+
+    def run_forever(self):
+        self.lease.start()
+        leading, next_run = False, 0.0
+        while not self._stop.is_set():
+            if self.lease.is_leader:
+                try:
+                    if not leading and self.on_elected:
+                        self.on_elected(self.lease)
+                    leading = True
+                    if time.monotonic() >= next_run:
+                        next_run = time.monotonic() + self.interval
+                        self.step(self.lease)
+                except Exception as e:
+                    print(f"⚠ Job '{self.name}' error: {e}")
+            elif leading:
+                leading = False
+                if self.on_demoted:
+                    try:
+                        self.on_demoted(self.lease)
+                    except Exception as e:
+                        print(f"⚠ Job '{self.name}' error: {e}")
+            self._stop.wait(min(self.interval, 1.0))
+
+    def start(self):
+        t = threading.Thread(target=self.run_forever, name=f"job-{self.name}", daemon=True)
+        t.start()
+        return t
+
+    def stop(self):
+        self._stop.set()
+        try:
+            self.lease.release()
+        except Exception as e:
+            print(f"⚠ Could not release '{self.name}' lease: {e}")
@@ -0,0 +1,314 @@
+import threading
+import time
+
+from database.db_config import db
+from database.models import SystemInfo, SystemMetrics, PredictionLog, Notification
+from utils.alert_pipeline import ALERT_THRESHOLD, HIGH_THRESHOLD
+
+# =======================================================
+# ⚡ Last-value Store (live status per system)
+# =======================================================
+METRIC_FIELDS = ("CPU_Usage", "Memory_Usage", "Disk_IO", "Network_Latency", "Error_Rate")
+
+
+def risk_level(prob):
+    """Same bands the agents use when they log a prediction."""
+    if prob is None:
+        return None
+    if prob >= HIGH_THRESHOLD:
+        return "High"
+    if prob >= ALERT_THRESHOLD:
+        return "Medium"
+    return "Low"
+
+
+def _naive(ts):
+    # Agents send zone-aware times; the DB stores them as naive wall-clock time
+    return ts.replace(tzinfo=None) if ts is not None and ts.tzinfo else ts
+
+
+def latest_per_system(model, time_col, system_ids=None):
+    """
+    Latest row per system with one set-based query: join each system's
+    MAX(time) (served by the (system_id, time) index) back to the table.
+    """
+    latest = db.session.query(
+        model.system_id.label("sid"), db.func.max(time_col).label("latest")
+    )
+    if system_ids is not None:
+        latest = latest.filter(model.system_id.in_(system_ids))
+    latest = latest.group_by(model.system_id).subquery()
+    rows = db.session.query(model).join(
+        latest, db.and_(model.system_id == latest.c.sid, time_col == latest.c.latest)
+    ).all()
+    return {r.system_id: r for r in rows}  # ties on the timestamp: any one wins
+
+
+class LiveStateStore:
+    """
+    system_id → latest metrics + latest prediction, kept in memory and updated
+    on every ingest (and by a light tail of the tables for rows written
+    directly to the DB). Reads are dictionary lookups; the DB is only used to
+    warm the store at start-up. `on_update(kind, system_ids)` is told about
+    every applied write (used for cache invalidation).
+    """
+
+    def __init__(self, on_update=None):
+        self.on_update = on_update
+        self._state = {}  # system_id -> {"metrics": {...}, "prediction": {...}}
+        self._names = {}  # system_id -> (system_name, admin_id)
+        self._latest_sid = None  # system with the newest metrics timestamp
+        self._latest_ts = None
+        self._lock = threading.Lock()
+        self._warm_lock = threading.Lock()
+        self._last_metric_id = 0
+        self._last_prediction_id = 0
+        self._warmed = False
+        self.stats = {"updates": 0, "warmed": 0}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._state)
+
+    # ---------------------------------------------------
+    # Writes
+    # ---------------------------------------------------
+    def update_metrics(self, rows):
+        with self._lock:
+            for r in rows:
+                entry = self._state.setdefault(r["system_id"], {"metrics": None, "prediction": None})
+                ts = _naive(r["timestamp"])
+                current = entry["metrics"]
+                if current and ts < current["timestamp"]:
+                    continue
+                entry["metrics"] = {"timestamp": ts, **{f: r[f] for f in METRIC_FIELDS}}
+                if self._latest_ts is None or ts >= self._latest_ts:
+                    self._latest_sid, self._latest_ts = r["system_id"], ts
+                self.stats["updates"] += 1
+        self._notify("metrics", rows)
+
+    def update_predictions(self, rows):
+        with self._lock:
+            for r in rows:
+                entry = self._state.setdefault(r["system_id"], {"metrics": None, "prediction": None})
+                ts = _naive(r["created_at"])
+                current = entry["prediction"]
+                if current and ts < current["created_at"]:
+                    continue
+                entry["prediction"] = {
+                    "downtime_risk": bool(r["downtime_risk"]),
+                    "probability": r.get("probability"),
+                    "created_at": ts,
+                }
+                self.stats["updates"] += 1
+        self._notify("predictions", rows)
+
+    def _notify(self, kind, rows):
+        if self.on_update and rows:
+            self.on_update(kind, {r["system_id"] for r in rows})
+
+    def set_system(self, system_id, system_name, admin_id):
+        with self._lock:
+            self._names[system_id] = (system_name, admin_id)
+
+    # ---------------------------------------------------
+    # Reads (O(1) per system)
+    # ---------------------------------------------------
+    def get(self, system_id):
+        with self._lock:
+            entry = self._state.get(system_id)
+            return dict(entry) if entry else None
+
+    def latest_system_id(self):
+        return self._latest_sid
+
+    def system_name(self, system_id):
+        with self._lock:
+            hit = self._names.get(system_id)
+        if hit:
+            return hit[0]
+        system = db.session.get(SystemInfo, system_id)
+        if system is None:
+            return None
+        self.set_system(system_id, system.system_name, system.admin_id)
+        return system.system_name
+
+    def snapshot(self, admin_id=None):
+        """{system_id: entry} for every known system, optionally of one admin."""
+        with self._lock:
+            unnamed = [sid for sid in self._state if sid not in self._names]
+        if unnamed:
+            # Systems registered after warm-up: one IN query, then cached
+            for sid, name, owner in db.session.query(
+                SystemInfo.system_id, SystemInfo.system_name, SystemInfo.admin_id
+            ).filter(SystemInfo.system_id.in_(unnamed)):
+                self.set_system(sid, name, owner)
+        with self._lock:
+            return {
+                sid: dict(entry) for sid, entry in self._state.items()
+                if admin_id is None or self._names.get(sid, (None, None))[1] == admin_id
+            }
+
+    # ---------------------------------------------------
+    # DB warm-up and tail
+    # ---------------------------------------------------
+    def warm(self):
+        """Cold start: load names plus the latest metric and prediction of every system."""
+        for sid, name, admin_id in db.session.query(
+            SystemInfo.system_id, SystemInfo.system_name, SystemInfo.admin_id
+        ):
+            self.set_system(sid, name, admin_id)
+
+        metrics = latest_per_system(SystemMetrics, SystemMetrics.recorded_at)
+        self.update_metrics([
+            {"system_id": sid, "timestamp": m.recorded_at, **{f: getattr(m, f) for f in METRIC_FIELDS}}
+            for sid, m in metrics.items()
+        ])
+        predictions = latest_per_system(PredictionLog, PredictionLog.created_at)
+        self.update_predictions([
+            {"system_id": sid, "downtime_risk": p.downtime_risk,
+             "probability": p.probability, "created_at": p.created_at}
+            for sid, p in predictions.items()
+        ])
+        self._last_metric_id = db.session.query(db.func.max(SystemMetrics.metric_id)).scalar() or 0
+        self._last_prediction_id = db.session.query(db.func.max(PredictionLog.prediction_id)).scalar() or 0
+        self.stats["warmed"] = len(self)
+        self._warmed = True
+        return self.stats["warmed"]
+
+    def ensure_warm(self):
+        if not self._warmed:
+            with self._warm_lock:
+                if not self._warmed:
+                    self.warm()
+
+    def catch_up(self, batch_limit=5000):
+        """Apply rows written since the last call (direct-DB agents, collect_metrics.py)."""
+        cols = [getattr(SystemMetrics, f) for f in METRIC_FIELDS]
+        rows = db.session.query(
+            SystemMetrics.metric_id, SystemMetrics.system_id, SystemMetrics.recorded_at, *cols
+        ).filter(SystemMetrics.metric_id > self._last_metric_id).order_by(
+            SystemMetrics.metric_id.asc()).limit(batch_limit).all()
+        if rows:
+            self.update_metrics([
+                {"system_id": r[1], "timestamp": r[2], **dict(zip(METRIC_FIELDS, r[3:]))} for r in rows
+            ])
+            self._last_metric_id = rows[-1][0]
+
+        preds = db.session.query(
+            PredictionLog.prediction_id, PredictionLog.system_id, PredictionLog.downtime_risk,
+            PredictionLog.probability, PredictionLog.created_at,
+        ).filter(PredictionLog.prediction_id > self._last_prediction_id).order_by(
+            PredictionLog.prediction_id.asc()).limit(batch_limit).all()
+        if preds:
+            self.update_predictions([
+                {"system_id": p[1], "downtime_risk": p[2], "probability": p[3], "created_at": p[4]}
+                for p in preds
+            ])
+            self._last_prediction_id = preds[-1][0]
+        return len(rows) + len(preds)
+
+
+# =======================================================
+# 🛰 Fleet Overview (one set-based query per admin)
+# =======================================================
+def fleet_query(admin_id):
+    """
+    Every system of an admin with its latest metrics, latest prediction and
+    unread alert count in a single statement: latest-per-group subqueries
+    (MAX(time) GROUP BY system_id, served by the composite indexes) joined
+    back to their tables, plus a grouped unread count.
+    """
+    owned = db.select(SystemInfo.system_id).where(SystemInfo.admin_id == admin_id)
+
+    lm = db.select(
+        SystemMetrics.system_id.label("sid"), db.func.max(SystemMetrics.recorded_at).label("ts")
+    ).where(SystemMetrics.system_id.in_(owned)).group_by(SystemMetrics.system_id).subquery("lm")
+    lp = db.select(
+        PredictionLog.system_id.label("sid"), db.func.max(PredictionLog.created_at).label("ts")
+    ).where(PredictionLog.system_id.in_(owned)).group_by(PredictionLog.system_id).subquery("lp")
+    unread = db.select(
+        Notification.system_id.label("sid"), db.func.count().label("n")
+    ).where(
+        Notification.system_id.in_(owned), Notification.status == "Unread"
+    ).group_by(Notification.system_id).subquery("unread")
+
+    return db.select(
+        SystemInfo.system_id, SystemInfo.system_name,
+        *[getattr(SystemMetrics, f) for f in METRIC_FIELDS],
+        SystemMetrics.recorded_at.label("metrics_at"),
+        PredictionLog.downtime_risk, PredictionLog.probability,
+        PredictionLog.created_at.label("predicted_at"),
+        db.func.coalesce(unread.c.n, 0).label("unread_alerts"),
+    ).select_from(SystemInfo).outerjoin(
+        lm, lm.c.sid == SystemInfo.system_id
+    ).outerjoin(
+        SystemMetrics, db.and_(SystemMetrics.system_id == lm.c.sid, SystemMetrics.recorded_at == lm.c.ts)
+    ).outerjoin(
+        lp, lp.c.sid == SystemInfo.system_id
+    ).outerjoin(
+        PredictionLog, db.and_(PredictionLog.system_id == lp.c.sid, PredictionLog.created_at == lp.c.ts)
+    ).outerjoin(
+        unread, unread.c.sid == SystemInfo.system_id
+    ).where(SystemInfo.admin_id == admin_id).order_by(SystemInfo.system_id)
+
+
+def serialize_fleet_row(r):
+    fmt = "%Y-%m-%d %H:%M:%S"
+    return {
+        "system_id": r.system_id,
+        "system_name": r.system_name,
+        "metrics": None if r.metrics_at is None else {
+            "timestamp": r.metrics_at.strftime(fmt), **{f: getattr(r, f) for f in METRIC_FIELDS}
+        },
+        "prediction": None if r.predicted_at is None else {
+            "downtime_risk": bool(r.downtime_risk),
+            "probability": r.probability,
+            "created_at": r.predicted_at.strftime(fmt),
+        },
+        "risk_level": risk_level(r.probability),
+        "unread_alerts": r.unread_alerts,
+    }
+
+
+def fleet_overview(session_or_conn, admin_id):
+    systems = {}
+    for r in session_or_conn.execute(fleet_query(admin_id)):
+        # Two rows sharing a system's latest timestamp would repeat it — keep one
+        systems.setdefault(r.system_id, r)
+    return [serialize_fleet_row(r) for r in systems.values()]
+
+
+def serialize_status(system_id, system_name, entry):
+    """Live status payload (keeps the keys the dashboard already reads)."""
+    metrics = entry.get("metrics") or {}
+    prediction = entry.get("prediction") or {}
+    prob = prediction.get("probability")
+    ts = metrics.get("timestamp") or prediction.get("created_at")
+    return {
+        "system_id": system_id,
+        "system_name": system_name or f"System {system_id}",
+        **{f: metrics.get(f) for f in METRIC_FIELDS},
+        "Prediction": (
+            "⚠ Downtime Risk" if prediction.get("downtime_risk") else
+            "✅ Normal Operation" if prediction else "No prediction yet"
+        ),
+        "Risk_Probability": f"{prob:.2f}%" if prob is not None else "N/A",
+        "risk_level": risk_level(prob),
+        "Timestamp": ts.strftime("%Y-%m-%d %H:%M:%S") if ts else "N/A",
+    }
+
+
+def start_live_state_tail(app, store, interval=5):
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    store.catch_up()
+            except Exception as e:
+                print(f"⚠ Live state tail error: {e}")
+
+    t = threading.Thread(target=loop, name="live-state-tail", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import joblib
+
+# =======================================================
+# 🧠 Model Registry (load once, hot-reload on change)
+# =======================================================
+ActiveModel = namedtuple("ActiveModel", "model scaler version loaded_at feature_names model_path scaler_path "
+                         "promoted", defaults=(None, None, None, None))
+LATEST_POINTER = "LATEST"  # models/LATEST holds the name of the promoted models/<version>/
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Keeps the model + scaler in memory and watches their files. With a
+    `latest_path` pointer (written atomically by train_model.py) the model,
+    scaler and feature list all come from the version directory it names,
+    so a promotion is picked up as one consistent set; without it, the two
+    fixed files are watched. A change in mtime/size triggers a content hash;
+    only a new hash loads a new version, which replaces `current` in a single
+    assignment. Callers take `registry.current` once per prediction, so
+    in-flight predictions finish on the version they started with.
+    """
+
+    def __init__(self, model_path, scaler_path, poll_interval=10, latest_path=None):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.latest_path = latest_path
+        self.poll_interval = poll_interval
+        self.current = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    def _paths(self):
+        """(model, scaler, features) paths of the promoted version, or the fixed files."""
+        if self.latest_path:
+            try:
+                with open(self.latest_path, encoding="utf-8") as f:
+                    version_dir = os.path.join(os.path.dirname(self.latest_path), f.read().strip())
+                return (os.path.join(version_dir, "model.joblib"), os.path.join(version_dir, "scaler.joblib"),
+                        os.path.join(version_dir, "features.pkl"))
+            except FileNotFoundError:
+                pass
+        return self.model_path, self.scaler_path, None
+
+    def _stat(self, paths):
+        try:
+            stats = [os.stat(p) for p in paths[:2]]
+        except FileNotFoundError:
+            return None
+        return paths, tuple((s.st_mtime_ns, s.st_size) for s in stats)
+
+    def reload_if_changed(self):
+        """Returns True if a new version was swapped in."""
+        with self._lock:
+            model_path, scaler_path, features_path = paths = self._paths()
+            fingerprint = self._stat(paths)
+            if fingerprint is None or fingerprint == self._fingerprint:
+                return False
+
+            version = _file_hash(model_path)[:8] + _file_hash(scaler_path)[:4]
+            if features_path and os.path.exists(features_path):
+                version += _file_hash(features_path)[:4]
+            if self.current and self.current.version == version:
+                self._fingerprint = fingerprint  # touched, same content
+                return False
+
+            try:
+                model = joblib.load(model_path)
+                scaler = joblib.load(scaler_path)
+                feature_names = None
+                if features_path and os.path.exists(features_path):
+                    with open(features_path, "rb") as f:
+                        feature_names = pickle.load(f)
+            except Exception as e:
+                # Often a half-written file; keep serving the old version and retry
+                print(f"⚠ Could not load model/scaler ({e}); keeping version "
+                      f"{self.current.version if self.current else 'none'}")
+                return False
+
+            previous = self.current.version if self.current else None
+            # Name of the models/<version>/ the LATEST pointer promoted, if any
+            promoted = os.path.basename(os.path.dirname(model_path)) if features_path else None
+            self.current = ActiveModel(model, scaler, version, datetime.utcnow(), feature_names,
+                                       model_path, scaler_path, promoted)
+            self._fingerprint = fingerprint
+
+        print(f"🧠 Model version {version} active" + (f" (was {previous})" if previous else ""))
+        return True
+
+    def watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                print(f"⚠ Model watcher error: {e}")
+
+    def start_watching(self):
+        t = threading.Thread(target=self.watch, name="model-watcher", daemon=True)
+        t.start()
+        return t
+
+    def info(self):
+        active = self.current
+        if active is None:
+            return {"loaded": False, "model_path": self._paths()[0]}
+        return {
+            "loaded": True,
+            "version": active.version,
+            "model_type": type(active.model).__name__,
+            "loaded_at": active.loaded_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "model_path": active.model_path,
+            "scaler_path": active.scaler_path,
+            "promoted_version": active.promoted,
+        }
@@ -0,0 +1,127 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from database.db_config import db
+from database.models import Notification
+
+# =======================================================
+# 📬 Claim / Ack Delivery of Unread Notifications
+# =======================================================
+CLAIM_LIMIT = int(os.getenv("NOTIFY_CLAIM_LIMIT", "100"))            # max rows per claim
+CLAIM_VISIBILITY = float(os.getenv("NOTIFY_CLAIM_VISIBILITY", "60"))  # seconds before redelivery
+
+_MYSQL_CLAIM = """
+    UPDATE notifications
+    SET claim_token = :token, claimed_until = :until,
+        delivery_count = delivery_count + 1{ack}
+    WHERE system_id = :system_id AND status = 'Unread'
+      AND (claimed_until IS NULL OR claimed_until < :now)
+    ORDER BY notification_id
+    LIMIT :limit
+"""
+
+
+def _claimable(system_id, now):
+    t = Notification.__table__
+    return db.and_(
+        t.c.system_id == system_id,
+        t.c.status == "Unread",
+        db.or_(t.c.claimed_until.is_(None), t.c.claimed_until < now),
+    )
+
+
+def serialize_claimed(row):
+    return {
+        "notification_id": row.notification_id,
+        "message": row.message,
+        "risk_level": row.risk_level,
+        "sent_time": row.sent_time.strftime("%Y-%m-%d %H:%M:%S") if row.sent_time else None,
+        "delivery_count": row.delivery_count,
+    }
+
+
+def claim_unread(system_id, limit=CLAIM_LIMIT, visibility=CLAIM_VISIBILITY, ack=False):
+    """
+    Claim up to `limit` of a system's oldest deliverable notifications with
+    one UPDATE and return (token, rows) in id order. Claimed rows stay Unread
+    but are invisible to other callers until `visibility` seconds pass;
+    ack_claimed() marks them Read, otherwise they are redelivered. With
+    ack=True the same UPDATE marks them Read (at-most-once, legacy polling).
+    """
+    t = Notification.__table__
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    until = now + timedelta(seconds=visibility)
+
+    if db.engine.dialect.name == "mysql":
+        # Single-table UPDATE ... ORDER BY ... LIMIT; InnoDB locks the rows it
+        # claims, so a concurrent claimer skips or waits and re-checks them
+        db.session.execute(text(_MYSQL_CLAIM.format(ack=", status = 'Read'" if ack else "")), {
+            "token": token, "until": until, "system_id": system_id, "now": now, "limit": limit,
+        })
+    else:
+        # Other backends reject UPDATE ... LIMIT: pick ids in a subquery and
+        # repeat the claim condition so a concurrently claimed row is skipped
+        ids = db.select(t.c.notification_id).where(_claimable(system_id, now)).order_by(
+            t.c.notification_id).limit(limit).scalar_subquery()
+        values = {"claim_token": token, "claimed_until": until,
+                  "delivery_count": t.c.delivery_count + 1}
+        if ack:
+            values["status"] = "Read"
+        db.session.execute(t.update().where(
+            t.c.notification_id.in_(ids), _claimable(system_id, now)
+        ).values(**values))
+
+    rows = db.session.execute(
+        db.select(t.c.notification_id, t.c.message, t.c.risk_level, t.c.sent_time, t.c.delivery_count)
+        .where(t.c.claim_token == token).order_by(t.c.notification_id)
+    ).all()
+    db.session.commit()
+    return token, [serialize_claimed(r) for r in rows]
+
+
+def ack_claimed(system_id, token, notification_ids=None):
+    """
+    Mark claimed rows Read; returns how many were acknowledged. Rows whose
+    claim expired and were re-claimed by someone else carry a new token and
+    are left alone.
+    """
+    t = Notification.__table__
+    stmt = t.update().where(
+        t.c.system_id == system_id, t.c.claim_token == token, t.c.status == "Unread"
+    )
+    if notification_ids is not None:
+        stmt = stmt.where(t.c.notification_id.in_(notification_ids))
+    acked = db.session.execute(stmt.values(status="Read")).rowcount
+    db.session.commit()
+    return acked
+
+
+def insert_notifications(rows):
+    """
+    Insert notification rows and return their ids in order, so pushes can
+    name the exact row. One INSERT ... RETURNING where the backend supports
+    it; MySQL has no RETURNING, so there it is one INSERT per row (alert
+    volume is bounded by the suppressor). The caller commits.
+    """
+    t = Notification.__table__
+    if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(
+            t.insert().returning(t.c.notification_id, sort_by_parameter_order=True), rows
+        )
+        return [r[0] for r in result]
+    return [db.session.execute(t.insert().values(**row)).inserted_primary_key[0] for row in rows]
+
+
+def claim_pushed(system_id, notification_id):
+    """Mark a pushed notification Read unless a poller or earlier push holds it."""
+    t = Notification.__table__
+    claimed = db.session.execute(
+        t.update().where(t.c.notification_id == notification_id, _claimable(system_id, datetime.utcnow()))
+        .values(status="Read", delivery_count=t.c.delivery_count + 1)
+    ).rowcount
+    db.session.commit()
+    return claimed > 0
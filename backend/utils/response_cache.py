@@ -0,0 +1,181 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, make_response, request
+
+# =======================================================
+# 🗃 Response Cache (per-route TTL, per-system invalidation)
+# =======================================================
+# Invalidation is generation based: every cache key embeds the current
+# generation of its tag (e.g. "metrics:7"); a write bumps that generation, so
+# stale entries are simply never looked up again and age out by TTL / LRU.
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._gens = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            if hit[0] < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return hit[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def generation(self, tag):
+        with self._lock:
+            return self._gens.get(tag, 0)
+
+    def bump(self, tag):
+        with self._lock:
+            self._gens[tag] = self._gens.get(tag, 0) + 1
+
+
+class SQLiteBackend:
+    """
+    Cache shared by every worker process on one host through a local SQLite
+    file (WAL mode). Generations live in the same file, so a write handled
+    by one worker invalidates the entry for all of them.
+    """
+
+    def __init__(self, path, max_entries=20000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS generations (tag TEXT PRIMARY KEY, gen INTEGER NOT NULL)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self.prune()
+
+    def prune(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache WHERE key NOT IN "
+            "(SELECT key FROM cache ORDER BY expires_at DESC LIMIT ?)", (self.max_entries,)
+        )
+
+    def generation(self, tag):
+        row = self._conn().execute("SELECT gen FROM generations WHERE tag = ?", (tag,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, tag):
+        self._conn().execute(
+            "INSERT INTO generations (tag, gen) VALUES (?, 1) "
+            "ON CONFLICT(tag) DO UPDATE SET gen = gen + 1", (tag,)
+        )
+
+
+class ResponseCache:
+    """
+    Caches successful JSON responses of read endpoints. `backend` is
+    "memory" (default), "sqlite" (shared file at `path`) or "off".
+    """
+
+    def __init__(self, backend="memory", path=None, max_entries=2048):
+        self.enabled = backend != "off"
+        if backend == "sqlite":
+            self.backend = SQLiteBackend(path or "response_cache.sqlite3", max_entries)
+        else:
+            self.backend = MemoryBackend(max_entries)
+        self.kind = backend
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.bump(tag)
+            self._count("invalidations")
+
+    def cached(self, name, ttl, tag):
+        """
+        Decorator for a view. `tag(**view_args)` names the data the response
+        depends on; invalidate(that tag) drops every cached variant of it.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(**kwargs):
+                if not self.enabled:
+                    return view(**kwargs)
+                t = tag(**kwargs)
+                key = f"{name}|{t}|{self.backend.generation(t)}|{request.full_path}"
+                body = self.backend.get(key)
+                if body is not None:
+                    self._count("hits")
+                    return Response(body, mimetype="application/json", headers={"X-Cache": "HIT"})
+
+                self._count("misses")
+                response = make_response(view(**kwargs))
+                if response.status_code == 200 and response.mimetype == "application/json":
+                    self.backend.set(key, response.get_data(), ttl)
+                    response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+    def info(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["backend"] = self.kind
+        return stats
+
+
+def cache_from_env():
+    return ResponseCache(
+        backend=os.getenv("RESPONSE_CACHE", "memory"),
+        path=os.getenv("RESPONSE_CACHE_PATH"),
+        max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "2048")),
+    )
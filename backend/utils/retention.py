@@ -0,0 +1,224 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from os import getenv
+
+from sqlalchemy import Column, MetaData, Table, text
+
+from database.db_config import db
+from database.models import SystemMetrics, PredictionLog, MetricRollup
+from utils.rollups import TIERS
+
+# =======================================================
+# 🗄 Retention: Partition Rotation / Chunked Purge
+# =======================================================
+RETENTION_ENABLED = getenv("RETENTION_ENABLED", "0") == "1"
+RETENTION_MODE = getenv("RETENTION_MODE", "drop")                 # drop | archive
+PARTITION_GRANULARITY = getenv("PARTITION_GRANULARITY", "day")    # day | month
+RETENTION_INTERVAL = int(getenv("RETENTION_INTERVAL", "3600"))    # seconds between runs
+HOT_QUERY_DAYS = int(getenv("HOT_QUERY_DAYS", "7" if RETENTION_ENABLED else "0"))
+
+# Rollup tiers are kept longer the coarser they are; 0 = keep forever
+ROLLUP_RETENTION_DEFAULTS = {"1m": "7", "5m": "30", "1h": "365", "1d": "0"}
+
+# policy name -> (model, time column, days to keep[, (column, value) row filter])
+RETENTION_POLICIES = {
+    "system_metrics": (SystemMetrics, "timestamp", int(getenv("RETENTION_DAYS_METRICS", "30"))),
+    "prediction_log": (PredictionLog, "created_at", int(getenv("RETENTION_DAYS_PREDICTIONS", "90"))),
+    **{
+        f"metric_rollups:{tier}": (
+            MetricRollup, "bucket_start",
+            int(getenv(f"RETENTION_DAYS_ROLLUPS_{tier.upper()}", ROLLUP_RETENTION_DEFAULTS[tier])),
+            ("resolution", seconds),
+        )
+        for tier, seconds in TIERS.items()
+    },
+}
+
+
+def hot_window_start():
+    """Lower time bound for hot per-system queries (lets MySQL prune old partitions)."""
+    if HOT_QUERY_DAYS <= 0:
+        return None
+    return datetime.utcnow() - timedelta(days=HOT_QUERY_DAYS)
+
+
+# -------------------------------------------------------
+# Partition planning (pure, MySQL RANGE on TO_DAYS(col))
+# -------------------------------------------------------
+def to_days(d):
+    """Python equivalent of MySQL TO_DAYS()."""
+    return d.toordinal() + 365
+
+
+def from_days(n):
+    return date.fromordinal(n - 365)
+
+
+def period_start(d, granularity):
+    return d.replace(day=1) if granularity == "month" else d
+
+
+def next_period(d, granularity):
+    if granularity == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+
+def partition_name(start, granularity):
+    return start.strftime("p%Y%m" if granularity == "month" else "p%Y%m%d")
+
+
+def plan_new_partitions(last_bound, today, granularity="day", ahead=3):
+    """
+    Partitions to split out of `pmax` so that the current period and `ahead`
+    future periods exist. `last_bound` is the highest LESS THAN date already
+    defined (None when only pmax exists). Returns [(name, less_than_date)].
+    """
+    start = last_bound or period_start(today, granularity)
+    target = period_start(today, granularity)
+    for _ in range(ahead + 1):
+        target = next_period(target, granularity)
+
+    planned = []
+    while start < target:
+        upper = next_period(start, granularity)
+        planned.append((partition_name(start, granularity), upper))
+        start = upper
+    return planned
+
+
+def expired_partitions(partitions, cutoff):
+    """Partitions whose every row is older than `cutoff`: [(name, less_than_date)]."""
+    return [(name, bound) for name, bound in partitions
+            if bound is not None and bound <= cutoff]
+
+
+# -------------------------------------------------------
+# Manager
+# -------------------------------------------------------
+class RetentionManager:
+    """
+    On MySQL tables that are RANGE-partitioned by day/month (see
+    database/migrations/002_partition_time_series.sql) expired partitions are
+    dropped — or exchanged into a standalone archive table — which is a
+    metadata-only operation. Future partitions are pre-created out of `pmax`.
+
+    Unpartitioned tables (and SQLite/other backends) fall back to deleting in
+    small primary-key chunks, each in its own short transaction. A policy
+    may carry a row filter (metric_rollups: one policy per tier) and is then
+    always purged in chunks; 0 days keeps the rows forever.
+    """
+
+    def __init__(self, app, policies=None, granularity=PARTITION_GRANULARITY,
+                 mode=RETENTION_MODE, ahead=3, chunk_size=5000):
+        self.app = app
+        self.policies = policies or RETENTION_POLICIES
+        self.granularity = granularity
+        self.mode = mode
+        self.ahead = ahead
+        self.chunk_size = chunk_size
+
+    def run_once(self, now=None):
+        now = now or datetime.utcnow()
+        report = {}
+        with self.app.app_context():
+            for name, (model, column, days, *where) in self.policies.items():
+                if days <= 0:
+                    continue
+                cutoff = now - timedelta(days=days)
+                table = model.__tablename__
+                if not where and db.engine.dialect.name == "mysql" and self._partitions(table):
+                    self._add_future_partitions(table, now.date())
+                    report[name] = self._expire_partitions(table, cutoff.date())
+                else:
+                    report[name] = self._purge_in_chunks(model, column, cutoff, *where)
+        return report
+
+    def run_forever(self, interval=RETENTION_INTERVAL):
+        print(f"🗄 Retention job running every {interval}s ({self.mode} mode)")
+        while True:
+            try:
+                for table, result in self.run_once().items():
+                    if result:
+                        print(f"🗄 Retention {table}: {result}")
+            except Exception as e:
+                print(f"⚠ Retention Error: {e}")
+            time.sleep(interval)
+
+    # ---------------- MySQL partitions ----------------
+    def _partitions(self, table):
+        rows = db.session.execute(text("""
+            SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """), {"t": table}).all()
+        return [(name, None if desc == "MAXVALUE" else from_days(int(desc))) for name, desc in rows]
+
+    def _add_future_partitions(self, table, today):
+        bounds = [b for _, b in self._partitions(table) if b is not None]
+        planned = plan_new_partitions(max(bounds) if bounds else None, today,
+                                      self.granularity, self.ahead)
+        if not planned:
+            return
+        parts = ", ".join(
+            f"PARTITION {name} VALUES LESS THAN ({to_days(upper)})" for name, upper in planned
+        )
+        db.session.execute(text(
+            f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO "
+            f"({parts}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ))
+        db.session.commit()
+
+    def _expire_partitions(self, table, cutoff):
+        expired = expired_partitions(self._partitions(table), cutoff)
+        for name, _ in expired:
+            if self.mode == "archive":
+                archive = f"{table}_archive_{name[1:]}"
+                db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {archive} LIKE {table}"))
+                db.session.execute(text(f"ALTER TABLE {archive} REMOVE PARTITIONING"))
+                db.session.execute(text(
+                    f"ALTER TABLE {table} EXCHANGE PARTITION {name} WITH TABLE {archive}"
+                ))
+            db.session.execute(text(f"ALTER TABLE {table} DROP PARTITION {name}"))
+            db.session.commit()
+        return [name for name, _ in expired]
+
+    # ---------------- Chunked fallback ----------------
+    def _archive_table(self, table):
+        columns = [Column(c.name, c.type, primary_key=c.primary_key) for c in table.columns]
+        archive = Table(f"{table.name}_archive", MetaData(), *columns)
+        archive.create(db.engine, checkfirst=True)
+        return archive
+
+    def _purge_in_chunks(self, model, column, cutoff, where=None):
+        table = model.__table__
+        pk = list(table.primary_key.columns)[0]
+        archive = self._archive_table(table) if self.mode == "archive" else None
+        expired = table.c[column] < cutoff
+        if where:
+            expired = db.and_(expired, table.c[where[0]] == where[1])
+
+        removed = 0
+        while True:
+            ids = [r[0] for r in db.session.execute(
+                db.select(pk).where(expired).order_by(pk).limit(self.chunk_size)
+            )]
+            if not ids:
+                break
+            if archive is not None:
+                db.session.execute(archive.insert().from_select(
+                    [c.name for c in table.columns], db.select(table).where(pk.in_(ids))
+                ))
+            db.session.execute(table.delete().where(pk.in_(ids)))
+            db.session.commit()
+            removed += len(ids)
+        return removed
+
+
+def start_retention_thread(app):
+    manager = RetentionManager(app)
+    t = threading.Thread(target=manager.run_forever, name="retention", daemon=True)
+    t.start()
+    return manager
@@ -0,0 +1,236 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from os import getenv
+
+import numpy as np
+
+from database.db_config import db
+from database.models import SystemMetrics, MetricRollup, RollupWatermark
+
+# =======================================================
+# 📈 Metric Rollups: raw → 1m → 5m → 1h → 1d
+# =======================================================
+METRICS = ("CPU_Usage", "Memory_Usage", "Disk_IO", "Network_Latency", "Error_Rate")
+TIERS = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+
+ROLLUP_INTERVAL = int(getenv("ROLLUP_INTERVAL", "60"))        # seconds, 0 = job off
+ROLLUP_ID_OVERLAP = int(getenv("ROLLUP_ID_OVERLAP", "1000"))  # re-scan for out-of-order commits
+MAX_POINTS = int(getenv("METRICS_MAX_POINTS", "720"))
+
+EPOCH = datetime(1970, 1, 1)
+SOURCE = SystemMetrics.__tablename__
+
+
+def floor_time(ts, seconds):
+    return EPOCH + timedelta(seconds=int((ts - EPOCH).total_seconds()) // seconds * seconds)
+
+
+def windows(dirty, seconds, gap_buckets=60):
+    """
+    Group dirty (system_id, bucket_start) pairs into a few time windows of
+    [start, stop) so each tier is rebuilt with one range query per window
+    rather than one per system. Buckets further than `gap_buckets` apart
+    start a new window.
+    """
+    groups = []
+    for sid, bucket in sorted(dirty, key=lambda k: k[1]):
+        if groups and bucket - groups[-1][2] <= timedelta(seconds=seconds * gap_buckets):
+            groups[-1][0].add(sid)
+            groups[-1][2] = bucket
+        else:
+            groups.append([{sid}, bucket, bucket])
+    return [(sorted(systems), start, last + timedelta(seconds=seconds)) for systems, start, last in groups]
+
+
+def pick_resolution(start, end, requested=None):
+    """
+    Explicit resolution wins; otherwise the finest source (raw first, then
+    rollup tiers) that answers the range in at most MAX_POINTS points.
+    Raw is treated as one row per minute, as the agents write.
+    """
+    if requested and requested != "auto":
+        if requested != "raw" and requested not in TIERS:
+            raise ValueError(f"Unknown resolution '{requested}'")
+        return requested
+    span = (end - start).total_seconds()
+    for name, seconds in [("raw", 60)] + list(TIERS.items()):
+        if span / seconds <= MAX_POINTS:
+            return name
+    return "1d"
+
+
+def summarize(values):
+    """min / max / avg / p95 of raw samples."""
+    arr = np.asarray(values, dtype=float)
+    return arr.min(), arr.max(), arr.mean(), np.percentile(arr, 95)
+
+
+def merge(children, metric):
+    """
+    Combine lower-tier buckets. min/max/avg/count are exact; p95 is the
+    count-weighted 95th percentile of the child p95s (an approximation).
+    """
+    counts = np.array([c["samples"] for c in children], dtype=float)
+    p95s = np.array([c[f"{metric}_p95"] for c in children], dtype=float)
+    avgs = np.array([c[f"{metric}_avg"] for c in children], dtype=float)
+
+    order = np.argsort(p95s)
+    cum = np.cumsum(counts[order])
+    p95 = p95s[order][np.searchsorted(cum, 0.95 * cum[-1])]
+    return (
+        min(c[f"{metric}_min"] for c in children),
+        max(c[f"{metric}_max"] for c in children),
+        float((avgs * counts).sum() / counts.sum()),
+        float(p95),
+    )
+
+
+class RollupJob:
+    """
+    Incrementally maintains MetricRollup. Progress is the last raw metric_id
+    folded in (rollup_watermarks), not a time: every bucket touched by newer
+    rows — whatever its timestamp, and however late the agent flushed — is
+    re-aggregated for its system in every tier, in one transaction together
+    with the new watermark. No wall clock is involved, so agent timestamps in
+    any zone roll up immediately. ROLLUP_ID_OVERLAP already-seen ids are
+    re-scanned each run for rows whose INSERT committed out of id order.
+    """
+
+    def __init__(self, app, id_overlap=ROLLUP_ID_OVERLAP, batch_rows=50000):
+        self.app = app
+        self.id_overlap = id_overlap
+        self.batch_rows = batch_rows
+
+    def run_once(self):
+        written = dict.fromkeys(TIERS, 0)
+        with self.app.app_context():
+            state = db.session.get(RollupWatermark, SOURCE) or RollupWatermark(source=SOURCE, last_id=0)
+            since = max(state.last_id - self.id_overlap, 0)
+            while True:
+                rows = db.session.query(
+                    SystemMetrics.metric_id, SystemMetrics.system_id, SystemMetrics.recorded_at
+                ).filter(SystemMetrics.metric_id > since).order_by(
+                    SystemMetrics.metric_id).limit(self.batch_rows).all()
+                if not rows:
+                    break
+                dirty = {(sid, floor_time(ts, TIERS["1m"])) for _, sid, ts in rows if ts is not None}
+                for name, count in self._roll(dirty).items():
+                    written[name] += count
+                since = rows[-1][0]
+                state.last_id = max(state.last_id, since)
+                db.session.merge(state)
+                db.session.commit()
+                if len(rows) < self.batch_rows:
+                    break
+        return written
+
+    def run_forever(self, interval=ROLLUP_INTERVAL):
+        print(f"📈 Rollup job running every {interval}s")
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠ Rollup Error: {e}")
+            time.sleep(interval)
+
+    # ---------------------------------------------------
+    def _roll(self, dirty):
+        """Rebuild every tier for the (system_id, 1m bucket) pairs in `dirty`."""
+        written = {}
+        source = None
+        for name, seconds in TIERS.items():
+            dirty = {(sid, floor_time(b, seconds)) for sid, b in dirty}
+            count = 0
+            for systems, start, stop in windows(dirty, seconds):
+                rows = self._aggregate_raw(seconds, start, stop, systems) if source is None \
+                    else self._aggregate_tier(source, seconds, start, stop, systems)
+                MetricRollup.query.filter(
+                    MetricRollup.resolution == seconds,
+                    MetricRollup.system_id.in_(systems),
+                    MetricRollup.bucket_start >= start,
+                    MetricRollup.bucket_start < stop,
+                ).delete(synchronize_session=False)
+                if rows:
+                    db.session.execute(MetricRollup.__table__.insert(), rows)
+                count += len(rows)
+            written[name] = count
+            source = seconds
+        return written
+
+    def _aggregate_raw(self, seconds, start, stop, systems):
+        cols = [getattr(SystemMetrics, m) for m in METRICS]
+        raw = db.session.query(SystemMetrics.system_id, SystemMetrics.recorded_at, *cols).filter(
+            SystemMetrics.system_id.in_(systems),
+            SystemMetrics.recorded_at >= start, SystemMetrics.recorded_at < stop,
+        ).all()
+
+        buckets = {}
+        for sid, ts, *values in raw:
+            buckets.setdefault((sid, floor_time(ts, seconds)), []).append(values)
+
+        rows = []
+        for (sid, bucket), samples in buckets.items():
+            row = {"system_id": sid, "resolution": seconds, "bucket_start": bucket,
+                   "samples": len(samples)}
+            columns = list(zip(*samples))
+            for metric, values in zip(METRICS, columns):
+                values = [v for v in values if v is not None]
+                if values:
+                    lo, hi, avg, p95 = summarize(values)
+                else:
+                    lo = hi = avg = p95 = None
+                row.update({f"{metric}_min": lo, f"{metric}_max": hi,
+                            f"{metric}_avg": avg, f"{metric}_p95": p95})
+            rows.append(_as_floats(row))
+        return rows
+
+    def _aggregate_tier(self, source, seconds, start, stop, systems):
+        children = db.session.query(MetricRollup.__table__).filter(
+            MetricRollup.resolution == source,
+            MetricRollup.system_id.in_(systems),
+            MetricRollup.bucket_start >= start,
+            MetricRollup.bucket_start < stop,
+        ).all()
+
+        buckets = {}
+        for child in children:
+            child = child._asdict()
+            buckets.setdefault((child["system_id"], floor_time(child["bucket_start"], seconds)), []).append(child)
+
+        rows = []
+        for (sid, bucket), group in buckets.items():
+            row = {"system_id": sid, "resolution": seconds, "bucket_start": bucket,
+                   "samples": sum(c["samples"] for c in group)}
+            for metric in METRICS:
+                usable = [c for c in group if c[f"{metric}_avg"] is not None]
+                lo, hi, avg, p95 = merge(usable, metric) if usable else (None,) * 4
+                row.update({f"{metric}_min": lo, f"{metric}_max": hi,
+                            f"{metric}_avg": avg, f"{metric}_p95": p95})
+            rows.append(_as_floats(row))
+        return rows
+
+
+def _as_floats(row):
+    """numpy scalars → plain floats for the DB driver."""
+    return {k: float(v) if isinstance(v, np.floating) else v for k, v in row.items()}
+
+
+def serialize_rollup(r):
+    point = {
+        "timestamp": r.bucket_start.strftime("%Y-%m-%d %H:%M:%S"),
+        "samples": r.samples,
+    }
+    for metric in METRICS:
+        point[metric.lower()] = {
+            stat: getattr(r, f"{metric}_{stat}") for stat in ("min", "max", "avg", "p95")
+        }
+    return point
+
+
+def start_rollup_thread(app):
+    job = RollupJob(app)
+    t = threading.Thread(target=job.run_forever, name="rollups", daemon=True)
+    t.start()
+    return job
@@ -0,0 +1,89 @@
+import os
+import signal
+import sys
+import threading
+
+from flask import Flask
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from database.db_config import db, init_db
+from utils.notifier import send_alert
+from utils.alert_pipeline import PREDICTION_TAIL_INTERVAL, AlertPipeline, PredictionTail
+from utils.leader import LeaderJob
+from utils.retention import RETENTION_ENABLED, RETENTION_INTERVAL, RetentionManager
+from utils.rollups import ROLLUP_INTERVAL, RollupJob
+
+# =======================================================
+# ⚙ Background Job Worker
+# =======================================================
+# Runs the jobs that must happen once per deployment (alert pipeline,
+# retention, rollups) next to any number of WSGI web workers. Several
+# worker.py processes may run for failover: each job is guarded by a lease
+# in job_leases, so exactly one of them executes it at a time.
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", "2"))
+
+app = Flask(__name__)
+init_db(app)
+
+
+def alert_job():
+    """
+    Tail prediction_log into the alert pipeline, resuming from the last
+    leader's position. The pipeline runs only while the lease is held: it is
+    stopped on demotion, and every batch / digest flush checks the lease.
+    """
+    pipeline = AlertPipeline(app, send_alert=send_alert, workers=ALERT_WORKERS)
+    tail = PredictionTail(app, pipeline)
+
+    def on_elected(lease):
+        if not pipeline.running:
+            pipeline.start()  # also resumes the previous leader's cooldowns
+        tail.last_seen_id = lease.load_state().get("last_seen_id", tail.last_seen_id)
+        print(f"🚨 Alert tail resuming after prediction {tail.last_seen_id}")
+
+    def on_demoted(lease):
+        pipeline.stop()
+
+    def step(lease):
+        if tail.poll():
+            lease.save_state({"last_seen_id": tail.last_seen_id})
+
+    job = LeaderJob(app, "alerts", step, PREDICTION_TAIL_INTERVAL,
+                    on_elected=on_elected, on_demoted=on_demoted)
+    pipeline.active = lambda: job.lease.is_leader
+    return job
+
+
+def build_jobs():
+    jobs = [alert_job()] if PREDICTION_TAIL_INTERVAL > 0 else []
+    if RETENTION_ENABLED:
+        manager = RetentionManager(app)
+        jobs.append(LeaderJob(app, "retention", lambda lease: manager.run_once(), RETENTION_INTERVAL))
+    if ROLLUP_INTERVAL > 0:
+        rollups = RollupJob(app)
+        jobs.append(LeaderJob(app, "rollups", lambda lease: rollups.run_once(), ROLLUP_INTERVAL))
+    return jobs
+
+
+if __name__ == "__main__":
+    jobs = build_jobs()
+    for job in jobs:
+        job.start()
+    print(f"⚙ Worker running jobs: {', '.join(j.name for j in jobs)}")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Hand the leases over right away instead of waiting for them to expire
+        for job in jobs:
+            job.stop()
+        with app.app_context():
+            db.session.remove()
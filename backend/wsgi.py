@@ -0,0 +1,34 @@
+# =======================================================
+# 🌐 WSGI Entry Point (multi-worker production serving)
+# =======================================================
+# gunicorn -w 4 --threads 8 -b 0.0.0.0:5000 wsgi:application
+# waitress-serve --threads 16 --port 5000 wsgi:application
+#
+# These sync servers have a fixed number of request threads (32 above), so
+# the SSE endpoint /api/notifications/<id>/stream answers 503 there and
+# agents poll /claim (AGENT_NOTIFY_MODE=poll, the default). For push
+# delivery, run greenlet workers instead (pip install gevent):
+#
+# gunicorn -k gevent -w 4 --worker-connections 2000 -b 0.0.0.0:5000 wsgi:application
+#
+# Don't use gunicorn --preload: each worker must start its own background
+# threads after the fork. Alerts, retention and rollups are not run here —
+# start exactly the one `python worker.py` (or several; they elect a leader).
+#
+# Alert latency in this mode: an ingested prediction is picked up by the
+# worker's prediction_log tail (PREDICTION_TAIL_INTERVAL, 0.5 s) and the
+# notification reaches SSE streams through each web worker's DB feed
+# (NOTIFY_FEED_INTERVAL, 0.5 s): about 1 s worst case after the batch is
+# stored, versus immediate in the single-process server.
+import os
+import sys
+
+# Code shared with the agent and dashboard lives in <repo>/common
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app import app, start_web_services
+
+start_web_services()
+application = app
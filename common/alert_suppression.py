@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+
+# ======================================================
+# 🔹 Alert Storm Control (cooldown, hysteresis, digests)
+# ======================================================
+LEVELS = ("Low", "Medium", "High")
+
+
+def cooldowns_from_env():
+    """Seconds between alerts for the same (system, level); ALERT_COOLDOWN_<LEVEL>."""
+    return {
+        "Medium": float(os.getenv("ALERT_COOLDOWN_MEDIUM", "900")),
+        "High": float(os.getenv("ALERT_COOLDOWN_HIGH", "300")),
+    }
+
+
+def digest_suffix(alert):
+    """Text appended to an alert message when it stands for a merged burst."""
+    if not alert["suppressed"]:
+        return ""
+    return (f" — {alert['suppressed']} more in the last {alert['window'] / 60:.0f} min, "
+            f"peak {alert['peak']:.2f}%")
+
+
+class _KeyState:
+    __slots__ = ("last_sent", "suppressed", "peak", "latest")
+
+    def __init__(self):
+        self.last_sent = None
+        self.suppressed = 0
+        self.peak = 0.0
+        self.latest = 0.0
+
+
+class AlertSuppressor:
+    """
+    Decides which risk observations become notifications, keyed by
+    (system_id, risk_level):
+
+    * cooldown — after an alert, the same key stays quiet for its level's
+      cooldown; observations in between are only counted;
+    * hysteresis — a system enters a level at its threshold but only leaves
+      it once the probability drops `hysteresis` points below, so values
+      hovering around 75% or 85% don't flip levels every cycle;
+    * digests — when a cooldown ends with suppressed observations, one
+      alert summarizing them (count, peak, latest) is emitted instead of
+      the individual rows. Each level has its own key, so escalating to a
+      level that hasn't alerted recently goes out immediately.
+
+    observe() / flush_due() return alert dicts; callers format and store them.
+    """
+
+    def __init__(self, cooldowns=None, hysteresis=None, medium=75.0, high=85.0, clock=time.monotonic):
+        self.cooldowns = cooldowns or cooldowns_from_env()
+        if hysteresis is None:
+            hysteresis = float(os.getenv("ALERT_HYSTERESIS", "5"))
+        self.hysteresis = hysteresis
+        self.thresholds = {"Medium": medium, "High": high}
+        self.clock = clock
+        self._levels = {}  # system_id -> current level (with hysteresis)
+        self._keys = {}    # (system_id, level) -> _KeyState
+        self._lock = threading.Lock()
+        self.stats = {"observed": 0, "alerts": 0, "digests": 0, "suppressed": 0}
+
+    # --------------------------------------------------
+    # Levels
+    # --------------------------------------------------
+    def level_for(self, system_id, prob):
+        """Risk level for `prob` given the system's current level."""
+        current = self._levels.get(system_id, "Low")
+        raw = "High" if prob >= self.thresholds["High"] else \
+            "Medium" if prob >= self.thresholds["Medium"] else "Low"
+        if LEVELS.index(raw) >= LEVELS.index(current):
+            return raw
+        # Falling: stay one level up until clearly below that level's threshold
+        level = current
+        while level != "Low" and prob < self.thresholds[level] - self.hysteresis:
+            level = LEVELS[LEVELS.index(level) - 1]
+        return level
+
+    # --------------------------------------------------
+    # Observations
+    # --------------------------------------------------
+    def observe(self, system_id, prob, now=None):
+        """Feed one prediction; returns the alerts (0–2) it should produce."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.stats["observed"] += 1
+            previous = self._levels.get(system_id, "Low")
+            level = self.level_for(system_id, prob)
+            self._levels[system_id] = level
+
+            # The current level's own pending burst is folded into its alert below
+            alerts = self._due(system_id, now, skip=level)
+            if level == "Low":
+                return alerts
+
+            state = self._keys.setdefault((system_id, level), _KeyState())
+            cooldown = self.cooldowns[level]
+            if state.last_sent is None or now - state.last_sent >= cooldown:
+                if LEVELS.index(level) > LEVELS.index(previous):
+                    # Escalation: fold anything pending on the lower level into this alert
+                    for lower in LEVELS[1:LEVELS.index(level)]:
+                        pending = self._keys.get((system_id, lower))
+                        if pending and pending.suppressed:
+                            state.suppressed += pending.suppressed
+                            state.peak = max(state.peak, pending.peak)
+                            pending.suppressed = 0
+                            pending.peak = 0.0
+                alerts.append(self._emit(system_id, level, state, prob, now))
+            else:
+                state.suppressed += 1
+                state.peak = max(state.peak, prob)
+                state.latest = prob
+                self.stats["suppressed"] += 1
+            return alerts
+
+    def flush_due(self, now=None):
+        """Digests for every key whose cooldown has ended with suppressed observations."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            alerts = []
+            for system_id in {sid for sid, _ in self._keys}:
+                alerts.extend(self._due(system_id, now))
+            self._prune(now)
+            return alerts
+
+    def mark_sent(self, system_id, level, age=0.0):
+        """Record an alert sent `age` seconds ago (e.g. read back from the DB on start)."""
+        with self._lock:
+            state = self._keys.setdefault((system_id, level), _KeyState())
+            sent = self.clock() - age
+            if state.last_sent is None or sent > state.last_sent:
+                state.last_sent = sent
+            if LEVELS.index(level) > LEVELS.index(self._levels.get(system_id, "Low")):
+                self._levels[system_id] = level
+
+    # --------------------------------------------------
+    # Internals (caller holds the lock)
+    # --------------------------------------------------
+    def _due(self, system_id, now, skip=None):
+        alerts = []
+        for level in LEVELS[1:]:
+            if level == skip:
+                continue
+            state = self._keys.get((system_id, level))
+            if state and state.suppressed and now - state.last_sent >= self.cooldowns[level]:
+                alerts.append(self._emit(system_id, level, state, state.latest, now))
+        return alerts
+
+    def _emit(self, system_id, level, state, prob, now):
+        alert = {
+            "system_id": system_id,
+            "risk_level": level,
+            "probability": prob,
+            "suppressed": state.suppressed,
+            "peak": max(state.peak, prob),
+            "window": now - state.last_sent if state.last_sent is not None else 0.0,
+        }
+        self.stats["digests" if state.suppressed else "alerts"] += 1
+        state.last_sent = now
+        state.suppressed = 0
+        state.peak = 0.0
+        return alert
+
+    def _prune(self, now):
+        """Forget keys that have been quiet for two cooldowns (bounded memory)."""
+        for key in [k for k, s in self._keys.items()
+                    if not s.suppressed and now - s.last_sent >= 2 * self.cooldowns[k[1]]]:
+            del self._keys[key]
+            if not any(sid == key[0] for sid, _ in self._keys) and self._levels.get(key[0]) == "Low":
+                self._levels.pop(key[0], None)
@@ -0,0 +1,145 @@
+import math
+import os
+import pickle
+
+# ======================================================
+# 🔹 Streaming Feature Pipeline
+# ======================================================
+RAW_METRICS = ("CPU_Usage", "Memory_Usage", "Disk_IO", "Network_Latency", "Error_Rate")
+
+# Same order as backend/features.pkl (used when the file is not available)
+DEFAULT_FEATURE_NAMES = list(RAW_METRICS) + [
+    f"{m}_{kind}" for m in RAW_METRICS for kind in ("diff", "roll_mean", "roll_std")
+]
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURES_PATH = os.getenv("FEATURES_PATH", os.path.join(ROOT_DIR, "backend", "features.pkl"))
+FEATURE_WINDOW = int(os.getenv("FEATURE_WINDOW", "5"))
+EWMA_ALPHA = float(os.getenv("FEATURE_EWMA_ALPHA", "0.3"))
+
+
+def load_feature_names(path=FEATURES_PATH):
+    """Feature order the model was trained with (features.pkl is a pickled list)."""
+    try:
+        with open(path, "rb") as f:
+            return list(pickle.load(f))
+    except (OSError, pickle.UnpicklingError) as e:
+        print(f"ℹ Using default feature list ({e})")
+        return list(DEFAULT_FEATURE_NAMES)
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer with running sums, so mean / std / slope / EWMA are
+    O(1) per sample. Sums are recomputed exactly once per lap of the buffer to
+    stop floating-point drift.
+    """
+
+    __slots__ = ("size", "values", "pos", "count", "sum", "sumsq", "sumxy",
+                 "last", "prev", "ewma", "alpha")
+
+    def __init__(self, size, alpha=EWMA_ALPHA):
+        self.size = size
+        self.values = [0.0] * size
+        self.pos = 0          # next slot to overwrite (= oldest when full)
+        self.count = 0
+        self.sum = self.sumsq = self.sumxy = 0.0
+        self.last = self.prev = None
+        self.ewma = None
+        self.alpha = alpha
+
+    def push(self, x):
+        x = float(x)
+        n = self.count
+        if n < self.size:
+            # x-positions are 0..n-1 in arrival order
+            self.sumxy += n * x
+            self.sum += x
+            self.sumsq += x * x
+            self.count += 1
+        else:
+            oldest = self.values[self.pos]
+            # Every remaining sample moves one position left; x enters at size-1
+            self.sumxy += -(self.sum - oldest) + (self.size - 1) * x
+            self.sum += x - oldest
+            self.sumsq += x * x - oldest * oldest
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+        if self.pos == 0 and self.count == self.size:
+            self._resync()
+
+        self.prev, self.last = self.last, x
+        self.ewma = x if self.ewma is None else self.alpha * x + (1 - self.alpha) * self.ewma
+
+    def _resync(self):
+        ordered = self.values[self.pos:] + self.values[:self.pos]
+        self.sum = sum(ordered)
+        self.sumsq = sum(v * v for v in ordered)
+        self.sumxy = sum(i * v for i, v in enumerate(ordered))
+
+    def diff(self):
+        return 0.0 if self.prev is None else self.last - self.prev
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas .rolling().std())."""
+        n = self.count
+        if n < 2:
+            return 0.0
+        var = (self.sumsq - self.sum * self.sum / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def slope(self):
+        """Least-squares slope per sample over the window."""
+        n = self.count
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self.sumxy - sum_x * self.sum) / (n * sum_xx - sum_x * sum_x)
+
+
+STATS = {
+    "diff": RollingWindow.diff,
+    "roll_mean": RollingWindow.mean,
+    "roll_std": RollingWindow.std,
+    "slope": RollingWindow.slope,
+    "ewma": lambda w: w.ewma if w.ewma is not None else 0.0,
+}
+
+
+def _parse(name):
+    for metric in RAW_METRICS:
+        if name == metric:
+            return metric, None
+        if name.startswith(metric + "_") and name[len(metric) + 1:] in STATS:
+            return metric, name[len(metric) + 1:]
+    raise ValueError(f"Unsupported feature '{name}'")
+
+
+class FeaturePipeline:
+    """
+    Keeps one RollingWindow per (system, metric) and turns each new sample into
+    the full feature vector named in features.pkl — no database reads.
+    """
+
+    def __init__(self, feature_names=None, window=FEATURE_WINDOW):
+        self.feature_names = feature_names or load_feature_names()
+        self.window = window
+        self._plan = [_parse(name) for name in self.feature_names]
+        self._state = {}
+
+    def update(self, system_id, metrics):
+        """Add one sample for `system_id` and return its feature vector."""
+        windows = self._state.get(system_id)
+        if windows is None:
+            windows = self._state[system_id] = {m: RollingWindow(self.window) for m in RAW_METRICS}
+        for m in RAW_METRICS:
+            windows[m].push(metrics[m])
+
+        return [
+            float(metrics[metric]) if stat is None else STATS[stat](windows[metric])
+            for metric, stat in self._plan
+        ]
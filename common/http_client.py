@@ -0,0 +1,166 @@
+import gzip
+import json
+import random
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ======================================================
+# 🔹 Shared Pooled HTTP Client (agent + dashboard)
+# ======================================================
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class CircuitOpen(requests.ConnectionError):
+    """Raised without touching the network while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds; then lets a single trial call through (half-open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class HttpClient:
+    """
+    One keep-alive connection pool per backend. Requests accept gzip responses,
+    can gzip their JSON body, retry transient failures (connection errors,
+    timeouts, 429/502/503/504) with full-jitter exponential backoff, and
+    fail fast through a circuit breaker while the backend is down.
+    """
+
+    def __init__(self, base_url="", timeout=10, retries=3, backoff_base=0.5,
+                 backoff_max=30, pool_size=10, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip"})
+
+    def url(self, path):
+        return path if path.startswith(("http://", "https://")) else f"{self.base_url}{path}"
+
+    def backoff(self, attempt, retry_after=None):
+        """Full jitter: uniform(0, min(max, base * 2^attempt)), at least Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    def request(self, method, path, json_body=None, compress=False, retries=None,
+                timeout=None, **kwargs):
+        """
+        Send a request and return the Response. Raises CircuitOpen while the
+        breaker is open, or the last error once retries are exhausted.
+        Non-idempotent callers that retry themselves should pass retries=0.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        if json_body is not None:
+            data = json.dumps(json_body, default=_json_default).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+            if compress:
+                data = gzip.compress(data)
+                headers["Content-Encoding"] = "gzip"
+            kwargs["data"] = data
+
+        retries = self.retries if retries is None else retries
+        url = self.url(path)
+        error = None
+        for attempt in range(retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpen(
+                    f"Circuit open for {self.base_url or url}; retry in {self.breaker.retry_in():.0f}s"
+                )
+            retry_after = None
+            try:
+                res = self.session.request(method, url, headers=headers,
+                                           timeout=timeout or self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except Exception:
+                # Any other error (SSL, invalid response, …) still ends a half-open trial
+                self.breaker.record_failure()
+                raise
+            else:
+                if res.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return res
+                retry_after = res.headers.get("Retry-After")
+                error = requests.HTTPError(f"{res.status_code} from {url}", response=res)
+                res.close()
+
+            self.breaker.record_failure()
+            if attempt < retries:
+                time.sleep(self.backoff(attempt, retry_after))
+        raise error
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, json_body=None, **kwargs):
+        return self.request("POST", path, json_body=json_body, **kwargs)
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+# ======================================================
+# 🔹 Shared Downtime Prediction (agent + backend)
+# ======================================================
+# Probability (0–1) of the downtime class at or above which a row is labelled 1
+DECISION_THRESHOLD = float(os.getenv("DOWNTIME_THRESHOLD", "0.5"))
+
+
+def _positive_column(model):
+    classes = list(getattr(model, "classes_", [0, 1]))
+    return classes.index(1) if 1 in classes else len(classes) - 1
+
+
+def predict_batch(model, scaler, rows, threshold=None):
+    """
+    Scores any number of feature rows with ONE model evaluation.
+
+    Returns (labels, probabilities) as NumPy arrays; probabilities are in
+    percent. The label is derived from the probability and `threshold`
+    instead of a second `model.predict` pass. Models without predict_proba
+    fall back to `predict` and return probabilities of None.
+    """
+    threshold = DECISION_THRESHOLD if threshold is None else threshold
+    X = np.asarray(rows, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if scaler is not None:
+        X = scaler.transform(X)
+
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(X)[:, _positive_column(model)]
+        return (proba >= threshold).astype(int), proba * 100
+
+    return np.asarray(model.predict(X)).astype(int), None
+
+
+def predict_one(model, scaler, features, threshold=None):
+    """Single-row convenience wrapper: (label, probability % or None)."""
+    labels, probs = predict_batch(model, scaler, [features], threshold)
+    return int(labels[0]), (float(probs[0]) if probs is not None else None)
@@ -0,0 +1,184 @@
+import asyncio
+import bisect
+import os
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+# ======================================================
+# 🔹 Concurrent Network Latency Prober
+# ======================================================
+# Upper bounds (ms) of the per-target latency histogram; the last bucket is +inf
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+def parse_targets(spec):
+    """'host:port, https://host/path' → list of target strings."""
+    return [t.strip() for t in (spec or "").split(",") if t.strip()]
+
+
+class TargetStats:
+    __slots__ = ("histogram", "attempts", "errors", "last_ms", "last_error")
+
+    def __init__(self):
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.attempts = 0
+        self.errors = 0
+        self.last_ms = None
+        self.last_error = None
+
+    def as_dict(self):
+        labels = [f"le_{b}" for b in BUCKETS_MS] + ["inf"]
+        return {
+            "attempts": self.attempts,
+            "errors": self.errors,
+            "last_ms": self.last_ms,
+            "last_error": self.last_error,
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class LatencyProber:
+    """
+    Measures round-trip times to many targets at once on an asyncio loop.
+    'host:port' targets time a TCP connect; 'http(s)://' targets time connect
+    + request + status line. Every probe has its own timeout and all run
+    concurrently, so a round costs about as long as the slowest single probe.
+    """
+
+    def __init__(self, targets, timeout=2.0, interval=15.0, max_concurrency=100):
+        self.targets = list(targets)
+        self.timeout = timeout
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.stats = {t: TargetStats() for t in self.targets}
+        self._window = []  # (ok, ms) since the last take_window()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    # --------------------------------------------------
+    # Single probes
+    # --------------------------------------------------
+    async def _tcp(self, host, port):
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _http(self, url):
+        parts = urlsplit(url)
+        https = parts.scheme == "https"
+        port = parts.port or (443 if https else 80)
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if https else None
+        )
+        try:
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {parts.hostname}\r\n"
+                f"User-Agent: downtime-agent-probe\r\nConnection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+        finally:
+            writer.close()
+        status = int(status_line.split()[1]) if status_line.startswith(b"HTTP/") else 0
+        if not 200 <= status < 400:
+            raise ConnectionError(f"HTTP {status or 'no response'}")
+
+    async def probe(self, target):
+        """Returns (ok, elapsed_ms, error) for one target — never raises."""
+        t0 = time.perf_counter()
+        try:
+            if target.startswith(("http://", "https://")):
+                coro = self._http(target)
+            else:
+                host, _, port = target.rpartition(":")
+                coro = self._tcp(host, int(port))
+            await asyncio.wait_for(coro, self.timeout)
+            return True, (time.perf_counter() - t0) * 1000, None
+        except asyncio.TimeoutError:
+            return False, self.timeout * 1000, "timeout"
+        except Exception as e:
+            return False, (time.perf_counter() - t0) * 1000, str(e) or type(e).__name__
+
+    async def probe_all(self):
+        """Probe every target concurrently and record the results."""
+        sem = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(target):
+            async with sem:
+                return await self.probe(target)
+
+        results = await asyncio.gather(*(bounded(t) for t in self.targets))
+        with self._lock:
+            for target, (ok, ms, error) in zip(self.targets, results):
+                s = self.stats[target]
+                s.attempts += 1
+                if ok:
+                    s.last_ms = round(ms, 3)
+                    s.histogram[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+                else:
+                    s.errors += 1
+                    s.last_error = error
+                self._window.append((ok, ms))
+        return dict(zip(self.targets, results))
+
+    def run_once(self):
+        return asyncio.run(self.probe_all())
+
+    # --------------------------------------------------
+    # Aggregates for the prediction loop
+    # --------------------------------------------------
+    def take_window(self):
+        """
+        Network_Latency = mean successful RTT (ms); Error_Rate = % failed probes,
+        over everything since the previous call. If every probe failed the
+        latency is reported as the timeout.
+        """
+        with self._lock:
+            window, self._window = self._window, []
+        if not window:
+            return {"Network_Latency": 0.0, "Error_Rate": 0.0, "probes": 0}
+        ok = [ms for good, ms in window if good]
+        return {
+            "Network_Latency": round(sum(ok) / len(ok), 3) if ok else self.timeout * 1000,
+            "Error_Rate": round(100.0 * (len(window) - len(ok)) / len(window), 2),
+            "probes": len(window),
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return {t: s.as_dict() for t, s in self.stats.items()}
+
+    # --------------------------------------------------
+    # Background loop (own thread + event loop)
+    # --------------------------------------------------
+    async def run_forever(self):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while not self._stop.is_set():
+            await self.probe_all()
+            next_at += self.interval
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+    def start(self):
+        if self._thread is None and self.targets:
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self.run_forever()), name="latency-prober", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def default_targets(fallback):
+    return parse_targets(os.getenv("PROBE_TARGETS")) or parse_targets(fallback)
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import deque
+
+import psutil
+
+# ======================================================
+# 🔹 Background Metric Sampler
+# ======================================================
+MB = 1024 * 1024
+SAMPLED = ("CPU_Usage", "Memory_Usage", "Disk_IO", "Net_IO")
+
+
+def _io_total(counters, *fields):
+    if counters is None:
+        return None
+    return sum(getattr(counters, f, 0) for f in fields)
+
+
+class MetricSampler:
+    """
+    Takes cheap, non-blocking snapshots every `interval` seconds on its own
+    thread. CPU comes from psutil's delta since the previous call; disk and
+    network throughput (MB/s) from counter deltas. The prediction loop calls
+    `take_window()` to get min / max / mean over everything sampled since its
+    last call.
+    """
+
+    def __init__(self, interval=5.0, max_samples=720):
+        self.interval = interval
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_counters = None
+        psutil.cpu_percent(interval=None)  # prime: the first call always returns 0.0
+        self._last_counters = self._read_counters()
+
+    def _read_counters(self):
+        disk = psutil.disk_io_counters() if hasattr(psutil, "disk_io_counters") else None
+        net = psutil.net_io_counters() if hasattr(psutil, "net_io_counters") else None
+        return (
+            time.monotonic(),
+            _io_total(disk, "read_bytes", "write_bytes"),
+            _io_total(net, "bytes_sent", "bytes_recv"),
+        )
+
+    def sample(self):
+        """Take one snapshot now and add it to the current window."""
+        now, disk, net = counters = self._read_counters()
+        last_t, last_disk, last_net = self._last_counters
+        self._last_counters = counters
+        dt = max(now - last_t, 1e-6)
+
+        def rate(cur, prev):
+            # Counters can be missing or wrap/reset (e.g. device hot-plug)
+            if cur is None or prev is None or cur < prev:
+                return 0.0
+            return (cur - prev) / dt / MB
+
+        snapshot = {
+            "CPU_Usage": psutil.cpu_percent(interval=None),
+            "Memory_Usage": psutil.virtual_memory().percent,
+            "Disk_IO": rate(disk, last_disk),
+            "Net_IO": rate(net, last_net),
+        }
+        with self._lock:
+            self._samples.append(snapshot)
+        return snapshot
+
+    def take_window(self):
+        """Aggregate and clear everything sampled since the last call."""
+        with self._lock:
+            samples = list(self._samples)
+            self._samples.clear()
+        if not samples:
+            samples = [self.sample()]
+            with self._lock:
+                self._samples.clear()
+
+        window = {"samples": len(samples)}
+        for key in SAMPLED:
+            values = [s[key] for s in samples]
+            window[key] = {
+                "min": min(values),
+                "max": max(values),
+                "mean": sum(values) / len(values),
+            }
+        return window
+
+    # --------------------------------------------------
+    def _run(self):
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠ Sampler error: {e}")
+            next_at += self.interval
+            self._stop.wait(max(0.0, next_at - time.monotonic()))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metric-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
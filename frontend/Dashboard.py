@@ -1,8 +1,14 @@
+import os
+import sys
+import threading
+from collections import deque
 import streamlit as st
 import pandas as pd
-import requests
 import time
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.http_client import CircuitOpen, HttpClient
+
 # ======================================================
 # ⚙️ Configuration
 # ======================================================
@@ -11,7 +17,9 @@ LOGIN_API = f"{API_BASE}/api/login"
 REGISTER_API = f"{API_BASE}/api/register"
 PREDICT_API = f"{API_BASE}/api/predict"  # fixed endpoint
 NOTIFICATIONS_API = f"{API_BASE}/api/notifications"
-REFRESH_INTERVAL = 10  # seconds
+ADMIN_NOTIFICATIONS_API = f"{API_BASE}/api/notifications/admin"
+REFRESH_INTERVAL = 10  # seconds — also the shared cache TTL
+FEED_SIZE = 10  # notifications kept per admin
 
 
 # ======================================================
@@ -33,23 +41,86 @@ def init_session():
 # ======================================================
 # 🔹 Helper: Fetch Data from Backend
 # ======================================================
+@st.cache_resource
+def get_client():
+    """One pooled client per Streamlit server, shared across reruns and sessions."""
+    return HttpClient(API_BASE, timeout=10, retries=2)
+
+
 def fetch_json(url, method="GET", payload=None):
     try:
         if method == "POST":
-            res = requests.post(url, json=payload, timeout=10)
+            res = get_client().post(url, payload, retries=0)
         else:
-            res = requests.get(url, timeout=10)
+            res = get_client().get(url)
 
         if res.status_code == 200:
             return res.json()
         else:
             st.warning(f"⚠️ API error: {res.status_code}")
             return None
+    except CircuitOpen as e:
+        st.warning(f"⏸ Backend unavailable — {e}")
+        return None
     except Exception as e:
         st.error(f"❌ Connection error: {e}")
         return None
 
 
+# ======================================================
+# 🗄 Shared Caches (one backend call per TTL for all viewers)
+# ======================================================
+@st.cache_data(ttl=REFRESH_INTERVAL, show_spinner=False)
+def _cached_get(url):
+    # Raises on failure so errors are never cached
+    res = get_client().get(url)
+    res.raise_for_status()
+    return res.json()
+
+
+def fetch_cached(url):
+    try:
+        return _cached_get(url)
+    except CircuitOpen as e:
+        st.warning(f"⏸ Backend unavailable — {e}")
+    except Exception as e:
+        st.error(f"❌ Connection error: {e}")
+    return None
+
+
+class NotificationFeed:
+    """
+    Per-admin notification tail shared by every session: at most one request
+    per REFRESH_INTERVAL, asking only for rows after the last id seen.
+    """
+
+    def __init__(self, admin_id):
+        self.admin_id = admin_id
+        self.last_id = 0
+        self.items = deque(maxlen=FEED_SIZE)
+        self.fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            if time.monotonic() - self.fetched_at < REFRESH_INTERVAL:
+                return list(self.items)
+            url = f"{ADMIN_NOTIFICATIONS_API}/{self.admin_id}?limit={FEED_SIZE}"
+            if self.last_id:
+                url += f"&after_id={self.last_id}"
+            data = fetch_json(url)
+            if data is not None:
+                self.items.extend(data.get("notifications", []))
+                self.last_id = data.get("last_id") or self.last_id
+                self.fetched_at = time.monotonic()
+            return list(self.items)
+
+
+@st.cache_resource
+def notification_feed(admin_id):
+    return NotificationFeed(admin_id)
+
+
 # ======================================================
 # 🧾 Registration Page
 # ======================================================
@@ -121,21 +192,36 @@ def admin_dashboard():
     st.title(f"👋 Welcome, {st.session_state.admin_name}")
     st.subheader("📡 Real-Time System Monitoring")
 
-    # Fetch prediction data from backend
-    pred_data = fetch_json(PREDICT_API)
+    # Only this fragment re-runs on the timer — no sleeping worker threads
+    run_every = REFRESH_INTERVAL if st.session_state.auto_refresh else None
+    st.fragment(run_every=run_every)(live_panel)()
+
+    st.markdown("---")
+    if st.session_state.auto_refresh:
+        st.info(f"🔄 Auto-refresh every {REFRESH_INTERVAL}s")
+
+
+def fmt_metric(value, suffix="", spec=""):
+    """Metric text for st.metric; "N/A" while a system has a prediction but no metrics yet."""
+    return "N/A" if value is None else f"{value:{spec}}{suffix}"
+
+
+def live_panel():
+    # Fetch prediction data from backend (shared TTL cache)
+    pred_data = fetch_cached(PREDICT_API)
     if not pred_data:
         st.warning("Backend not responding or system inactive.")
         return
 
     # === Metrics Display ===
     c1, c2, c3 = st.columns(3)
-    c1.metric("💻 CPU Usage", f"{pred_data['CPU_Usage']}%")
-    c2.metric("🧠 Memory Usage", f"{pred_data['Memory_Usage']}%")
-    c3.metric("💾 Disk I/O", f"{pred_data['Disk_IO']}%")
+    c1.metric("💻 CPU Usage", fmt_metric(pred_data.get("CPU_Usage"), "%"))
+    c2.metric("🧠 Memory Usage", fmt_metric(pred_data.get("Memory_Usage"), "%"))
+    c3.metric("💾 Disk I/O", fmt_metric(pred_data.get("Disk_IO"), " MB/s", ".2f"))
 
     c4, c5 = st.columns(2)
-    c4.metric("📡 Network Latency", f"{pred_data['Network_Latency']} ms")
-    c5.metric("❌ Error Rate", f"{pred_data['Error_Rate']:.2f}")
+    c4.metric("📡 Network Latency", fmt_metric(pred_data.get("Network_Latency"), " ms"))
+    c5.metric("❌ Error Rate", fmt_metric(pred_data.get("Error_Rate"), spec=".2f"))
 
     risk_color = "🔴" if "⚠" in pred_data["Prediction"] else "🟢"
     st.markdown(f"### Current Status: {risk_color} {pred_data['Prediction']}")
@@ -145,9 +231,9 @@ def admin_dashboard():
 
     # === Notification Fetch ===
     st.subheader("📢 Recent Notifications")
-    notif_data = fetch_json(f"{NOTIFICATIONS_API}/1")  # admin ID placeholder
-    if notif_data and notif_data.get("notifications"):
-        for n in notif_data["notifications"][-10:][::-1]:
+    notifications = notification_feed(st.session_state.admin_id).refresh()
+    if notifications:
+        for n in notifications[::-1]:
             risk = n["risk_level"]
             color = "red" if risk == "High" else "orange" if risk == "Medium" else "green"
             st.markdown(
@@ -162,12 +248,6 @@ def admin_dashboard():
     else:
         st.info("✅ No new notifications.")
 
-    st.markdown("---")
-    st.info(f"🔄 Auto-refresh every {REFRESH_INTERVAL}s")
-    if st.session_state.auto_refresh:
-        time.sleep(REFRESH_INTERVAL)
-        st.rerun()
-
 
 # ======================================================
 # 🚀 Main Function
@@ -0,0 +1,61 @@
+# tests/test_alert_suppression.py
+import sys
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from common.alert_suppression import AlertSuppressor, digest_suffix
+
+
+def make():
+    return AlertSuppressor(cooldowns={"Medium": 600, "High": 300}, hysteresis=5)
+
+
+def test_cooldown_merges_a_burst_into_one_digest():
+    s = make()
+    # A system hovering around 80% for 10 minutes, one prediction per minute
+    alerts = []
+    for minute, prob in enumerate([76, 79.5, 77, 81, 78, 80, 76.5, 82, 79, 77]):
+        alerts += s.observe(1, prob, now=minute * 60)
+    assert [(a["risk_level"], a["suppressed"]) for a in alerts] == [("Medium", 0)]
+
+    # Cooldown over: the next observation carries the merged burst
+    digest = s.observe(1, 78, now=600)[0]
+    assert (digest["suppressed"], digest["peak"], digest["probability"]) == (9, 82, 78)
+    assert digest_suffix(digest) == " — 9 more in the last 10 min, peak 82.00%"
+
+    # A burst that just stops is flushed on the idle tick instead
+    s.observe(1, 79, now=700)
+    assert s.flush_due(now=1000) == []
+    assert [a["suppressed"] for a in s.flush_due(now=1200)] == [1]
+    assert s.flush_due(now=1300) == []
+
+
+def test_hysteresis_and_escalation():
+    s = make()
+    assert s.level_for(1, 74) == "Low"
+    s.observe(1, 76, now=0)
+    # Dipping just under 75 keeps the Medium level instead of flapping
+    assert s.level_for(1, 72) == "Medium" and s.level_for(1, 69) == "Low"
+
+    s.observe(1, 78, now=10)  # suppressed
+    high = s.observe(1, 90, now=20)
+    assert [(a["risk_level"], a["suppressed"]) for a in high] == [("High", 1)]
+    # 82% stays High (above 85 - 5); flapping 82 ↔ 90 is held by the High cooldown
+    assert s.observe(1, 82, now=30) == [] and s.observe(1, 90, now=40) == []
+    assert s.level_for(1, 79) == "Medium"
+
+    # Separate systems are independent
+    assert s.observe(2, 95, now=40)[0]["risk_level"] == "High"
+    assert s.stats == {"observed": 6, "alerts": 2, "digests": 1, "suppressed": 3}
+
+
+def test_mark_sent_resumes_cooldown_and_prunes():
+    s = AlertSuppressor(cooldowns={"Medium": 600, "High": 300}, hysteresis=5, clock=lambda: 1000.0)
+    s.mark_sent(1, "High", age=100)
+    assert s.observe(1, 90) == []
+    assert len(s.observe(1, 90, now=1200)) == 1
+    s.observe(1, 10, now=1300)
+    s.flush_due(now=1900)
+    assert s._keys == {} and s._levels == {}
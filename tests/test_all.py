@@ -44,7 +44,7 @@ stub("twilio", {"rest": twilio_rest})
 sys.modules["twilio.rest"] = twilio_rest
 
 # mysql connector stub
-mysql_stub = types.SimpleNamespace(connect=lambda *a, **k: None)
+mysql_stub = types.SimpleNamespace(connect=lambda *a, **k: None, paramstyle="pyformat")
 stub("mysql", {"connector": mysql_stub})
 sys.modules["mysql.connector"] = mysql_stub
 
@@ -81,23 +81,10 @@ def test_auto_load_model_no_files(monkeypatch):
 
 
 def test_make_prediction(monkeypatch):
-    """Prediction logic should add entries into fake DB session."""
-    class FakeSession:
-        def __init__(self):
-            self.added = []
-
-        def add(self, x):
-            self.added.append(x)
-
-        def commit(self):
-            pass
-
-    fake_db = types.SimpleNamespace(
-        session=FakeSession(),
-        text=lambda t: t
-    )
-
-    monkeypatch.setattr(agent, "db", fake_db)
+    """Prediction logic should queue metric + prediction rows in the write buffer."""
+    flushed = []
+    buf = agent.WriteBuffer(sink=flushed.append, max_batch=100, flush_interval=3600)
+    monkeypatch.setattr(agent, "write_buffer", buf)
 
     admin = types.SimpleNamespace(admin_id=1)
     system = types.SimpleNamespace(system_id=2, system_name="TestSystem")
@@ -112,4 +99,9 @@ def test_make_prediction(monkeypatch):
 
     agent.make_prediction(metrics, admin, system, None, None)
 
-    assert len(fake_db.session.added) > 0
+    assert len(buf) == 2
+    assert flushed == []
+
+    buf.flush()
+    assert [sorted(b) for b in flushed] == [["metrics", "predictions"]]
+    assert flushed[0]["metrics"][0]["system_id"] == 2
@@ -0,0 +1,740 @@
+# tests/test_backend.py
+import sys
+import os
+import gzip
+import json
+import time
+import types
+
+# ------------------------------------------------------------
+# Run the Flask backend against an in-memory SQLite database
+# ------------------------------------------------------------
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+os.environ["DATABASE_URL"] = "sqlite://"
+
+# utils.notifier (Twilio alerts) is deployment-specific — stub it
+sent_alerts = []
+notifier_stub = types.ModuleType("utils.notifier")
+notifier_stub.send_alert = lambda system_id, msg: sent_alerts.append((system_id, msg))
+sys.modules["utils.notifier"] = notifier_stub
+
+import app as backend
+from database.db_config import db
+from database.models import Admin, SystemInfo, SystemMetrics, PredictionLog, Notification, MetricRollup
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    with backend.app.app_context():
+        db.drop_all()
+        db.create_all()
+        admin = Admin(name="A", email="a@example.com", password_hash="x")
+        db.session.add(admin)
+        db.session.commit()
+        db.session.add(SystemInfo(system_name="node-1", admin_id=admin.admin_id))
+        db.session.commit()
+    backend.response_cache.__init__()  # fresh in-memory cache per test database
+    return backend.app.test_client()
+
+
+def test_ingest_gzip_batch(client):
+    batch = {
+        "metrics": [
+            {"system_id": 1, "timestamp": f"2024-01-01T00:0{i}:00", "CPU_Usage": 10.0 + i,
+             "Memory_Usage": 50.0, "Disk_IO": 1.0, "Network_Latency": 5.0, "Error_Rate": 0.0}
+            for i in range(5)
+        ],
+        "predictions": [
+            {"system_id": 1, "downtime_risk": False, "probability": 12.5,
+             "created_at": "2024-01-01T00:04:00"}
+        ],
+    }
+    res = client.post(
+        "/api/ingest",
+        data=gzip.compress(json.dumps(batch).encode()),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert res.status_code == 200
+    assert res.get_json()["stored"] == {"metrics": 5, "predictions": 1}
+
+    with backend.app.app_context():
+        assert SystemMetrics.query.count() == 5
+        assert PredictionLog.query.count() == 1
+
+
+def test_ingest_rejects_bad_rows(client):
+    res = client.post("/api/ingest", json={"metrics": [{"system_id": 1}]})
+    assert res.status_code == 400
+    res = client.post("/api/ingest", json={"bogus": []})
+    assert res.status_code == 400
+    with backend.app.app_context():
+        assert SystemMetrics.query.count() == 0
+
+
+def test_alert_pipeline_batches_and_dedups(client):
+    from datetime import datetime, timedelta
+    pipeline = backend.AlertPipeline(backend.app, send_alert=notifier_stub.send_alert, dedup_window=60)
+    t0 = datetime(2024, 5, 1, 12, 0, 0)
+    pipeline.publish([
+        {"system_id": 1, "probability": 90.0, "created_at": t0},
+        {"system_id": 1, "probability": 90.0, "created_at": t0},
+        {"system_id": 1, "probability": 20.0},   # below threshold, only updates the level
+        {"system_id": 999, "probability": 80.0},  # unknown system, skipped
+    ])
+    items = [pipeline._queue.get_nowait() for _ in range(pipeline._queue.qsize())]
+    assert len(items) == 4
+
+    with backend.app.app_context():
+        rows = pipeline.process(items)
+        assert [r["risk_level"] for r in rows] == ["High"]
+        assert Notification.query.count() == 1
+        # Same row arriving again (e.g. via the prediction_log tail, read back as a string) is dropped
+        pipeline.publish([{"system_id": 1, "probability": 90.0, "created_at": t0.isoformat() + ".400"}])
+        assert pipeline.process([pipeline._queue.get_nowait()]) == []
+    assert pipeline.stats["duplicates"] == 2
+
+    # A malformed time is published without a dedup key instead of raising
+    pipeline.publish([{"system_id": 1, "probability": 90.0, "created_at": "not-a-time"}])
+    assert pipeline._queue.get_nowait()[2] is None
+    assert sent_alerts[-1][0] == 1
+
+    # Distinct predictions with the same probability all reach the suppressor
+    observed = pipeline.suppressor.stats["observed"]
+    pipeline.publish([{"system_id": 1, "probability": 90.0, "created_at": t0 + timedelta(minutes=i)}
+                      for i in range(1, 21)])
+    with backend.app.app_context():
+        pipeline.process([pipeline._queue.get_nowait() for _ in range(20)])
+    assert pipeline.suppressor.stats["observed"] == observed + 20
+    assert pipeline.suppressor._keys[(1, "High")].suppressed == 20
+
+    # Dedup entries are only kept for dedup_window seconds
+    pipeline._seen[(1, t0)] = time.monotonic() - 61
+    pipeline._seen.move_to_end((1, t0), last=False)
+    pipeline._expire_seen(time.monotonic())
+    assert (1, t0) not in pipeline._seen and len(pipeline._seen) == 20
+
+
+def test_partition_planning():
+    from datetime import date
+    from utils.retention import plan_new_partitions, expired_partitions, to_days
+
+    assert to_days(date(2024, 1, 1)) == 739251  # MySQL: SELECT TO_DAYS('2024-01-01')
+
+    planned = plan_new_partitions(date(2024, 3, 10), date(2024, 3, 10), "day", ahead=2)
+    assert planned == [("p20240310", date(2024, 3, 11)),
+                       ("p20240311", date(2024, 3, 12)),
+                       ("p20240312", date(2024, 3, 13))]
+    assert plan_new_partitions(date(2024, 4, 1), date(2024, 2, 15), "month", ahead=1) == []
+    assert plan_new_partitions(None, date(2024, 2, 15), "month", ahead=1)[-1] == \
+        ("p202403", date(2024, 4, 1))
+
+    parts = [("p_history", date(2024, 3, 1)), ("p20240301", date(2024, 3, 2)), ("pmax", None)]
+    assert expired_partitions(parts, date(2024, 3, 1)) == [("p_history", date(2024, 3, 1))]
+
+
+def test_retention_purges_in_chunks_and_archives(client):
+    from datetime import datetime, timedelta
+    from utils.retention import RetentionManager
+
+    now = datetime(2024, 6, 1)
+    with backend.app.app_context():
+        db.session.execute(SystemMetrics.__table__.insert(), [
+            {"system_id": 1, "timestamp": now - timedelta(days=d), "CPU_Usage": 1.0,
+             "Memory_Usage": 1.0, "Disk_IO": 1, "Network_Latency": 1.0, "Error_Rate": 0.0}
+            for d in range(60)
+        ])
+        db.session.commit()
+
+    manager = RetentionManager(
+        backend.app,
+        policies={"system_metrics": (SystemMetrics, "timestamp", 30)},
+        mode="archive",
+        chunk_size=7,
+    )
+    assert manager.run_once(now=now) == {"system_metrics": 29}
+
+    # Rollup tiers expire independently (one filtered policy per tier)
+    from utils.retention import RETENTION_POLICIES
+    from utils.rollups import TIERS
+    with backend.app.app_context():
+        db.session.add_all([MetricRollup(system_id=1, resolution=TIERS[tier], bucket_start=now - timedelta(days=d),
+                                         samples=1) for tier in ("1m", "1h") for d in (1, 10)])
+        db.session.commit()
+    rollup_policies = {k: v for k, v in RETENTION_POLICIES.items() if k.startswith("metric_rollups")}
+    assert RetentionManager(backend.app, policies=rollup_policies).run_once(now=now) == {
+        "metric_rollups:1m": 1, "metric_rollups:5m": 0, "metric_rollups:1h": 0}
+    with backend.app.app_context():
+        assert MetricRollup.query.count() == 3
+
+    with backend.app.app_context():
+        assert SystemMetrics.query.count() == 31
+        archived = db.session.execute(db.text("SELECT COUNT(*) FROM system_metrics_archive")).scalar()
+        assert archived == 29
+        db.session.execute(db.text("DROP TABLE system_metrics_archive"))
+        db.session.commit()
+
+
+def test_rollups_and_metric_ranges(client):
+    from datetime import datetime, timedelta
+    from utils.rollups import RollupJob, pick_resolution
+
+    t0 = datetime(2024, 1, 1)
+    with backend.app.app_context():
+        db.session.execute(SystemMetrics.__table__.insert(), [
+            {"system_id": 1, "timestamp": t0 + timedelta(seconds=20 * i), "CPU_Usage": float(i),
+             "Memory_Usage": 50.0, "Disk_IO": 1, "Network_Latency": 5.0, "Error_Rate": 0.0}
+            for i in range(3 * 60 * 3)  # 3 hours, one sample every 20 s
+        ])
+        db.session.commit()
+
+    job = RollupJob(backend.app, id_overlap=0)
+    written = job.run_once()
+    assert written == {"1m": 180, "5m": 36, "1h": 3, "1d": 1}
+    # Nothing new since the watermark: nothing is re-aggregated
+    assert job.run_once() == {"1m": 0, "5m": 0, "1h": 0, "1d": 0}
+
+    with backend.app.app_context():
+        first_hour = MetricRollup.query.filter_by(resolution=3600).order_by(MetricRollup.bucket_start).first()
+        assert first_hour.samples == 180
+        assert first_hour.CPU_Usage_min == 0 and first_hour.CPU_Usage_max == 179
+        assert abs(first_hour.CPU_Usage_avg - 89.5) < 1e-6
+
+    res = client.get("/api/metrics/1?start=2024-01-01T00:00:00&end=2024-01-01T03:00:00")
+    body = res.get_json()
+    assert body["resolution"] == "raw" and len(body["points"]) == 540
+
+    res = client.get("/api/metrics/1?start=2024-01-01T00:00:00&end=2024-01-01T03:00:00&resolution=1h")
+    body = res.get_json()
+    assert [p["samples"] for p in body["points"]] == [180, 180, 180]
+    assert body["points"][0]["cpu_usage"]["max"] == 179
+
+    assert pick_resolution(t0, t0 + timedelta(days=30)) == "1h"
+    assert pick_resolution(t0, t0 + timedelta(days=365)) == "1d"
+    assert client.get("/api/metrics/1?resolution=2m").status_code == 400
+
+    # Without ?end= the window ends at the newest stored row (agents write IST wall-clock time)
+    body = client.get("/api/metrics/1?resolution=raw").get_json()
+    assert body["end"] == "2024-01-01 02:59:41" and len(body["points"]) == 180
+
+
+
+def test_rollups_fold_in_agents_that_flush_late(client):
+    from datetime import datetime, timedelta
+    from utils.rollups import RollupJob
+
+    def sample(sid, ts):
+        return {"system_id": sid, "timestamp": ts, "CPU_Usage": 1.0, "Memory_Usage": 1.0,
+                "Disk_IO": 1.0, "Network_Latency": 1.0, "Error_Rate": 0.0}
+
+    with backend.app.app_context():
+        db.session.add(SystemInfo(system_name="node-2", admin_id=1))
+        db.session.commit()
+
+    t0 = datetime(2024, 1, 1, 5, 30)  # agent wall-clock time, not UTC
+    job = RollupJob(backend.app)
+    with backend.app.app_context():
+        # node-1 flushes every minute and the job runs after each flush;
+        # node-2 buffers 15 minutes before its single flush
+        for minute in range(15):
+            db.session.execute(SystemMetrics.__table__.insert(), [sample(1, t0 + timedelta(minutes=minute))])
+            db.session.commit()
+            job.run_once()
+        db.session.execute(SystemMetrics.__table__.insert(),
+                           [sample(2, t0 + timedelta(minutes=m, seconds=30)) for m in range(15)])
+        db.session.commit()
+        job.run_once()
+
+        for sid in (1, 2):
+            for seconds in (60, 300, 3600):
+                samples = db.session.query(db.func.sum(MetricRollup.samples)).filter_by(
+                    system_id=sid, resolution=seconds).scalar()
+                assert samples == 15, (sid, seconds)
+
+
+def test_notification_stream_replays_and_pushes(client, monkeypatch):
+    import threading
+    monkeypatch.setattr(backend, "NOTIFY_STREAM_MAX", 0.6)
+    monkeypatch.setattr(backend, "NOTIFY_KEEPALIVE", 0.2)
+    monkeypatch.setitem(backend.app.config, "NOTIFY_STREAMING", True)
+    with backend.app.app_context():
+        db.session.add(Notification(admin_id=1, system_id=1, message="old", risk_level="High"))
+        db.session.commit()
+
+    def push():
+        # Arrives while the agent's stream is idle
+        with backend.app.app_context():
+            new = Notification(admin_id=1, system_id=1, message="new", risk_level="Medium")
+            # Same text, not pushed: claiming the push must not mark it Read
+            repeat = Notification(admin_id=1, system_id=1, message="new", risk_level="Medium")
+            db.session.add_all([new, repeat])
+            db.session.commit()
+            new_id = new.notification_id
+        backend.notify_hub.publish(1, {"notification_id": new_id, "message": "new", "risk_level": "Medium"})
+        backend.notify_hub.publish(1, {"notification_id": 1, "message": "old", "risk_level": "High"})  # already delivered
+
+    timer = threading.Timer(0.2, push)
+    timer.start()
+    body = client.get("/api/notifications/1/stream").get_data(as_text=True)
+    timer.join()
+
+    events = [json.loads(line[5:]) for line in body.splitlines() if line.startswith("data:")]
+    assert [e["message"] for e in events] == ["old", "new"]
+    assert ": keepalive" in body
+    assert backend.notify_hub.subscriber_count() == 0
+    with backend.app.app_context():
+        assert [n.notification_id for n in Notification.query.filter_by(status="Unread")] == [3]
+
+    # Sync WSGI workers (no gevent/eventlet): streams would pin request threads
+    monkeypatch.setitem(backend.app.config, "NOTIFY_STREAMING", None)
+    res = client.get("/api/notifications/1/stream")
+    assert res.status_code == 503 and res.headers["Retry-After"] == "1"
+
+
+def test_large_json_responses_are_gzipped(client):
+    from datetime import datetime, timedelta
+    t0 = datetime(2024, 1, 1)
+    with backend.app.app_context():
+        db.session.execute(SystemMetrics.__table__.insert(), [
+            {"system_id": 1, "timestamp": t0 + timedelta(minutes=i), "CPU_Usage": float(i),
+             "Memory_Usage": 50.0, "Disk_IO": 1, "Network_Latency": 5.0, "Error_Rate": 0.0}
+            for i in range(100)
+        ])
+        db.session.commit()
+
+    url = "/api/metrics/1?start=2024-01-01T00:00:00&end=2024-01-01T02:00:00"
+    res = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(res.data))["points"]) == 100
+    assert "Content-Encoding" not in client.get(url).headers
+    assert "Content-Encoding" not in client.get("/api/model", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_admin_notification_feed_is_incremental_and_read_only(client):
+    with backend.app.app_context():
+        for i in range(5):
+            db.session.add(Notification(admin_id=1, system_id=1, message=f"n{i}", risk_level="High"))
+        db.session.commit()
+
+    body = client.get("/api/notifications/admin/1?limit=3").get_json()
+    assert [n["message"] for n in body["notifications"]] == ["n2", "n3", "n4"]
+    last_id = body["last_id"]
+
+    assert client.get(f"/api/notifications/admin/1?after_id={last_id}").get_json()["notifications"] == []
+    with backend.app.app_context():
+        db.session.add(Notification(admin_id=1, system_id=1, message="n5", risk_level="Medium"))
+        db.session.commit()
+        assert Notification.query.filter_by(status="Unread").count() == 6
+    body = client.get(f"/api/notifications/admin/1?after_id={last_id}").get_json()
+    assert [n["message"] for n in body["notifications"]] == ["n5"]
+    assert body["last_id"] == last_id + 1
+
+
+def test_live_state_serves_latest_per_system(client):
+    from datetime import datetime
+    with backend.app.app_context():
+        db.session.add(SystemInfo(system_name="node-2", admin_id=1))
+        db.session.add(SystemMetrics(system_id=2, CPU_Usage=1.0, Memory_Usage=1.0, Disk_IO=1.0,
+                                     Network_Latency=1.0, Error_Rate=9.0,
+                                     recorded_at=datetime(2024, 1, 1, 0, 0)))
+        db.session.add(PredictionLog(system_id=2, downtime_risk=False, probability=10.0,
+                                     created_at=datetime(2024, 1, 1, 0, 0)))
+        db.session.commit()
+    backend.live_state.__init__(on_update=backend.invalidate_written)  # fresh store → warms from the DB
+
+    status = client.get("/api/predict/2").get_json()
+    assert status["system_name"] == "node-2"
+    assert status["risk_level"] == "Low" and status["Risk_Probability"] == "10.00%"
+
+    batch = {
+        "metrics": [{"system_id": 1, "timestamp": "2024-01-01T00:05:00+05:30", "CPU_Usage": 97.0,
+                     "Memory_Usage": 80.0, "Disk_IO": 3.0, "Network_Latency": 9.0, "Error_Rate": 0.0}],
+        "predictions": [{"system_id": 1, "downtime_risk": True, "probability": 88.0,
+                         "created_at": "2024-01-01T00:05:00+05:30"}],
+    }
+    assert client.post("/api/ingest", json=batch).status_code == 200
+
+    latest = client.get("/api/predict").get_json()
+    assert latest["system_name"] == "node-1" and latest["CPU_Usage"] == 97.0
+    assert latest["risk_level"] == "High" and latest["Prediction"] == "⚠ Downtime Risk"
+
+    fleet = client.get("/api/predict/fleet?admin_id=1").get_json()["systems"]
+    assert [s["system_id"] for s in fleet] == [1, 2]
+    assert client.get("/api/predict/fleet?admin_id=99").get_json()["systems"] == []
+    assert client.get("/api/predict/42").status_code == 404
+
+    # A late (older) row from another system doesn't take over /api/predict
+    late = {"metrics": [{**batch["metrics"][0], "system_id": 2, "timestamp": "2024-01-01T00:01:00"}]}
+    assert client.post("/api/ingest", json=late).status_code == 200
+    assert client.get("/api/predict").get_json()["system_name"] == "node-1"
+    # …and warm-up picks the newest system regardless of row order
+    backend.live_state.__init__(on_update=backend.invalidate_written)
+    assert client.get("/api/predict").get_json()["system_name"] == "node-1"
+
+
+def test_fleet_overview_single_query(client):
+    from datetime import datetime, timedelta
+    from sqlalchemy import event
+    t0 = datetime(2024, 1, 1)
+    with backend.app.app_context():
+        db.session.add_all([SystemInfo(system_name="node-2", admin_id=1),
+                            SystemInfo(system_name="node-3", admin_id=1)])
+        db.session.commit()
+        for i in range(3):
+            db.session.add(SystemMetrics(system_id=1, CPU_Usage=10.0 * i, Memory_Usage=1.0, Disk_IO=1.0,
+                                         Network_Latency=1.0, Error_Rate=0.0,
+                                         recorded_at=t0 + timedelta(minutes=i)))
+            db.session.add(PredictionLog(system_id=1, downtime_risk=i == 2, probability=40.0 + 20 * i,
+                                         created_at=t0 + timedelta(minutes=i)))
+        db.session.add(PredictionLog(system_id=2, downtime_risk=False, probability=5.0, created_at=t0))
+        db.session.add_all([Notification(admin_id=1, system_id=1, message=f"m{i}") for i in range(2)])
+        db.session.add(Notification(admin_id=1, system_id=1, message="seen", status="Read"))
+        db.session.commit()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            body = client.get("/api/fleet/1").get_json()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert body["count"] == 3 and body["at_risk"] == 1
+    node1, node2, node3 = body["systems"]
+    assert node1["metrics"]["CPU_Usage"] == 20.0
+    assert node1["prediction"]["probability"] == 80.0 and node1["risk_level"] == "Medium"
+    assert node1["unread_alerts"] == 2
+    assert node2["metrics"] is None and node2["risk_level"] == "Low"
+    assert node3["prediction"] is None and node3["unread_alerts"] == 0
+
+
+def test_response_cache_hits_and_invalidates_per_system(client):
+    def metric(sid):
+        return {"system_id": sid, "timestamp": "2099-01-01T00:00:00", "CPU_Usage": 1.0,
+                "Memory_Usage": 1.0, "Disk_IO": 1.0, "Network_Latency": 1.0, "Error_Rate": 0.0}
+
+    with backend.app.app_context():
+        db.session.add(SystemInfo(system_name="node-2", admin_id=1))
+        db.session.commit()
+
+    assert client.get("/api/metrics/1").headers["X-Cache"] == "MISS"
+    assert client.get("/api/metrics/1").headers["X-Cache"] == "HIT"
+    assert client.get("/api/metrics/2").headers["X-Cache"] == "MISS"
+
+    # New metrics for system 2 only invalidate system 2
+    assert client.post("/api/ingest", json={"metrics": [metric(2)]}).status_code == 200
+    assert client.get("/api/metrics/1").headers["X-Cache"] == "HIT"
+    res = client.get("/api/metrics/2")
+    assert res.headers["X-Cache"] == "MISS" and len(res.get_json()) == 1
+
+    assert len(client.get("/api/systems/1").get_json()) == 2
+    stats = client.get("/api/cache/stats").get_json()
+    assert stats["hits"] == 2 and stats["misses"] == 4 and stats["hit_rate"] == round(2 / 6, 4)
+
+
+def test_sqlite_cache_is_shared_between_workers(tmp_path):
+    from utils.response_cache import ResponseCache
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a, worker_b = ResponseCache("sqlite", path), ResponseCache("sqlite", path)
+
+    key = f"metrics|metrics:1|{worker_a.backend.generation('metrics:1')}|/api/metrics/1?"
+    worker_a.backend.set(key, b"[]", ttl=60)
+    assert worker_b.backend.get(key) == b"[]"
+
+    worker_b.invalidate("metrics:1")
+    assert worker_a.backend.generation("metrics:1") == 1
+    worker_a.backend.set("expired", b"x", ttl=-1)
+    assert worker_b.backend.get("expired") is None
+
+
+def test_keyset_pagination_and_ndjson_stream(client, monkeypatch):
+    from datetime import datetime, timedelta
+    import utils.history as history
+    t0 = datetime(2024, 1, 1)
+    with backend.app.app_context():
+        db.session.execute(SystemMetrics.__table__.insert(), [
+            # Pairs of rows share a timestamp so ties must be broken by id
+            {"system_id": 1, "timestamp": t0 + timedelta(minutes=i // 2), "CPU_Usage": float(i),
+             "Memory_Usage": 1.0, "Disk_IO": 1.0, "Network_Latency": 1.0, "Error_Rate": 0.0}
+            for i in range(250)
+        ])
+        db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/metrics/1?order=asc&limit=100" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url).get_json()
+        seen += [m["metric_id"] for m in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        # A newer row arriving mid-export lands at the end, not inside a page
+        if len(seen) == 100:
+            client.post("/api/ingest", json={"metrics": [{
+                "system_id": 1, "timestamp": "2024-02-01T00:00:00", "CPU_Usage": 1.0, "Memory_Usage": 1.0,
+                "Disk_IO": 1.0, "Network_Latency": 1.0, "Error_Rate": 0.0}]})
+    assert seen == list(range(1, 252))
+
+    newest = client.get("/api/metrics/1?limit=2").get_json()["items"]
+    assert [m["metric_id"] for m in newest] == [251, 250]
+
+    monkeypatch.setattr(history, "STREAM_CHUNK", 40)
+    res = client.get("/api/metrics/1?format=ndjson&end=2024-01-02T00:00:00")
+    assert res.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [r["metric_id"] for r in rows] == list(range(1, 251))
+
+    assert client.get("/api/metrics/1?cursor=%%%").status_code == 400
+    assert client.get("/api/predictions/1?format=ndjson").get_data() == b""
+
+
+def test_columnar_export_is_partitioned_incremental_and_mmappable(client, tmp_path, monkeypatch):
+    import time
+    from datetime import datetime, timedelta
+    from utils.export import load_npy_partition, run_export
+    t0 = datetime(2024, 1, 1, 22, 0)
+    with backend.app.app_context():
+        db.session.add(SystemInfo(system_name="node-2", admin_id=1))
+        db.session.execute(SystemMetrics.__table__.insert(), [
+            {"system_id": 1 + i % 2, "timestamp": t0 + timedelta(minutes=30 * i), "CPU_Usage": float(i),
+             "Memory_Usage": 1.0, "Disk_IO": 1.0, "Network_Latency": 1.0, "Error_Rate": 0.0}
+            for i in range(8)  # spans two days
+        ])
+        db.session.commit()
+
+    monkeypatch.setattr(backend, "EXPORT_DIR", str(tmp_path))
+    assert client.post("/api/export", json={"tables": ["nope"]}).status_code == 400
+
+    # Another worker (or host) holding the export lease blocks a second export
+    from utils.leader import LeaderLease
+    other = LeaderLease(backend.app, "export", owner="other-host")
+    assert other.try_acquire()
+    assert client.post("/api/export", json={"tables": ["system_metrics"]}).status_code == 409
+    assert client.get("/api/export").get_json()["running"] is True
+    other.release()
+    assert client.post("/api/export", json={"tables": ["system_metrics"], "format": "npy"}).status_code == 202
+    for _ in range(100):
+        status = client.get("/api/export").get_json()
+        if not status["running"]:
+            break
+        time.sleep(0.05)
+    assert status["error"] is None
+    assert status["last_run"]["tables"]["system_metrics"]["rows"] == 8
+    assert status["watermarks"] == {"system_metrics": 8}
+
+    parts = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.glob("system_metrics/*/*/*"))
+    assert parts == [
+        "system_metrics/system_id=1/date=2024-01-01/part-000000000001-000000000003",
+        "system_metrics/system_id=1/date=2024-01-02/part-000000000005-000000000007",
+        "system_metrics/system_id=2/date=2024-01-01/part-000000000002-000000000004",
+        "system_metrics/system_id=2/date=2024-01-02/part-000000000006-000000000008",
+    ]
+    cols = load_npy_partition(str(tmp_path / parts[0]))
+    assert list(cols["CPU_Usage"]) == [0.0, 2.0] and cols["CPU_Usage"].base is not None
+    assert str(cols["timestamp"].dtype) == "datetime64[us]"
+
+    # Incremental: only rows past the watermark
+    with backend.app.app_context():
+        db.session.add(SystemMetrics(system_id=1, CPU_Usage=9.0, Memory_Usage=1.0, Disk_IO=1.0,
+                                     Network_Latency=1.0, Error_Rate=0.0, recorded_at=t0))
+        db.session.commit()
+        with db.engine.connect() as conn:
+            result = run_export(conn, str(tmp_path), ["system_metrics"], incremental=True, fmt="npy", chunk=3)
+    assert result["tables"]["system_metrics"] == {**result["tables"]["system_metrics"], "rows": 1, "watermark": 9}
+
+    # A full re-export replaces the table directory instead of adding overlapping parts
+    with backend.app.app_context(), db.engine.connect() as conn:
+        result = run_export(conn, str(tmp_path), ["system_metrics"], incremental=False, fmt="npy", chunk=3)
+    assert result["tables"]["system_metrics"]["rows"] == 9
+    parts = sorted(p.name for p in tmp_path.glob("system_metrics/*/*/*"))
+    assert len(parts) == 4 and "part-000000000001-000000000009" in parts
+    assert sum(len(load_npy_partition(str(p))["CPU_Usage"]) for p in tmp_path.glob("system_metrics/*/*/*")) == 9
+
+    # Small chunks still produce one part per partition, split only at part_rows
+    from utils.export import export_table
+    with backend.app.app_context(), db.engine.connect() as conn:
+        rows, last_id, files = export_table(conn, "system_metrics", str(tmp_path / "small"), fmt="npy",
+                                            chunk=2, part_rows=2)
+    assert (rows, last_id) == (9, 9)
+    assert sorted(f.rsplit("/", 1)[1] for f in files if "system_id=1/date=2024-01-01" in f) == [
+        "part-000000000001-000000000003", "part-000000000009-000000000009"]
+    assert len(files) == 5
+
+
+def test_leader_lease_exclusive_takeover_and_state(client):
+    from datetime import datetime, timedelta
+    from utils.leader import LeaderLease
+    from utils.alert_pipeline import PredictionTail
+    from database.models import JobLease
+
+    a = LeaderLease(backend.app, "alerts", ttl=30, owner="a")
+    b = LeaderLease(backend.app, "alerts", ttl=30, owner="b")
+    assert a.try_acquire() and a.is_leader
+    assert not b.try_acquire() and not b.is_leader
+    assert a.try_acquire()  # renewal
+    a.save_state({"last_seen_id": 41})
+
+    # a stops renewing; once the lease has expired b takes over with a's progress
+    with backend.app.app_context():
+        lease = db.session.get(JobLease, "alerts")
+        lease.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+    assert b.try_acquire() and b.load_state() == {"last_seen_id": 41}
+    assert not a.try_acquire() and not a.is_leader
+    b.save_state({"last_seen_id": 42})
+    a.save_state({"last_seen_id": 0})  # a stale leader can no longer write
+    assert b.load_state() == {"last_seen_id": 42}
+
+    b.release()
+    assert a.try_acquire()
+
+    # Expiry is judged by the database clock, not a skewed host clock
+    import utils.leader as leader_mod
+
+    class FastClock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(hours=1)
+
+    leader_mod.datetime, real = FastClock, leader_mod.datetime
+    try:
+        assert not b.try_acquire()
+    finally:
+        leader_mod.datetime = real
+
+    # The tail resumes from a handed-over position
+    class Sink:
+        published = []
+        def publish(self, rows):
+            self.published.extend(rows)
+
+    with backend.app.app_context():
+        for p in (10.0, 80.0, 95.0):
+            db.session.add(PredictionLog(system_id=1, downtime_risk=p > 50, probability=p))
+        db.session.commit()
+    tail = PredictionTail(backend.app, Sink(), batch_limit=2, last_seen_id=1)
+    assert tail.poll() == 2 and tail.last_seen_id == 3
+    assert [r["probability"] for r in Sink.published] == [80.0, 95.0]
+
+
+def test_notification_claims_are_bounded_acked_and_redelivered(client, monkeypatch):
+    from datetime import datetime, timedelta
+    monkeypatch.setattr(backend, "CLAIM_LIMIT", 3)
+    with backend.app.app_context():
+        for i in range(5):
+            db.session.add(Notification(admin_id=1, system_id=1, message=f"n{i}", risk_level="High"))
+        db.session.commit()
+
+    first = client.post("/api/notifications/1/claim?limit=3&visibility=30").get_json()
+    assert [n["message"] for n in first["notifications"]] == ["n0", "n1", "n2"] and first["more"]
+    # Claimed rows are hidden from other pollers until acked or expired
+    second = client.post("/api/notifications/1/claim").get_json()
+    assert [n["message"] for n in second["notifications"]] == ["n3", "n4"] and not second["more"]
+    assert client.post("/api/notifications/1/claim").get_json()["notifications"] == []
+
+    ids = [n["notification_id"] for n in first["notifications"]]
+    assert client.post("/api/notifications/1/ack", json={}).status_code == 400
+    acked = client.post("/api/notifications/1/ack",
+                        json={"claim_token": first["claim_token"], "notification_ids": ids[:2]})
+    assert acked.get_json() == {"acked": 2}
+
+    # n2 (unacked) and the second claim expire and are redelivered in order
+    with backend.app.app_context():
+        Notification.query.filter(Notification.status == "Unread").update(
+            {"claimed_until": datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+    again = client.post("/api/notifications/1/claim").get_json()["notifications"]
+    assert [(n["message"], n["delivery_count"]) for n in again] == [("n2", 2), ("n3", 2), ("n4", 2)]
+    # A stale token no longer acks rows that were re-claimed
+    assert client.post("/api/notifications/1/ack", json={"claim_token": first["claim_token"]}).get_json() == {"acked": 0}
+
+    # Legacy polling: bounded, marked read in the same statement
+    with backend.app.app_context():
+        Notification.query.update({"claimed_until": None})
+        db.session.commit()
+    body = client.get("/api/notifications/1?limit=2").get_json()
+    assert [n["message"] for n in body["notifications"]] == ["n2", "n3"] and body["more"]
+    assert [n["message"] for n in client.get("/api/notifications/1").get_json()["notifications"]] == ["n4"]
+    with backend.app.app_context():
+        assert Notification.query.filter_by(status="Unread").count() == 0
+
+
+def test_alert_pipeline_suppresses_storms_into_digests(client):
+    from common.alert_suppression import AlertSuppressor
+    clock = [0.0]
+    suppressor = AlertSuppressor(cooldowns={"Medium": 600, "High": 300}, hysteresis=5, clock=lambda: clock[0])
+    pipeline = backend.AlertPipeline(backend.app, suppressor=suppressor)
+
+    with backend.app.app_context():
+        for i, prob in enumerate([80.0, 81.0, 79.0, 82.0, 72.0, 60.0]):
+            clock[0] = i * 60
+            pipeline.process([(1, prob, None, time.monotonic())])
+        assert [n.risk_level for n in Notification.query.all()] == ["Medium"]
+
+        clock[0] = 700
+        digest = pipeline.flush_digests()
+        assert len(digest) == 1 and "(72.00%) — 4 more in the last 12 min, peak 82.00%" in digest[0]["message"]
+        assert Notification.query.count() == 2
+
+        # A restarted pipeline resumes the cooldown from the stored rows
+        clock[0] = 800
+        fresh = backend.AlertPipeline(backend.app, suppressor=AlertSuppressor(
+            cooldowns={"Medium": 600, "High": 300}, hysteresis=5, clock=lambda: clock[0]))
+        fresh._warm_suppressor()
+        assert fresh.process([(1, 80.0, None, time.monotonic())]) == []
+
+
+def test_alert_pipeline_level_falls_on_low_readings(client):
+    from common.alert_suppression import AlertSuppressor
+    clock = [0.0]
+    pipeline = backend.AlertPipeline(backend.app, suppressor=AlertSuppressor(
+        cooldowns={"Medium": 600, "High": 300}, hysteresis=5, clock=lambda: clock[0]))
+
+    with backend.app.app_context():
+        for i, prob in enumerate([90.0, 30.0, 81.0]):
+            clock[0] = i * 60
+            pipeline.publish([{"system_id": 1, "probability": prob}])
+            pipeline.process([pipeline._queue.get_nowait()])
+        # High → low resets the level, so 81% is a fresh Medium alert, not a held High
+        assert [n.risk_level for n in Notification.query.order_by(Notification.notification_id)] == \
+            ["High", "Medium"]
+    assert pipeline.suppressor._levels[1] == "Medium"
+
+
+def test_infer_overload_returns_503_with_retry_after(client, monkeypatch):
+    from utils.inference import InferenceOverloaded
+
+    def overloaded(rows, timeout=5.0):
+        raise InferenceOverloaded("Inference queue full (1 requests)", retry_after=2)
+
+    monkeypatch.setattr(backend.inference_batcher, "predict", overloaded)
+    res = client.post("/api/infer", json={"features": [[0.0] * 4]})
+    assert res.status_code == 503 and res.headers["Retry-After"] == "2"
+
+
+def test_alert_pipeline_stands_down_without_the_lease(client):
+    leader = [True]
+    pipeline = backend.AlertPipeline(backend.app, workers=1, batch_wait=0, digest_tick=0.05,
+                                     active=lambda: leader[0])
+    pipeline.start()
+    pipeline.publish([{"system_id": 1, "probability": 90.0}])
+    for _ in range(100):
+        with backend.app.app_context():
+            if Notification.query.count():
+                break
+        time.sleep(0.02)
+
+    # Demoted: queued and pending work is no longer written by this instance
+    leader[0] = False
+    pipeline.publish([{"system_id": 1, "probability": 95.0}])
+    pipeline.suppressor._keys[(1, "High")].suppressed = 3
+    pipeline.suppressor._keys[(1, "High")].last_sent = -1e9
+    time.sleep(0.3)
+    pipeline.stop()
+    assert not pipeline.running and pipeline._queue.qsize() == 0
+    with backend.app.app_context():
+        assert Notification.query.count() == 1
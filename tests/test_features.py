@@ -0,0 +1,55 @@
+# tests/test_features.py
+import sys
+import os
+
+import numpy as np
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from common.features import (
+    DEFAULT_FEATURE_NAMES, FeaturePipeline, RAW_METRICS, RollingWindow, load_feature_names,
+)
+
+
+def test_feature_list_matches_features_pkl():
+    assert load_feature_names(os.path.join(ROOT, "backend", "features.pkl")) == DEFAULT_FEATURE_NAMES
+
+
+def test_rolling_stats_match_full_recompute():
+    rng = np.random.default_rng(0)
+    series = rng.normal(50, 10, size=40)
+    w = RollingWindow(5)
+
+    for i, x in enumerate(series):
+        w.push(x)
+        tail = series[max(0, i - 4): i + 1]
+        assert w.mean() == pytest.approx(tail.mean())
+        assert w.std() == pytest.approx(tail.std(ddof=1) if len(tail) > 1 else 0.0)
+        if len(tail) > 1:
+            assert w.slope() == pytest.approx(np.polyfit(np.arange(len(tail)), tail, 1)[0])
+        assert w.diff() == pytest.approx(0.0 if i == 0 else x - series[i - 1])
+
+
+def test_pipeline_builds_full_vector_per_system():
+    pipeline = FeaturePipeline(window=3)
+    sample = dict(zip(RAW_METRICS, [10.0, 20.0, 30.0, 40.0, 1.0]))
+
+    first = pipeline.update(1, sample)
+    assert len(first) == 20
+    assert first[:5] == [10.0, 20.0, 30.0, 40.0, 1.0]
+
+    second = pipeline.update(1, {**sample, "CPU_Usage": 30.0})
+    named = dict(zip(pipeline.feature_names, second))
+    assert named["CPU_Usage_diff"] == 20.0
+    assert named["CPU_Usage_roll_mean"] == 20.0
+
+    # Another system starts from an empty window
+    other = dict(zip(pipeline.feature_names, pipeline.update(2, sample)))
+    assert other["CPU_Usage_diff"] == 0.0
+
+    extra = FeaturePipeline(["CPU_Usage_slope", "Error_Rate_ewma"], window=3)
+    assert extra.update(1, sample) == [0.0, 1.0]
+    with pytest.raises(ValueError):
+        FeaturePipeline(["GPU_Usage"])
@@ -0,0 +1,108 @@
+# tests/test_http_client.py
+import sys
+import os
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import pytest
+from common.http_client import CircuitBreaker, CircuitOpen, HttpClient
+
+
+class Backend:
+    """Local stand-in backend: fails the first `failures` calls with 503."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+        self.clients = set()
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                outer.calls.append(json.loads(body))
+                outer.clients.add(self.client_address)
+                status = 503 if len(outer.calls) <= outer.failures else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_retries_with_backoff_and_reuses_connection():
+    backend = Backend(failures=2)
+    client = HttpClient(backend.url, retries=3, backoff_base=0.01)
+    try:
+        res = client.post("/api/ingest", {"rows": [1, 2]}, compress=True)
+        assert res.status_code == 200
+        assert backend.calls == [{"rows": [1, 2]}] * 3
+        assert len(backend.clients) == 1  # one keep-alive connection for all attempts
+        assert client.breaker.state == "closed"
+    finally:
+        backend.close()
+
+
+def test_backoff_is_jittered_and_capped():
+    client = HttpClient(backoff_base=1, backoff_max=4)
+    delays = [client.backoff(5) for _ in range(200)]
+    assert all(0 <= d <= 4 for d in delays)
+    assert len(set(delays)) > 100
+    assert client.backoff(0, retry_after="3") >= 3
+
+
+def test_circuit_breaker_fails_fast_then_recovers():
+    backend = Backend(failures=3)
+    client = HttpClient(backend.url, retries=0,
+                        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2))
+    try:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                client.post("/x", {})
+        with pytest.raises(CircuitOpen):
+            client.post("/x", {})
+        assert len(backend.calls) == 3  # the open breaker never reached the network
+
+        import time
+        time.sleep(0.25)
+        assert client.post("/x", {}).status_code == 200  # half-open trial succeeds
+        assert client.breaker.state == "closed"
+    finally:
+        backend.close()
+
+
+def test_unexpected_error_during_half_open_trial_reopens_the_breaker(monkeypatch):
+    import time
+    client = HttpClient("http://127.0.0.1:9", retries=0,
+                        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    client.breaker.record_failure()
+    time.sleep(0.06)
+
+    def broken(*args, **kwargs):
+        raise ValueError("unexpected")
+
+    monkeypatch.setattr(client.session, "request", broken)
+    with pytest.raises(ValueError):
+        client.get("/x")  # the half-open trial
+    assert client.breaker.state == "open" and not client.breaker._trial
+    time.sleep(0.06)
+    assert client.breaker.allow()  # a new trial is let through
@@ -0,0 +1,73 @@
+# tests/test_inference.py
+import sys
+import os
+import threading
+import types
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from utils.inference import InferenceOverloaded, InferenceUnavailable, MicroBatcher
+from utils.model_registry import ActiveModel
+
+
+@pytest.fixture
+def registry():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(scaler.transform(X), y)
+    return types.SimpleNamespace(current=ActiveModel(model, scaler, "v1", datetime.utcnow()))
+
+
+def test_concurrent_requests_share_batches(registry):
+    batcher = MicroBatcher(registry, max_batch=64, max_wait_ms=50).start()
+    rows = np.random.default_rng(1).normal(size=(32, 4))
+    results = [None] * 32
+
+    def call(i):
+        results[i] = batcher.predict(rows[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    model, scaler = registry.current.model, registry.current.scaler
+    expected = model.predict_proba(scaler.transform(rows))[:, 1] * 100
+    for i, (preds, version) in enumerate(results):
+        assert version == "v1"
+        assert preds[0][1] == pytest.approx(expected[i])
+        assert preds[0][0] == int(expected[i] >= 50) or expected[i] == 50
+
+    assert batcher.stats["rows"] == 32
+    assert batcher.stats["batches"] < 32
+    assert batcher.stats["rows_per_sec"] > 0
+
+
+def test_rejects_wrong_width_and_missing_model(registry):
+    batcher = MicroBatcher(registry).start()
+    with pytest.raises(ValueError):
+        batcher.predict([[1.0, 2.0]])
+
+    registry.current = None
+    with pytest.raises(InferenceUnavailable):
+        batcher.predict([[0.0] * 4])
+
+
+def test_full_queue_is_rejected_immediately(registry):
+    batcher = MicroBatcher(registry, queue_size=1)  # not started: nothing drains the queue
+    batcher._queue.put_nowait(object())
+    with pytest.raises(InferenceOverloaded) as exc:
+        batcher.predict([[0.0] * 4], timeout=30)
+    assert exc.value.retry_after == 1
+    assert batcher.stats["rejected"] == 1
@@ -0,0 +1,61 @@
+# tests/test_model_registry.py
+import sys
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from utils.model_registry import ModelRegistry
+
+
+def _write_artifacts(tmp_path, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(40, 3))
+    y = (X[:, 0] > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    joblib.dump(model, tmp_path / "model.joblib")
+    joblib.dump(scaler, tmp_path / "scaler.joblib")
+
+
+def test_hot_reload_swaps_only_on_new_content(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "model.joblib"), str(tmp_path / "scaler.joblib"))
+    assert registry.reload_if_changed() is False
+    assert registry.info() == {"loaded": False, "model_path": registry.model_path}
+
+    _write_artifacts(tmp_path, seed=1)
+    assert registry.reload_if_changed() is True
+    first = registry.current
+    info = registry.info()
+    assert info["model_type"] == "LogisticRegression" and info["model_path"] == registry.model_path
+    assert info["promoted_version"] is None
+
+    # Touching the files without changing them keeps the same version
+    now = time.time() + 5
+    os.utime(tmp_path / "model.joblib", (now, now))
+    assert registry.reload_if_changed() is False
+    assert registry.current is first
+
+    _write_artifacts(tmp_path, seed=2)
+    assert registry.reload_if_changed() is True
+    assert registry.current.version != first.version
+    # A caller still holding the old snapshot keeps a consistent pair
+    assert first.scaler.transform(np.zeros((1, 3))).shape == (1, 3)
+
+
+def test_half_written_file_keeps_serving_old_version(tmp_path):
+    _write_artifacts(tmp_path, seed=1)
+    registry = ModelRegistry(str(tmp_path / "model.joblib"), str(tmp_path / "scaler.joblib"))
+    registry.reload_if_changed()
+    version = registry.current.version
+
+    (tmp_path / "model.joblib").write_bytes(b"truncated")
+    assert registry.reload_if_changed() is False
+    assert registry.current.version == version
@@ -0,0 +1,52 @@
+# tests/test_prediction.py
+import sys
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import LinearSVC
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from common.prediction import predict_batch, predict_one
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5))
+    y = (X[:, 0] - X[:, 2] > 0).astype(int)
+    return X, y, StandardScaler().fit(X)
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=20, random_state=0),
+    LogisticRegression(),
+])
+def test_matches_predict_and_predict_proba(data, model):
+    X, y, scaler = data
+    model.fit(scaler.transform(X), y)
+
+    labels, probs = predict_batch(model, scaler, X)
+    scaled = scaler.transform(X)
+    np.testing.assert_allclose(probs, model.predict_proba(scaled)[:, 1] * 100)
+    ties = probs == 50
+    np.testing.assert_array_equal(labels[~ties], model.predict(scaled)[~ties])
+
+    label, prob = predict_one(model, scaler, X[0])
+    assert (label, prob) == (labels[0], probs[0])
+
+
+def test_threshold_and_models_without_proba(data):
+    X, y, scaler = data
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    strict, probs = predict_batch(model, scaler, X, threshold=0.9)
+    assert strict.sum() == (probs >= 90).sum() < predict_batch(model, scaler, X)[0].sum()
+
+    svc = LinearSVC().fit(scaler.transform(X), y)
+    labels, probs = predict_batch(svc, scaler, X[:3])
+    assert probs is None and labels.shape == (3,)
@@ -0,0 +1,86 @@
+# tests/test_prober.py
+import sys
+import os
+import asyncio
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from common.prober import LatencyProber, parse_targets
+
+
+async def _http_server(delay, status=200):
+    """Local stand-in for a probe target that answers after `delay` seconds."""
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        await asyncio.sleep(delay)
+        writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: 0\r\n\r\n".encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def _closed_port():
+    import socket
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def test_parse_targets():
+    assert parse_targets(" a:1, http://b/ ,,") == ["a:1", "http://b/"]
+    assert parse_targets(None) == []
+
+
+def test_probes_run_concurrently():
+    async def scenario():
+        servers = [await _http_server(0.3) for _ in range(10)]
+        prober = LatencyProber([f"http://127.0.0.1:{p}/health" for _, p in servers], timeout=2)
+        t0 = time.perf_counter()
+        results = await prober.probe_all()
+        elapsed = time.perf_counter() - t0
+        for s, _ in servers:
+            s.close()
+        return prober, results, elapsed
+
+    prober, results, elapsed = asyncio.run(scenario())
+    assert all(ok for ok, _, _ in results.values())
+    # Ten 300 ms probes cost about one probe, not three seconds
+    assert elapsed < 1.0
+    window = prober.take_window()
+    assert window["Error_Rate"] == 0.0 and window["Network_Latency"] >= 300
+    assert prober.take_window()["probes"] == 0
+
+
+def test_errors_and_timeouts_are_counted():
+    async def scenario():
+        ok_server, ok_port = await _http_server(0)
+        slow_server, slow_port = await _http_server(5)
+        bad_server, bad_port = await _http_server(0, status=503)
+        targets = [f"127.0.0.1:{ok_port}", f"http://127.0.0.1:{slow_port}/",
+                   f"http://127.0.0.1:{bad_port}/", f"127.0.0.1:{_closed_port()}"]
+        prober = LatencyProber(targets, timeout=0.5)
+        t0 = time.perf_counter()
+        results = await prober.probe_all()
+        elapsed = time.perf_counter() - t0
+        for s in (ok_server, slow_server, bad_server):
+            s.close()
+        return prober, targets, results, elapsed
+
+    prober, targets, results, elapsed = asyncio.run(scenario())
+    assert elapsed < 1.5  # bounded by the timeout, not the 5 s server
+    assert results[targets[0]][0] is True
+    assert results[targets[1]][2] == "timeout"
+    assert "503" in results[targets[2]][2]
+    assert results[targets[3]][0] is False
+
+    snap = prober.snapshot()
+    assert snap[targets[0]]["attempts"] == 1 and snap[targets[0]]["errors"] == 0
+    assert sum(snap[targets[0]]["histogram"].values()) == 1
+    assert all(snap[t]["errors"] == 1 for t in targets[1:])
+    assert prober.take_window()["Error_Rate"] == 75.0
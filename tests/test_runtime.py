@@ -0,0 +1,51 @@
+# tests/test_runtime.py
+import sys
+import os
+import asyncio
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from Agent.runtime import AgentRuntime, BoundedQueue
+
+
+def test_bounded_queue_drops_oldest():
+    async def scenario():
+        q = BoundedQueue(maxsize=2)
+        for i in range(5):
+            q.put(i)
+        return q.dropped, [await q.get(), await q.get()]
+
+    assert asyncio.run(scenario()) == (3, [3, 4])
+
+
+def test_fixed_rate_does_not_drift():
+    ticks = []
+
+    def work():
+        ticks.append(time.monotonic())
+        time.sleep(0.03)  # work time must not push later ticks back
+
+    rt = AgentRuntime().every("tick", 0.1, work)
+    asyncio.run(rt.run(duration=1.05))
+
+    assert len(ticks) == 11
+    # The tenth tick lands on the 0.1 s grid, not 10 * (0.1 + 0.03) later
+    assert abs((ticks[10] - ticks[0]) - 1.0) < 0.08
+
+
+def test_slow_sink_does_not_delay_sampling():
+    sampled, consumed = [], []
+
+    rt = AgentRuntime()
+    q = rt.queue("metrics", maxsize=3)
+    rt.every("sample", 0.05, lambda: (sampled.append(1), q.put(len(sampled))), in_thread=False)
+    rt.consume("sink", q, lambda item: (time.sleep(0.4), consumed.append(item)))
+    rt.every("broken", 0.1, lambda: 1 / 0)
+    asyncio.run(rt.run(duration=1.0))
+
+    assert len(sampled) >= 19
+    assert len(consumed) <= 3
+    assert q.dropped > 0
+    assert rt.stats["broken"]["errors"] == rt.stats["broken"]["runs"] >= 9
@@ -0,0 +1,63 @@
+# tests/test_sampler.py
+import sys
+import os
+import types
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import common.sampler as sampler_mod
+from common.sampler import MB, MetricSampler
+
+
+class FakePsutil:
+    def __init__(self):
+        self.cpu = iter([0.0, 20.0, 40.0, 60.0])
+        self.disk = 0
+        self.net = 0
+
+    def cpu_percent(self, interval=None):
+        assert interval is None  # must never block
+        return next(self.cpu)
+
+    def virtual_memory(self):
+        return types.SimpleNamespace(percent=50.0)
+
+    def disk_io_counters(self):
+        return types.SimpleNamespace(read_bytes=self.disk, write_bytes=0)
+
+    def net_io_counters(self):
+        return types.SimpleNamespace(bytes_sent=self.net, bytes_recv=0)
+
+
+def test_rates_from_counter_deltas(monkeypatch):
+    fake = FakePsutil()
+    clock = iter([0.0, 5.0, 10.0, 15.0])
+    monkeypatch.setattr(sampler_mod, "psutil", fake)
+    monkeypatch.setattr(sampler_mod.time, "monotonic", lambda: next(clock))
+
+    s = MetricSampler(interval=5)
+    fake.disk, fake.net = 10 * MB, 5 * MB
+    s.sample()
+    fake.disk, fake.net = 30 * MB, 5 * MB
+    s.sample()
+
+    window = s.take_window()
+    assert window["samples"] == 2
+    assert window["CPU_Usage"] == {"min": 20.0, "max": 40.0, "mean": 30.0}
+    assert window["Disk_IO"] == {"min": 2.0, "max": 4.0, "mean": 3.0}
+    assert window["Net_IO"]["max"] == 1.0
+
+    # Counter reset (e.g. device hot-plug) never yields a negative rate
+    fake.disk = 0
+    assert s.sample()["Disk_IO"] == 0.0
+
+
+def test_empty_window_takes_an_immediate_snapshot(monkeypatch):
+    fake = FakePsutil()
+    monkeypatch.setattr(sampler_mod, "psutil", fake)
+    s = MetricSampler()
+    window = s.take_window()
+    assert window["samples"] == 1
+    assert window["CPU_Usage"]["mean"] == 20.0
+    assert s.take_window()["samples"] == 1
@@ -0,0 +1,87 @@
+# tests/test_train_model.py
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from database.models import SystemHistory
+import train_model
+from utils.model_registry import ModelRegistry
+
+FEATURES = ["CPU_Usage", "Memory_Usage", "CPU_Usage_roll_mean", "Error_Rate_diff"]
+
+
+def seed_history(engine, minutes=600):
+    SystemHistory.__table__.create(engine)
+    t0 = datetime(2024, 1, 1)
+    rows = []
+    for node in ("a", "b"):
+        for i in range(minutes):
+            hot = i % 60 >= 45  # CPU climbs for 15 minutes before each outage
+            rows.append({
+                "timestamp": t0 + timedelta(minutes=i), "system_name": node,
+                "cpu_usage": 90.0 + i % 5 if hot else 20.0 + i % 7, "memory_usage": 50.0,
+                "disk_io": 1.0, "network_latency": 5.0, "error_rate": 0.1,
+                "status": "down" if i % 60 == 59 else "ok", "downtime_detected": i % 60 == 59,
+            })
+    with engine.begin() as conn:
+        conn.execute(SystemHistory.__table__.insert(), rows)
+
+
+def test_horizon_labels_across_chunks(tmp_path):
+    t0 = datetime(2024, 1, 1)
+    rows = [(i + 1, "n", t0 + timedelta(minutes=i), i == 30, 1.0, 1.0, 1.0, 1.0, 1.0) for i in range(40)]
+    chunks = [rows[:7], rows[7:25], rows[25:]]
+    X, y, _ = train_model.build_dataset(iter(chunks), FEATURES, horizon_minutes=10)
+    assert X.shape == (40, 4) and X.dtype == np.float32
+    assert np.flatnonzero(y).tolist() == list(range(20, 31))
+
+    # Preallocated (here too small, so it grows) and disk-backed buffers give the same result
+    X2, y2, _ = train_model.build_dataset(iter(chunks), FEATURES, horizon_minutes=10, capacity=10)
+    assert np.array_equal(X, X2) and np.array_equal(y, y2)
+    mm = np.lib.format.open_memmap(str(tmp_path / "X.npy"), mode="w+", dtype=np.float32, shape=(40, 4))
+    X3, y3, _ = train_model.build_dataset(iter(chunks), FEATURES, horizon_minutes=10, x_buffer=mm)
+    assert isinstance(X3, np.memmap) and np.array_equal(X, X3) and np.array_equal(y, y3)
+
+
+def test_training_writes_versioned_artifacts_the_registry_loads(tmp_path):
+    engine = create_engine("sqlite://")
+    seed_history(engine)
+    with engine.connect() as conn:
+        model, scaler, names, report = train_model.train(
+            conn, horizon=15, n_jobs=2, estimators=20, chunk=250, feature_names=FEATURES,
+            memmap_dir=str(tmp_path / "mm"),
+        )
+
+    assert report["rows"] == 1200 and report["positives"] == 2 * 10 * 16
+    assert not (tmp_path / "mm" / "train_X.npy").exists()
+    assert report["holdout"]["roc_auc"] > 0.9
+    assert set(report["inference_latency"]) == {"per_row_ms", "per_1000_rows_ms"}
+    assert report["peak_memory_mb"] > 0 and model.n_jobs == 1
+    # The scaler never saw the held-out (most recent) rows
+    assert scaler.n_samples_seen_ == report["rows"] - report["holdout"]["rows"]
+
+    features_file = tmp_path / "features.pkl"
+    out = train_model.save_artifacts(model, scaler, names, report, str(tmp_path), str(features_file))
+    assert json.load(open(os.path.join(out, "report.json")))["version"] == report["version"]
+    registry = ModelRegistry(str(tmp_path / "model_latest.joblib"), str(tmp_path / "scaler_latest.joblib"),
+                             latest_path=str(tmp_path / "LATEST"))
+    assert registry.reload_if_changed()
+    assert registry.current.feature_names == FEATURES
+    assert train_model.load_feature_names(str(features_file)) == FEATURES
+
+    # Promotion is one pointer swap: the registry follows it to the whole new version
+    report2 = {**report, "version": report["version"] + "-2"}
+    train_model.save_artifacts(model, scaler, ["CPU_Usage"] * 4, report2, str(tmp_path), str(features_file))
+    assert (tmp_path / "LATEST").read_text() == report2["version"]
+    assert registry.reload_if_changed() and registry.current.feature_names == ["CPU_Usage"] * 4
+    info = registry.info()
+    assert info["promoted_version"] == report2["version"]
+    assert info["model_path"] == os.path.join(str(tmp_path), report2["version"], "model.joblib")
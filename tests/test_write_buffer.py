@@ -0,0 +1,93 @@
+# tests/test_write_buffer.py
+import sys
+import os
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from Agent.write_buffer import WriteBuffer
+
+
+def test_flushes_when_batch_is_full():
+    sent = []
+    buf = WriteBuffer(sink=sent.append, max_batch=3, flush_interval=3600)
+
+    for i in range(2):
+        buf.add("metrics", {"i": i})
+    assert buf.maybe_flush() is False
+
+    buf.add("predictions", {"i": 2})
+    assert buf.maybe_flush() is True
+    assert sent == [{"metrics": [{"i": 0}, {"i": 1}], "predictions": [{"i": 2}]}]
+    assert len(buf) == 0
+
+
+def test_failed_flush_keeps_rows_and_backs_off():
+    calls = []
+
+    def flaky_sink(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise ConnectionError("backend down")
+
+    buf = WriteBuffer(sink=flaky_sink, max_batch=1, flush_interval=3600, retry_base=60)
+    buf.add("metrics", {"i": 0})
+
+    assert buf.flush() is False
+    assert len(buf) == 1
+    # Still inside the backoff window
+    assert buf.maybe_flush() is False
+
+    assert buf.flush(force=True) is True
+    assert len(buf) == 0
+    assert calls[0] == calls[1]
+
+
+def test_spool_survives_restart(tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    ts = datetime(2024, 1, 1, 12, 30)
+
+    def down(batch):
+        raise ConnectionError("backend down")
+
+    buf = WriteBuffer(sink=down, spool_path=spool)
+    buf.add("metrics", {"system_id": 1, "timestamp": ts})
+    buf.flush()
+
+    sent = []
+    restarted = WriteBuffer(sink=sent.append, spool_path=spool)
+    assert len(restarted) == 1
+    assert restarted.flush() is True
+    assert sent == [{"metrics": [{"system_id": 1, "timestamp": ts}]}]
+    assert WriteBuffer(sink=sent.append, spool_path=spool).flush() is True
+    assert len(sent) == 1
+
+
+def test_backlog_drains_in_bounded_batches_and_rejects_bad_ones(tmp_path):
+    import requests
+
+    class Rejected(Exception):
+        response = requests.Response()
+
+    Rejected.response.status_code = 400
+    spool = str(tmp_path / "spool.jsonl")
+    sizes = []
+
+    def sink(batch):
+        rows = sum(len(r) for r in batch.values())
+        if rows > 100:
+            raise ConnectionError("batch too large")
+        if any(r.get("bad") for rs in batch.values() for r in rs):
+            raise Rejected("400 Bad Request")
+        sizes.append(rows)
+
+    buf = WriteBuffer(sink=sink, max_batch=100, spool_path=spool)
+    for i in range(6000):
+        buf.add("metrics", {"i": i, "bad": i == 150})
+    assert buf.flush() is True
+    assert len(buf) == 0 and max(sizes) == 100
+    assert sum(sizes) == 5900 and buf.rejected == 100
+    assert len(open(f"{spool}.rejected").readlines()) == 100
+    assert WriteBuffer(sink=sink, spool_path=spool).flush() is True  # spool emptied
+    assert sum(sizes) == 5900